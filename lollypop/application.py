@@ -14,12 +14,12 @@ import gi
 gi.require_version("Gtk", "3.0")
 gi.require_version("Gst", "1.0")
 gi.require_version("GstAudio", "1.0")
+gi.require_version("GstController", "1.0")
 gi.require_version("GstPbutils", "1.0")
 gi.require_version("Notify", "0.7")
 gi.require_version("TotemPlParser", "1.0")
 from gi.repository import Gtk, Gio, GLib, Gdk, Notify, TotemPlParser
 
-from pickle import dump
 from gettext import gettext as _
 
 
@@ -34,7 +34,7 @@ except Exception as e:
     LastFM = None
 
 from lollypop.utils import is_gnome, is_unity
-from lollypop.define import Type, LOLLYPOP_DATA_PATH
+from lollypop.define import Type
 from lollypop.window import Window
 from lollypop.database import Database
 from lollypop.player import Player
@@ -46,11 +46,16 @@ from lollypop.database_albums import AlbumsDatabase
 from lollypop.database_artists import ArtistsDatabase
 from lollypop.database_genres import GenresDatabase
 from lollypop.database_tracks import TracksDatabase
+from lollypop.database_images import ImagesDatabase
 from lollypop.notification import NotificationManager
 from lollypop.playlists import Playlists
+from lollypop.stats import StatsWriter
+from lollypop.cache_manager import CacheManager
+from lollypop.session import Session
 from lollypop.objects import Album, Track
 from lollypop.helper_task import TaskHelper
 from lollypop.collectionscanner import CollectionScanner
+from lollypop.facets import FacetIndex
 
 
 class Application(Gtk.Application):
@@ -170,10 +175,14 @@ class Application(Gtk.Application):
         self.artists = ArtistsDatabase()
         self.genres = GenresDatabase()
         self.tracks = TracksDatabase()
+        self.images = ImagesDatabase()
+        self.stats = StatsWriter()
         self.player = Player()
         self.inhibitor = Inhibitor()
         self.scanner = CollectionScanner()
+        self.facets = FacetIndex()
         self.art = Art()
+        self.cache_manager = CacheManager()
         self.notify = NotificationManager()
         self.art.update_art_size()
         if self.settings.get_value("artist-artwork"):
@@ -231,6 +240,10 @@ class Application(Gtk.Application):
         """
         # First save state
         self.__save_state()
+        # Write pending statistics
+        self.stats.stop()
+        # Keep pending downloads for next run
+        self.art.save_downloads()
         # Then vacuum db
         if vacuum:
             self.__vacuum()
@@ -269,6 +282,7 @@ class Application(Gtk.Application):
         """
         if self.is_fullscreen():
             return
+        state = {}
         if self.settings.get_value("save-state"):
             self.window.save_view_state()
             # Save current track
@@ -282,19 +296,14 @@ class Application(Gtk.Application):
             else:
                 track_id = self.player.current_track.id
                 # Save albums context
-                try:
-                    dump(self.player.context.genre_ids,
-                         open(LOLLYPOP_DATA_PATH + "/genre_ids.bin", "wb"))
-                    dump(self.player.context.artist_ids,
-                         open(LOLLYPOP_DATA_PATH + "/artist_ids.bin", "wb"))
-                    self.player.shuffle_albums(False)
-                    dump(self.player.get_albums(),
-                         open(LOLLYPOP_DATA_PATH + "/albums.bin", "wb"))
-                except Exception as e:
-                    print("Application::__save_state()", e)
-            dump(track_id, open(LOLLYPOP_DATA_PATH + "/track_id.bin", "wb"))
-            dump([self.player.is_playing, self.player.is_party],
-                 open(LOLLYPOP_DATA_PATH + "/player.bin", "wb"))
+                state["genre_ids"] = self.player.context.genre_ids
+                state["artist_ids"] = self.player.context.artist_ids
+                self.player.shuffle_albums(False)
+                state["albums"] = list(self.player.get_albums())
+                state["queue"] = list(self.player.queue)
+            state["track_id"] = track_id
+            state["is_playing"] = self.player.is_playing
+            state["is_party"] = self.player.is_party
             # Save current playlist
             if self.player.current_track.id == Type.RADIOS:
                 playlist_ids = [Type.RADIOS]
@@ -302,13 +311,14 @@ class Application(Gtk.Application):
                 playlist_ids = []
             else:
                 playlist_ids = self.player.get_user_playlist_ids()
-            dump(playlist_ids,
-                 open(LOLLYPOP_DATA_PATH + "/playlist_ids.bin", "wb"))
+                state["user_playlist"] = list(
+                                           self.player.get_user_playlist())
+            state["playlist_ids"] = playlist_ids
         if self.player.current_track.id is not None:
-            position = self.player.position
+            state["position"] = self.player.position
         else:
-            position = 0
-        dump(position, open(LOLLYPOP_DATA_PATH + "/position.bin", "wb"))
+            state["position"] = 0
+        Session().save(state)
         self.player.stop_all()
         self.window.stop_all()
 
@@ -36,7 +36,9 @@ class Art(AlbumArt, RadioArt, Downloader):
         """
             Remove all covers from cache
         """
+        self._clean_surfaces()
         try:
+            self._clean_store()
             rmtree(self._CACHE_PATH)
             self._create_cache()
         except Exception as e:
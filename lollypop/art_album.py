@@ -13,6 +13,8 @@
 from gi.repository import GLib, Gdk, GdkPixbuf, Gio, Gst
 
 import re
+from queue import PriorityQueue
+from threading import Thread, Lock
 
 from lollypop.art_base import BaseArt
 from lollypop.tagreader import TagReader
@@ -21,6 +23,9 @@ from lollypop.objects import Album
 from lollypop.utils import escape, is_readonly
 from lollypop.helper_dbus import DBusHelper
 from lollypop.helper_task import TaskHelper
+from lollypop.lru import LRUCache
+from lollypop.sqlcursor import SqlCursor
+from lollypop.database_artwork import ArtworkDatabase
 
 
 class AlbumArt(BaseArt, TagReader):
@@ -29,6 +34,7 @@ class AlbumArt(BaseArt, TagReader):
     """
 
     _MIMES = ("jpeg", "jpg", "png", "gif")
+    __DECODE_WORKERS = 2
 
     def __init__(self):
         """
@@ -41,6 +47,31 @@ class AlbumArt(BaseArt, TagReader):
         if not self.__favorite:
             self.__favorite = Lp().settings.get_default_value(
                                                 "favorite-cover").get_string()
+        # Encoded artwork
+        self.__store = ArtworkDatabase()
+        # Decoded artwork: (album id, size, scale): cairo surface
+        self.__surfaces = LRUCache(max_size=self.__get_surfaces_budget(),
+                                   get_size=lambda surface:
+                                   surface.get_stride() *
+                                   surface.get_height())
+        # Pending async requests: (priority, seq, request)
+        self.__decode_queue = PriorityQueue()
+        self.__decode_lock = Lock()
+        self.__decode_threads = []
+        self.__decode_seq = 0
+        self.connect("album-artwork-changed",
+                     self.__on_album_artwork_changed)
+        Lp().settings.connect("changed::artwork-cache-size",
+                              self.__on_artwork_cache_size_changed)
+
+    @property
+    def artwork_cache_stats(self):
+        """
+            Decoded artwork cache statistics
+            @return {"hits": int, "misses": int, "hit_rate": float,
+                     "count": int, "size": int}
+        """
+        return self.__surfaces.stats
 
     def get_album_cache_path(self, album, size):
         """
@@ -58,14 +89,18 @@ class AlbumArt(BaseArt, TagReader):
             f = Gio.File.new_for_path(cache_path_jpg)
             if f.query_exists():
                 return cache_path_jpg
-            else:
+            # Export stored artwork for external users
+            data = self.__store.get(filename, size)
+            if data is None:
                 self.get_album_artwork(album, size, 1)
-                if f.query_exists():
-                    return cache_path_jpg
-                else:
-                    return self._get_default_icon_path(
-                                           size,
-                                           "folder-music-symbolic")
+                data = self.__store.get(filename, size)
+            if data is not None:
+                GLib.file_set_contents(cache_path_jpg, data)
+                return cache_path_jpg
+            else:
+                return self._get_default_icon_path(
+                                       size,
+                                       "folder-music-symbolic")
         except Exception as e:
             print("Art::get_album_cache_path(): %s" % e, ascii(filename))
             return None
@@ -83,18 +118,17 @@ class AlbumArt(BaseArt, TagReader):
             return None
         try:
             filename = self.get_album_cache_name(album) + ".jpg"
-            uris = [
-                # Used when album.uri is readonly
-                GLib.filename_to_uri(self._STORE_PATH + "/" + filename),
-                # Default favorite artwork
-                album.uri + "/" + self.__favorite,
-                # Used when having muliple albums in same folder
-                album.uri + "/" + filename
-            ]
-            for uri in uris:
-                f = Gio.File.new_for_uri(uri)
-                if f.query_exists():
-                    return uri
+            # Used when album.uri is readonly
+            store_path = self._STORE_PATH + "/" + filename
+            if GLib.file_test(store_path, GLib.FileTest.EXISTS):
+                return GLib.filename_to_uri(store_path)
+            names = self.__get_folder_images(album.uri)
+            # Default favorite artwork
+            if self.__favorite in names:
+                return album.uri + "/" + self.__favorite
+            # Used when having muliple albums in same folder
+            if filename in names:
+                return album.uri + "/" + filename
         except Exception as e:
             print("AlbumArt::get_album_artwork_uri():", e)
         return None
@@ -108,16 +142,8 @@ class AlbumArt(BaseArt, TagReader):
         # Folders with many albums, get_album_artwork_uri()
         if Lp().albums.get_uri_count(album.uri) > 1:
             return None
-        f = Gio.File.new_for_uri(album.uri)
-        infos = f.enumerate_children("standard::name",
-                                     Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
-                                     None)
-        all_uris = []
-        for info in infos:
-            f = infos.get_child(info)
-            all_uris.append(f.get_uri())
-        for uri in filter(lambda p: p.lower().endswith(self._MIMES), all_uris):
-            return uri
+        for name in self.__get_folder_images(album.uri):
+            return album.uri + "/" + name
         return None
 
     def get_album_artworks(self, album):
@@ -126,105 +152,85 @@ class AlbumArt(BaseArt, TagReader):
             @param album as Album
             @return [paths]
         """
+        uris = []
         try:
-            f = Gio.File.new_for_uri(album.uri)
-            infos = f.enumerate_children(
-                                     "standard::name",
-                                     Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
-                                     None)
-            all_uris = []
-            for info in infos:
-                f = infos.get_child(info)
-                all_uris.append(f.get_uri())
-            uris = []
-            for uri in filter(lambda p: p.lower().endswith(self._MIMES),
-                              all_uris):
-                uris.append(uri)
+            for name in self.__get_folder_images(album.uri):
+                uris.append(album.uri + "/" + name)
         except Exception as e:
             print("AlbumArt::get_album_artworks()", e)
         return uris
 
+    def is_image(self, name):
+        """
+            True if filename is a supported artwork
+            @param name as str
+            @return bool
+        """
+        return name.lower().endswith(self._MIMES)
+
+    def preload_album_artwork(self, album, size):
+        """
+            Make sure album artwork is in store, no decoding if already there
+            @param album as Album
+            @param size as int
+            @thread safe
+        """
+        try:
+            if not self.__store.exists(self.get_album_cache_name(album), size):
+                self.__load_album_artwork(album, size, 1)
+        except Exception as e:
+            print("AlbumArt::preload_album_artwork()", e)
+
     def get_album_artwork(self, album, size, scale):
         """
-            Return a cairo surface for album_id, covers are cached as jpg.
+            Return a cairo surface for album_id, covers are cached in store.
             @param album as Album
             @param pixbuf size as int
             @param scale factor as int
             @return cairo surface
         """
-        size *= scale
-        filename = self.get_album_cache_name(album)
-        cache_path_jpg = "%s/%s_%s.jpg" % (self._CACHE_PATH, filename, size)
-        pixbuf = None
-
         try:
-            # Look in cache
-            f = Gio.File.new_for_path(cache_path_jpg)
-            if f.query_exists():
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(cache_path_jpg,
-                                                                size,
-                                                                size)
-            else:
-                # Use favorite folder artwork
-                if pixbuf is None:
-                    uri = self.get_album_artwork_uri(album)
-                    data = None
-                    if uri is not None:
-                        f = Gio.File.new_for_uri(uri)
-                        (status, data, tag) = f.load_contents(None)
-                        ratio = self._respect_ratio(uri)
-                        bytes = GLib.Bytes(data)
-                        stream = Gio.MemoryInputStream.new_from_bytes(bytes)
-                        bytes.unref()
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
-                                                                       stream,
-                                                                       size,
-                                                                       size,
-                                                                       ratio,
-                                                                       None)
-                        stream.close()
-                # Use tags artwork
-                if pixbuf is None and album.tracks:
-                    try:
-                        pixbuf = self.pixbuf_from_tags(
-                                    album.tracks[0].uri, size)
-                    except Exception as e:
-                        print("AlbumArt::get_album_artwork()", e)
-
-                # Use folder artwork
-                if pixbuf is None and album.uri != "":
-                    uri = self.get_first_album_artwork(album)
-                    # Look in album folder
-                    if uri is not None:
-                        f = Gio.File.new_for_uri(uri)
-                        (status, data, tag) = f.load_contents(None)
-                        ratio = self._respect_ratio(uri)
-                        bytes = GLib.Bytes(data)
-                        stream = Gio.MemoryInputStream.new_from_bytes(bytes)
-                        bytes.unref()
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
-                                                                       stream,
-                                                                       size,
-                                                                       size,
-                                                                       ratio,
-                                                                       None)
-                        stream.close()
-                # Use default artwork
-                if pixbuf is None:
-                    self.cache_album_art(album.id)
-                    return self.get_default_icon("folder-music-symbolic",
-                                                 size,
-                                                 scale)
-                else:
-                    pixbuf.savev(cache_path_jpg, "jpeg", ["quality"],
-                                 [str(Lp().settings.get_value(
-                                                "cover-quality").get_int32())])
-            surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+            surface = self.__load_album_artwork(album, size, scale)
+            if surface is None:
+                self.cache_album_art(album.id)
+                surface = self.get_default_icon("folder-music-symbolic",
+                                                size * scale,
+                                                scale)
             return surface
-
         except Exception as e:
             print("AlbumArt::get_album_artwork()", e)
-            return self.get_default_icon("folder-music-symbolic", size, scale)
+            return self.get_default_icon("folder-music-symbolic",
+                                         size * scale,
+                                         scale)
+
+    def get_album_artwork_async(self, album, size, scale, cancellable,
+                                priority, callback, *args):
+        """
+            Load a cairo surface for album in a worker thread
+            Callback is run in main thread, never if cancelled
+            @param album as Album
+            @param size as int
+            @param scale factor as int
+            @param cancellable as Gio.Cancellable
+            @param priority as int (GLib.PRIORITY_*, lower first)
+            @param callback as function(surface, *args)
+        """
+        surface = self.__surfaces.get((album.id, size, scale))
+        if surface is not None:
+            callback(surface, *args)
+            return
+        with self.__decode_lock:
+            if not self.__decode_threads:
+                for i in range(0, self.__DECODE_WORKERS):
+                    thread = Thread(target=self.__decode_worker)
+                    thread.daemon = True
+                    thread.start()
+                    self.__decode_threads.append(thread)
+            self.__decode_seq += 1
+            self.__decode_queue.put((priority,
+                                     self.__decode_seq,
+                                     (album, size, scale, cancellable,
+                                      callback, args)))
 
     def get_album_artwork2(self, uri, size, scale):
         """
@@ -290,11 +296,22 @@ class AlbumArt(BaseArt, TagReader):
                 dst = Gio.File.new_for_uri(arturi)
                 src = Gio.File.new_for_path(store_path)
                 src.move(dst, Gio.FileCopyFlags.OVERWRITE, None, None)
+                self.__forget_folder_images(album.uri)
                 self.clean_album_cache(album)
                 GLib.idle_add(self.album_artwork_update, album.id)
         except Exception as e:
             print("Art::save_album_artwork(): %s" % e)
 
+    def update_folder_artwork(self, folder):
+        """
+            Image files changed in folder, index them again
+            @param folder uri as str
+        """
+        self.__forget_folder_images(folder)
+        for album_id in Lp().albums.get_ids_by_uri(folder):
+            self.clean_album_cache(Album(album_id))
+            self.album_artwork_update(album_id)
+
     def album_artwork_update(self, album_id):
         """
             Announce album cover update
@@ -317,6 +334,7 @@ class AlbumArt(BaseArt, TagReader):
                     f.delete(None)
                 except Exception as e:
                     print("AlbumArt::remove_album_artwork():", e)
+        self.__forget_folder_images(album.uri)
         dbus_helper = DBusHelper()
         dbus_helper.call("CanSetCover", None,
                          self.__on_remove_album_artwork, album.id)
@@ -326,8 +344,10 @@ class AlbumArt(BaseArt, TagReader):
             Remove cover from cache for album id
             @param album as Album
         """
+        self.__surfaces.remove_if(lambda key: key[0] == album.id)
         cache_name = self.get_album_cache_name(album)
         try:
+            self.__store.remove(cache_name)
             d = Gio.File.new_for_path(self._CACHE_PATH)
             infos = d.enumerate_children(
                 "standard::name",
@@ -386,9 +406,232 @@ class AlbumArt(BaseArt, TagReader):
                              album.year)
         return escape(name)
 
+#######################
+# PROTECTED           #
+#######################
+    def _clean_surfaces(self):
+        """
+            Remove all decoded artwork from memory
+        """
+        self.__surfaces.clear()
+
+    def _clean_store(self):
+        """
+            Remove all encoded artwork
+        """
+        self.__store.clear()
+
 #######################
 # PRIVATE             #
 #######################
+    def __load_album_artwork(self, album, size, scale):
+        """
+            Load a cairo surface for album, covers are cached in store.
+            @param album as Album
+            @param pixbuf size as int
+            @param scale factor as int
+            @return cairo surface or None if album has no artwork
+            @thread safe
+        """
+        key = (album.id, size, scale)
+        surface = self.__surfaces.get(key)
+        if surface is not None:
+            return surface
+        size *= scale
+        filename = self.get_album_cache_name(album)
+        pixbuf = None
+
+        # Look in cache
+        data = self.__store.get(filename, size)
+        if data is not None:
+            bytes = GLib.Bytes(data)
+            stream = Gio.MemoryInputStream.new_from_bytes(bytes)
+            bytes.unref()
+            pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream,
+                                                               size,
+                                                               size,
+                                                               True,
+                                                               None)
+            stream.close()
+        else:
+            # Use favorite folder artwork
+            if pixbuf is None:
+                pixbuf = self.__get_folder_pixbuf(album, size,
+                                                  self.get_album_artwork_uri)
+            # Use tags artwork, extracted by scanner if available
+            if pixbuf is None:
+                data = self.__store.get_album_embedded(filename)
+                if data is not None:
+                    bytes = GLib.Bytes(data)
+                    stream = Gio.MemoryInputStream.new_from_bytes(bytes)
+                    bytes.unref()
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream,
+                                                                       size,
+                                                                       size,
+                                                                       False,
+                                                                       None)
+                    stream.close()
+                elif album.tracks:
+                    try:
+                        pixbuf = self.pixbuf_from_tags(album.tracks[0].uri,
+                                                       size)
+                    except Exception as e:
+                        print("AlbumArt::__load_album_artwork()", e)
+
+            # Use folder artwork
+            if pixbuf is None and album.uri != "":
+                pixbuf = self.__get_folder_pixbuf(album, size,
+                                                  self.get_first_album_artwork)
+            if pixbuf is None:
+                return None
+            (status, data) = pixbuf.save_to_bufferv(
+                                 "jpeg", ["quality"],
+                                 [str(Lp().settings.get_value(
+                                        "cover-quality").get_int32())])
+            if status:
+                self.__store.add(filename, size, data)
+        surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+        self.__surfaces.set(key, surface)
+        return surface
+
+    def __get_folder_pixbuf(self, album, size, get_uri):
+        """
+            Load artwork from album folder
+            If indexed file is gone, folder is indexed again
+            @param album as Album
+            @param size as int
+            @param get_uri as function(Album)
+            @return GdkPixbuf.Pixbuf or None
+            @thread safe
+        """
+        for i in range(0, 2):
+            uri = get_uri(album)
+            if uri is None:
+                return None
+            try:
+                f = Gio.File.new_for_uri(uri)
+                (status, data, tag) = f.load_contents(None)
+                ratio = self._respect_ratio(uri)
+                bytes = GLib.Bytes(data)
+                stream = Gio.MemoryInputStream.new_from_bytes(bytes)
+                bytes.unref()
+                pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream,
+                                                                   size,
+                                                                   size,
+                                                                   ratio,
+                                                                   None)
+                stream.close()
+                return pixbuf
+            except Exception as e:
+                print("AlbumArt::__get_folder_pixbuf()", e)
+                self.__forget_folder_images(album.uri)
+        return None
+
+    def __get_folder_images(self, folder):
+        """
+            Get image files in folder, from index if available
+            Folder is indexed if needed
+            @param folder uri as str
+            @return [str]
+        """
+        if not folder:
+            return []
+        names = Lp().images.get(folder)
+        if names is not None:
+            return names
+        names = []
+        try:
+            f = Gio.File.new_for_uri(folder)
+            infos = f.enumerate_children(
+                                     "standard::name",
+                                     Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                                     None)
+            for info in infos:
+                if self.is_image(info.get_name()):
+                    names.append(info.get_name())
+        except Exception as e:
+            print("AlbumArt::__get_folder_images()", e)
+            return names
+        # Do not wait for scanner transaction
+        if not Lp().scanner.is_locked():
+            with SqlCursor(Lp().db) as sql:
+                Lp().images.set(folder, names)
+                sql.commit()
+        return names
+
+    def __forget_folder_images(self, folder):
+        """
+            Remove folder from image files index
+            @param folder uri as str
+        """
+        if not folder or Lp().scanner.is_locked():
+            return
+        with SqlCursor(Lp().db) as sql:
+            Lp().images.forget(folder)
+            sql.commit()
+
+    def __decode_worker(self):
+        """
+            Decode queued artwork requests, most visible first
+            @thread safe
+        """
+        while True:
+            (priority, seq, request) = self.__decode_queue.get()
+            (album, size, scale, cancellable, callback, args) = request
+            if cancellable is not None and cancellable.is_cancelled():
+                continue
+            surface = None
+            failed = False
+            try:
+                surface = self.__load_album_artwork(album, size, scale)
+            except Exception as e:
+                print("AlbumArt::__decode_worker()", e)
+                failed = True
+            GLib.idle_add(self.__on_album_artwork_decoded,
+                          surface, failed, request, priority=priority)
+
+    def __on_album_artwork_decoded(self, surface, failed, request):
+        """
+            Pass decoded artwork to requester
+            @param surface as cairo.Surface or None
+            @param failed as bool
+            @param request as tuple
+        """
+        (album, size, scale, cancellable, callback, args) = request
+        if cancellable is not None and cancellable.is_cancelled():
+            return
+        if surface is None:
+            if not failed:
+                self.cache_album_art(album.id)
+            surface = self.get_default_icon("folder-music-symbolic",
+                                            size * scale,
+                                            scale)
+        callback(surface, *args)
+
+    def __get_surfaces_budget(self):
+        """
+            Get memory budget for decoded artwork
+            @return bytes as int
+        """
+        value = Lp().settings.get_value("artwork-cache-size").get_int32()
+        return max(value, 1) * 1024 * 1024
+
+    def __on_album_artwork_changed(self, art, album_id):
+        """
+            Remove decoded artwork for album
+            @param art as AlbumArt
+            @param album id as int
+        """
+        self.__surfaces.remove_if(lambda key: key[0] == album_id)
+
+    def __on_artwork_cache_size_changed(self, settings, value):
+        """
+            Update memory budget
+            @param settings as Gio.Settings
+            @param value as GLib.Variant
+        """
+        self.__surfaces.set_max_size(self.__get_surfaces_budget())
+
     def __save_artwork_tags(self, data, album):
         """
             Save artwork in tags
@@ -13,17 +13,24 @@
 from gi.repository import Gio, GLib, GdkPixbuf
 
 from os import mkdir, path  # FIXME Use Gio
+from time import time
 
 from lollypop.utils import escape
 from lollypop.define import ArtSize, Lp
+from lollypop.database_info import InfoDatabase
 
 
 class InfoCache:
     """
         Generic class to cache text and images
+        Entries are tracked in an InfoDatabase catalogue
     """
     _INFO_PATH = GLib.get_user_data_dir() + "/lollypop/info"
     _CACHE_PATH = GLib.get_user_cache_dir() + "/lollypop_info"
+    _DB = None
+    # Refetch after, in seconds
+    TTL = 90 * 24 * 3600
+    NEGATIVE_TTL = 7 * 24 * 3600
 
     WEBSERVICES = [("lastfm", "_get_lastfm_artist_info",
                     "_get_lastfm_album_artwork"),
@@ -54,14 +61,28 @@ class InfoCache:
             Return True if an info is cached
             @param prefix as string
         """
-        exists = False
+        return InfoCache._get_db().exists(escape(prefix))
+
+    def get_expired(prefix):
+        """
+            Get services to (re)fetch for prefix
+            Negative results expire sooner than positive ones
+            @param prefix as string
+            @return [str]
+        """
+        now = int(time())
+        services = InfoCache._get_db().get_services(escape(prefix))
+        expired = []
         for (suffix, helper1, helper2) in InfoCache.WEBSERVICES:
-            filepath = "%s/%s_%s.jpg" % (InfoCache._INFO_PATH,
-                                         escape(prefix),
-                                         suffix)
-            if path.exists(filepath):
-                exists = True
-        return exists
+            if suffix not in services.keys():
+                expired.append(suffix)
+                continue
+            (mtime, content, artwork, size) = services[suffix]
+            ttl = InfoCache.TTL if content or artwork\
+                else InfoCache.NEGATIVE_TTL
+            if mtime + ttl < now:
+                expired.append(suffix)
+        return expired
 
     def get_artwork(prefix, suffix, size):
         """
@@ -72,8 +93,11 @@ class InfoCache:
             @return path as string/None
         """
         try:
+            services = InfoCache._get_db().get_services(escape(prefix))
             for (suffix, helper1, helper2) in InfoCache.WEBSERVICES:
-                extract = None
+                if suffix not in services.keys() or\
+                        not services[suffix][2]:
+                    continue
                 filepath = "%s/%s_%s.jpg" % (InfoCache._INFO_PATH,
                                              escape(prefix),
                                              suffix)
@@ -81,49 +105,23 @@ class InfoCache:
                                                         escape(prefix),
                                                         suffix,
                                                         size)
-                if not path.exists(filepath) or path.getsize(filepath) == 0:
-                    filepath_at_size = None
-                    continue
                 # Make cache for this size
                 if not path.exists(filepath_at_size):
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(filepath,
-                                                                    size,
-                                                                    size)
-                    if pixbuf.get_height() > pixbuf.get_width():
-                        vertical = True
-                    elif pixbuf.get_height() < pixbuf.get_width():
-                        vertical = False
-                    else:
-                        extract = pixbuf
-                    if extract is None:
-                        extract = GdkPixbuf.Pixbuf.new(
-                                                    GdkPixbuf.Colorspace.RGB,
-                                                    True, 8,
-                                                    size, size)
-                        if vertical:
-                            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                                                                      filepath,
-                                                                      size,
-                                                                      -1,
-                                                                      True)
-                            diff = pixbuf.get_height() - size
-                            pixbuf.copy_area(0, diff/2,
-                                             pixbuf.get_width(),
-                                             size,
-                                             extract,
-                                             0, 0)
-                        else:
-                            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                                                                      filepath,
-                                                                      -1,
-                                                                      size,
-                                                                      True)
-                            diff = pixbuf.get_width() - size
-                            pixbuf.copy_area(diff/2, 0,
-                                             size,
-                                             pixbuf.get_height(),
-                                             extract,
-                                             0, 0)
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(filepath)
+                    width = pixbuf.get_width()
+                    height = pixbuf.get_height()
+                    # Scale smallest side to size, then crop center
+                    ratio = size / min(width, height)
+                    scaled_width = max(size, int(width * ratio))
+                    scaled_height = max(size, int(height * ratio))
+                    pixbuf = pixbuf.scale_simple(scaled_width,
+                                                 scaled_height,
+                                                 GdkPixbuf.InterpType.BILINEAR)
+                    extract = pixbuf.new_subpixbuf(
+                                               (scaled_width - size) // 2,
+                                               (scaled_height - size) // 2,
+                                               size,
+                                               size)
                     extract.savev(filepath_at_size, "jpeg",
                                   ["quality"], [str(Lp().settings.get_value(
                                                 "cover-quality").get_int32())])
@@ -144,14 +142,14 @@ class InfoCache:
                                  suffix)
         content = None
         data = None
-        if path.exists(filepath+".txt"):
+        entry = InfoCache._get_db().get(escape(prefix), suffix)
+        if entry is not None and entry[1]:
             f = Gio.File.new_for_path(filepath+".txt")
             (status, content, tag) = f.load_contents()
             if not status:
                 content = None
-            image_path = filepath+".jpg"
-            if path.exists(image_path):
-                f = Gio.File.new_for_path(image_path)
+            if entry[2]:
+                f = Gio.File.new_for_path(filepath+".jpg")
                 (status, data, tag) = f.load_contents()
                 if not status:
                     data = None
@@ -168,6 +166,8 @@ class InfoCache:
         filepath = "%s/%s_%s" % (InfoCache._INFO_PATH,
                                  escape(prefix),
                                  suffix)
+        previous = InfoCache._get_db().get(escape(prefix), suffix)
+        has_content = previous is not None and previous[1]
         if content is not None:
             f = Gio.File.new_for_path(filepath+".txt")
             fstream = f.replace(None, False,
@@ -175,11 +175,13 @@ class InfoCache:
             if fstream is not None:
                 fstream.write(content, None)
                 fstream.close()
+                has_content = True
         if data is None:
             f = Gio.File.new_for_path(filepath+".jpg")
             fstream = f.replace(None, False,
                                 Gio.FileCreateFlags.REPLACE_DESTINATION, None)
             fstream.close()
+            size = 0
         else:
             bytes = GLib.Bytes(data)
             stream = Gio.MemoryInputStream.new_from_bytes(bytes)
@@ -193,6 +195,27 @@ class InfoCache:
             pixbuf.savev(filepath + ".jpg",
                          "jpeg", ["quality"], [str(Lp().settings.get_value(
                                                "cover-quality").get_int32())])
+            size = path.getsize(filepath + ".jpg")
+            # Refreshed artwork, drop previous variants
+            if previous is not None and previous[2]:
+                for scale in [1, 2]:
+                    InfoCache.uncache_artwork(prefix, suffix, scale)
+        InfoCache._get_db().set(escape(prefix), suffix,
+                                has_content, data is not None, size)
+
+    def add_negative(prefix, suffix):
+        """
+            Remember service has nothing for prefix
+            Previous info is kept and marked as fresh
+            @param prefix as str
+            @param suffix as str
+        """
+        entry = InfoCache._get_db().get(escape(prefix), suffix)
+        if entry is not None and (entry[1] or entry[2]):
+            InfoCache._get_db().set(escape(prefix), suffix,
+                                    entry[1], entry[2], entry[3])
+        else:
+            InfoCache.add(prefix, None, None, suffix)
 
     def remove(prefix, suffix):
         """
@@ -200,6 +223,7 @@ class InfoCache:
             @param prefix as str
             @param suffix as str
         """
+        InfoCache._get_db().remove(escape(prefix), suffix)
         filepath = "%s/%s_%s.txt" % (InfoCache._INFO_PATH,
                                      escape(prefix),
                                      suffix)
@@ -234,3 +258,42 @@ class InfoCache:
                 f.delete(None)
             except:
                 pass
+
+    def _get_db():
+        """
+            Get catalogue
+            @return InfoDatabase
+        """
+        if InfoCache._DB is None:
+            InfoCache._DB = InfoDatabase()
+            if InfoCache._DB.count() == 0:
+                InfoCache._index_files()
+        return InfoCache._DB
+
+    def _index_files():
+        """
+            Add files cached by previous versions to catalogue
+        """
+        try:
+            d = Gio.File.new_for_path(InfoCache._INFO_PATH)
+            infos = d.enumerate_children(
+                "standard::name,standard::size,time::modified",
+                Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                None)
+            names = []
+            entries = []
+            for info in infos:
+                names.append(info.get_name())
+                if info.get_name().endswith(".jpg"):
+                    entries.append(info)
+            for info in entries:
+                name = info.get_name()[:-4]
+                (prefix, suffix) = name.rsplit("_", 1)
+                mtime = int(info.get_attribute_as_string("time::modified"))
+                InfoCache._get_db().set(prefix, suffix,
+                                        name + ".txt" in names,
+                                        info.get_size() > 0,
+                                        info.get_size(),
+                                        mtime)
+        except Exception as e:
+            print("InfoCache::_index_files():", e)
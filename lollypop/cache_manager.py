@@ -0,0 +1,206 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib, Gio
+
+from threading import Lock
+
+from lollypop.define import Lp
+from lollypop.art_base import BaseArt
+from lollypop.art_radio import RadioArt
+from lollypop.cache import InfoCache
+from lollypop.database_artwork import ArtworkDatabase
+from lollypop.helper_task import TaskHelper
+from lollypop.utils import debug
+
+
+class CacheManager:
+    """
+        Keep disk caches under a quota, least recently used first
+        User data (artwork store, radio logos) is only accounted
+    """
+    __FIRST_CHECK = 60  # Seconds
+    __CHECK_INTERVAL = 3600  # Seconds
+    # Evict down to this part of quota to not run on every check
+    __LOW_WATERMARK = 0.9
+
+    def __init__(self):
+        """
+            Init manager
+        """
+        self.__lock = Lock()
+        self.__running = False
+        # area: (count, bytes)
+        self.__usage = {}
+        self.__artwork = ArtworkDatabase()
+        Lp().settings.connect("changed::disk-cache-size",
+                              self.__on_disk_cache_size_changed)
+        GLib.timeout_add_seconds(self.__FIRST_CHECK, self.__on_timeout)
+
+    def check(self):
+        """
+            Update usage and enforce quota in background
+        """
+        with self.__lock:
+            if self.__running:
+                return
+            self.__running = True
+        helper = TaskHelper()
+        helper.run(self.__check)
+
+    @property
+    def usage(self):
+        """
+            Disk usage by area, updated by last check
+            @return {str: (count as int, bytes as int)}
+        """
+        with self.__lock:
+            return dict(self.__usage)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_quota(self):
+        """
+            Get quota for evictable caches
+            @return bytes as int, 0 for no limit
+        """
+        value = Lp().settings.get_value("disk-cache-size").get_int32()
+        return max(value, 0) * 1024 * 1024
+
+    def __get_files(self, path):
+        """
+            Get files in path
+            @param path as str
+            @return [(name as str, bytes as int, atime as int)]
+        """
+        files = []
+        try:
+            d = Gio.File.new_for_path(path)
+            if not d.query_exists():
+                return files
+            infos = d.enumerate_children(
+                "standard::name,standard::size,standard::type,"
+                "time::access,time::modified",
+                Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                None)
+            for info in infos:
+                if info.get_file_type() != Gio.FileType.REGULAR:
+                    continue
+                atime = max(info.get_attribute_uint64("time::access"),
+                            info.get_attribute_uint64("time::modified"))
+                files.append((info.get_name(), info.get_size(), atime))
+        except Exception as e:
+            print("CacheManager::__get_files():", e)
+        return files
+
+    def __remove_file(self, path):
+        """
+            Remove file at path
+            @param path as str
+        """
+        f = Gio.File.new_for_path(path)
+        f.delete(None)
+
+    def __check(self):
+        """
+            Update usage and evict least recently used entries
+            @thread safe
+        """
+        try:
+            usage = {}
+            # (atime, bytes, area, function, args)
+            entries = []
+            # Encoded album artwork
+            artwork = self.__artwork.get_entries()
+            for (name, size, count, atime) in artwork:
+                entries.append((atime, count, "artwork",
+                                self.__artwork.remove_size, (name, size)))
+            usage["artwork"] = (len(artwork),
+                                sum([item[2] for item in artwork]))
+            # Resized artwork and exported files
+            for (area, path) in [("cache", BaseArt._CACHE_PATH),
+                                 ("info-cache", InfoCache._CACHE_PATH)]:
+                files = self.__get_files(path)
+                for (name, count, atime) in files:
+                    entries.append((atime, count, area, self.__remove_file,
+                                    ("%s/%s" % (path, name),)))
+                usage[area] = (len(files), sum([item[1] for item in files]))
+            # Artist information, text goes with artwork
+            files = self.__get_files(InfoCache._INFO_PATH)
+            texts = {}
+            for (name, count, atime) in files:
+                if name.endswith(".txt"):
+                    texts[name[:-4]] = count
+            for (name, count, atime) in files:
+                if not name.endswith(".jpg") or "_" not in name:
+                    continue
+                (prefix, suffix) = name[:-4].rsplit("_", 1)
+                entries.append((atime, count + texts.get(name[:-4], 0),
+                                "info", InfoCache.remove, (prefix, suffix)))
+            usage["info"] = (len(files), sum([item[1] for item in files]))
+            # Accounted only
+            usage["embedded"] = self.__artwork.get_embedded_usage()
+            for (area, path) in [("store", BaseArt._STORE_PATH),
+                                 ("radios", RadioArt._RADIOS_PATH)]:
+                files = self.__get_files(path)
+                usage[area] = (len(files), sum([item[1] for item in files]))
+            self.__evict(entries, usage)
+            with self.__lock:
+                self.__usage = usage
+        except Exception as e:
+            print("CacheManager::__check():", e)
+        with self.__lock:
+            self.__running = False
+
+    def __evict(self, entries, usage):
+        """
+            Evict least recently used entries over quota
+            @param entries as [(int, int, str, function, tuple)]
+            @param usage as {str: (int, int)}, updated
+        """
+        quota = self.__get_quota()
+        total = sum([entry[1] for entry in entries])
+        if quota == 0 or total <= quota:
+            return
+        debug("CacheManager::__evict(): %s/%s bytes" % (total, quota))
+        entries.sort(key=lambda entry: entry[0])
+        compact = False
+        for (atime, count, area, remove, args) in entries:
+            if total <= quota * self.__LOW_WATERMARK:
+                break
+            try:
+                remove(*args)
+                total -= count
+                (area_count, area_bytes) = usage[area]
+                usage[area] = (area_count - 1, area_bytes - count)
+                compact |= area == "artwork"
+            except Exception as e:
+                print("CacheManager::__evict():", e, args)
+        # Removed rows only free space once database is compacted
+        if compact:
+            self.__artwork.compact()
+
+    def __on_timeout(self):
+        """
+            Check caches and schedule next check
+        """
+        self.check()
+        GLib.timeout_add_seconds(self.__CHECK_INTERVAL, self.__on_timeout)
+
+    def __on_disk_cache_size_changed(self, settings, value):
+        """
+            Enforce new quota
+            @param settings as Gio.Settings
+            @param value as GLib.Variant
+        """
+        self.check()
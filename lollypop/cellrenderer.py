@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, Gdk, GObject, GdkPixbuf
+from gi.repository import Gtk, Gdk, Gio, GLib, GObject, GdkPixbuf
 
 from math import pi
 
@@ -24,13 +24,37 @@ class CellRendererAlbum(Gtk.CellRenderer):
 
     def __init__(self):
         Gtk.CellRenderer.__init__(self)
+        self.__widget = None
+        self.__signal_id = None
+        # Surfaces by (album id, scale), None while loading
+        self.__surfaces = {}
+        self.__cancellable = Gio.Cancellable()
 
     def do_render(self, ctx, widget, background_area, cell_area, flags):
         if self.album == Type.NONE:
             return
-        surface = Lp().art.get_album_artwork(Album(self.album),
+        if widget is not self.__widget:
+            self.__widget = widget
+            widget.connect("unmap", self.__on_unmap)
+            widget.connect("destroy", self.__on_destroy)
+            self.__signal_id = Lp().art.connect("album-artwork-changed",
+                                                self.__on_artwork_changed,
+                                                widget)
+        key = (self.album, widget.get_scale_factor())
+        if key not in self.__surfaces:
+            self.__surfaces[key] = None
+            # Callback run now if artwork in cache
+            Lp().art.get_album_artwork_async(Album(self.album),
                                              ArtSize.MEDIUM,
-                                             widget.get_scale_factor())
+                                             key[1],
+                                             self.__cancellable,
+                                             GLib.PRIORITY_DEFAULT,
+                                             self.__on_album_artwork,
+                                             key,
+                                             widget)
+        surface = self.__surfaces[key]
+        if surface is None:
+            return
         width = surface.get_width()
         height = surface.get_height()
         # If cover smaller than wanted size, translate
@@ -68,6 +92,47 @@ class CellRendererAlbum(Gtk.CellRenderer):
     def do_get_preferred_height(self, widget):
         return self.do_get_preferred_width(widget)
 
+    def __on_album_artwork(self, surface, key, widget):
+        """
+            Keep artwork and redraw widget
+            @param surface as cairo.Surface
+            @param key as (int, int)
+            @param widget as Gtk.Widget
+        """
+        self.__surfaces[key] = surface
+        widget.queue_draw()
+
+    def __on_artwork_changed(self, art, album_id, widget):
+        """
+            Reload artwork on next render
+            @param art as Art
+            @param album_id as int
+            @param widget as Gtk.Widget
+        """
+        for key in list(self.__surfaces.keys()):
+            if key[0] == album_id:
+                del self.__surfaces[key]
+        widget.queue_draw()
+
+    def __on_unmap(self, widget):
+        """
+            Cancel artwork loading, free surfaces
+            @param widget as Gtk.Widget
+        """
+        self.__cancellable.cancel()
+        self.__cancellable = Gio.Cancellable()
+        self.__surfaces = {}
+
+    def __on_destroy(self, widget):
+        """
+            Cancel artwork loading, disconnect signal
+            @param widget as Gtk.Widget
+        """
+        self.__on_unmap(widget)
+        if self.__signal_id is not None:
+            Lp().art.disconnect(self.__signal_id)
+            self.__signal_id = None
+
 
 class CellRendererArtist(Gtk.CellRendererText):
     rowid = GObject.Property(type=int)
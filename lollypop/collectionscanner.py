@@ -21,6 +21,9 @@ from lollypop.define import Lp
 from lollypop.sqlcursor import SqlCursor
 from lollypop.tagreader import TagReader
 from lollypop.database_history import History
+from lollypop.database_artwork import ArtworkDatabase
+from lollypop.objects import Album
+from lollypop.helper_task import TaskHelper
 from lollypop.utils import is_audio, is_pls, debug
 
 
@@ -44,6 +47,9 @@ class CollectionScanner(GObject.GObject, TagReader):
 
         self.__thread = None
         self.__history = None
+        self.__artwork = ArtworkDatabase()
+        # Album id: embedded artwork hash, scan only
+        self.__embedded = {}
         if Lp().settings.get_value("auto-update"):
             self.__inotify = Inotify()
         else:
@@ -86,10 +92,11 @@ class CollectionScanner(GObject.GObject, TagReader):
             Return all tracks/dirs for uris
             @param uris as string
             @return (track uri as [str], track dirs as [str],
-                     ignore dirs as [str])
+                     ignore dirs as [str], images as {dir uri: [str]})
         """
         tracks = []
         ignore_dirs = []
+        images = {}
         track_dirs = list(uris)
         walk_uris = list(uris)
         while walk_uris:
@@ -105,6 +112,7 @@ class CollectionScanner(GObject.GObject, TagReader):
                 print("CollectionScanner::__get_objects_for_uris():", e)
                 ignore_dirs.append(uri)
                 continue
+            images[uri] = []
             for info in infos:
                 f = infos.get_child(info)
                 child_uri = f.get_uri()
@@ -114,6 +122,8 @@ class CollectionScanner(GObject.GObject, TagReader):
                 elif info.get_file_type() == Gio.FileType.DIRECTORY:
                     track_dirs.append(child_uri)
                     walk_uris.append(child_uri)
+                elif Lp().art.is_image(info.get_name()):
+                    images[uri].append(info.get_name())
                 else:
                     try:
                         f = Gio.File.new_for_uri(child_uri)
@@ -131,7 +141,7 @@ class CollectionScanner(GObject.GObject, TagReader):
             # Ensure user is not doing something bad
             if empty and uri in uris:
                 ignore_dirs.append(uri)
-        return (tracks, track_dirs, ignore_dirs)
+        return (tracks, track_dirs, ignore_dirs, images)
 
     def __update_progress(self, current, total):
         """
@@ -149,6 +159,9 @@ class CollectionScanner(GObject.GObject, TagReader):
         self.emit("scan-finished")
         # Update max count value
         Lp().albums.update_max_count()
+        # Scanned tracks got new ids
+        helper = TaskHelper()
+        helper.run(Lp().playlists.resolve_track_ids)
         if Lp().settings.get_value("artist-artwork"):
             Lp().art.cache_artists_info()
 
@@ -161,8 +174,8 @@ class CollectionScanner(GObject.GObject, TagReader):
         if self.__history is None:
             self.__history = History()
         mtimes = Lp().tracks.get_mtimes()
-        (new_tracks, new_dirs, ignore_dirs) = self.__get_objects_for_uris(
-                                                                         uris)
+        (new_tracks, new_dirs,
+         ignore_dirs, images) = self.__get_objects_for_uris(uris)
         orig_tracks = Lp().tracks.get_uris(ignore_dirs)
         was_empty = len(orig_tracks) == 0
 
@@ -177,10 +190,16 @@ class CollectionScanner(GObject.GObject, TagReader):
                 if d.startswith("file://"):
                     self.__inotify.add_monitor(d)
 
-        with SqlCursor(Lp().db) as sql:
+        self.__embedded = {}
+        artwork_cursor = SqlCursor(self.__artwork)
+        with SqlCursor(Lp().db) as sql, artwork_cursor as artwork_sql:
             i = 0
             # Look for new files/modified files
             try:
+                # Index image files for artwork lookups
+                Lp().images.clear()
+                for (folder, names) in images.items():
+                    Lp().images.set(folder, names)
                 to_add = []
                 for uri in new_tracks:
                     if self.__thread is None:
@@ -225,7 +244,9 @@ class CollectionScanner(GObject.GObject, TagReader):
                         self.__add2db(uri, mtime)
                     except Exception as e:
                         print("CollectionScanner::__scan(add):", e, uri)
+                self.__set_embedded_artwork()
                 sql.commit()
+                artwork_sql.commit()
             except Exception as e:
                 print("CollectionScanner::__scan():", e)
         GLib.idle_add(self.__finish)
@@ -304,6 +325,13 @@ class CollectionScanner(GObject.GObject, TagReader):
                                                uri, loved, album_pop,
                                                album_rate, mtime)
 
+        # Keep first embedded artwork found for album, unchanged tracks
+        # are not read, so never map albums without artwork
+        if album_id not in self.__embedded:
+            data = self.get_artwork(tags)
+            if data is not None:
+                self.__embedded[album_id] = self.__artwork.add_embedded(data)
+
         genre_ids = self.add_genres(genres)
 
         # Add track to db
@@ -320,12 +348,31 @@ class CollectionScanner(GObject.GObject, TagReader):
         if new_album:
             with SqlCursor(Lp().db) as sql:
                 sql.commit()
+            GLib.idle_add(self.emit, "album-updated", album_id, False)
         for genre_id in genre_ids:
             GLib.idle_add(self.emit, "genre-updated", genre_id, True)
         for artist_id in new_artist_ids:
             GLib.idle_add(self.emit, "artist-updated", artist_id, True)
         return track_id
 
+    def __set_embedded_artwork(self):
+        """
+            Map scanned albums to their embedded artwork
+            @warning: commit needed
+        """
+        for album_id, digest in self.__embedded.items():
+            try:
+                album = Album(album_id)
+                if album.id is None or album.name is None:
+                    continue
+                self.__artwork.set_album_embedded(
+                                        Lp().art.get_album_cache_name(album),
+                                        digest)
+            except Exception as e:
+                print("CollectionScanner::__set_embedded_artwork():", e)
+        self.__artwork.clean_embedded()
+        self.__embedded = {}
+
     def __del_from_db(self, uri):
         """
             Delete track from db
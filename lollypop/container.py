@@ -38,6 +38,11 @@ class Container:
             Init container
         """
         self.__pulse_timeout = None
+        # Artists updated by scanner, applied in batch
+        self.__updated_artist_ids = set()
+        self.__artists_timeout_id = None
+        # Visible view and its cache key, key is None if not cacheable
+        self.__current = (None, None)
         # Index will start at -VOLUMES
         self.__devices = {}
         self.__devices_index = Type.DEVICES
@@ -212,6 +217,7 @@ class Container:
         """
             Reload current view
         """
+        self.__invalidate_views()
         values_two = self.__list_two.selected_ids
         values_one = self.__list_one.selected_ids
         if not values_one:
@@ -404,6 +410,7 @@ class Container:
         Lp().scanner.connect("scan-finished", self.on_scan_finished)
         Lp().scanner.connect("genre-updated", self.__on_genre_updated)
         Lp().scanner.connect("artist-updated", self.__on_artist_updated)
+        Lp().scanner.connect("album-updated", self.__on_album_updated)
 
     def __update_playlists(self, playlists, playlist_id):
         """
@@ -411,6 +418,8 @@ class Container:
             @param playlists as Playlists
             @param playlist_id as int
         """
+        self.__invalidate_views(lambda key: key[0] == "playlists" and
+                                playlist_id in key[2])
         ids = self.__list_one.selected_ids
         if ids and ids[0] == Type.PLAYLISTS:
             if Lp().playlists.exists(playlist_id):
@@ -484,8 +493,8 @@ class Container:
             @thread safe
         """
         def load():
-            artists = Lp().artists.get(genre_ids)
-            compilations = Lp().albums.get_compilation_ids(genre_ids)
+            artists = Lp().facets.get_artists(genre_ids)
+            compilations = Lp().facets.get_compilation_ids(genre_ids)
             return (artists, compilations)
 
         def setup(artists, compilations):
@@ -529,12 +538,53 @@ class Container:
 
     def __stop_current_view(self):
         """
-            Stop current view
+            Stop current view, keep it if cacheable
         """
         child = self.__stack.get_visible_child()
         if child is not None:
-            if hasattr(child, "stop"):
+            (key, view) = self.__current
+            if key is not None and child == view:
+                self.__stack.cache_view(key, child)
+            elif hasattr(child, "stop"):
                 child.stop()
+        self.__current = (None, None)
+
+    def __get_view_key(self, kind, genre_ids, artist_ids):
+        """
+            Get key for caching view
+            @param kind as str
+            @param genre ids as [int]
+            @param artist ids as [int]
+            @return tuple or None if content changes without notification
+        """
+        dynamic = [Type.POPULARS, Type.RECENTS, Type.NEVER, Type.RANDOMS]
+        # Loved playlist is notified, loved albums are not
+        if kind != "playlists":
+            dynamic.append(Type.LOVED)
+        for object_id in genre_ids + artist_ids:
+            if object_id in dynamic:
+                return None
+        return (kind, tuple(genre_ids), tuple(artist_ids))
+
+    def __show_view(self, key, view):
+        """
+            Show view, remember key for caching
+            @param key as tuple
+            @param view as View
+        """
+        self.__current = (key, view)
+        self.__stack.set_visible_child(view)
+        self.__stack.clean_old_views(view)
+
+    def __invalidate_views(self, match=None):
+        """
+            Forget cached views, current view will not be cached
+            @param match as function(key) returning bool, None for all
+        """
+        (key, view) = self.__current
+        if key is not None and (match is None or match(key)):
+            self.__current = (None, None)
+        self.__stack.invalidate_views(match)
 
     def __update_view_device(self, device_id):
         """
@@ -568,22 +618,24 @@ class Container:
         """
         def load():
             if genre_ids and genre_ids[0] == Type.ALL:
-                albums = Lp().albums.get_ids(artist_ids, [])
+                albums = Lp().facets.get_album_ids(artist_ids, [])
             else:
                 albums = []
                 if artist_ids and artist_ids[0] == Type.COMPILATIONS:
-                    albums += Lp().albums.get_compilation_ids(genre_ids)
-                albums += Lp().albums.get_ids(artist_ids, genre_ids)
+                    albums += Lp().facets.get_compilation_ids(genre_ids)
+                albums += Lp().facets.get_album_ids(artist_ids, genre_ids)
             return albums
         from lollypop.view_artist import ArtistView
         self.__stop_current_view()
-        view = ArtistView(artist_ids, genre_ids)
-        loader = Loader(target=load, view=view)
-        loader.start()
-        view.show()
-        self.__stack.add(view)
-        self.__stack.set_visible_child(view)
-        self.__stack.clean_old_views(view)
+        key = self.__get_view_key("artists", genre_ids, artist_ids)
+        view = self.__stack.pop_cached_view(key)
+        if view is None:
+            view = ArtistView(artist_ids, genre_ids)
+            loader = Loader(target=load, view=view)
+            loader.start()
+            view.show()
+            self.__stack.add(view)
+        self.__show_view(key, view)
 
     def __update_view_albums(self, genre_ids, artist_ids):
         """
@@ -597,9 +649,9 @@ class Container:
             if genre_ids and genre_ids[0] == Type.ALL:
                 if is_compilation or\
                         Lp().settings.get_value("show-compilations"):
-                    items = Lp().albums.get_compilation_ids()
+                    items = Lp().facets.get_compilation_ids()
                 if not is_compilation:
-                    items += Lp().albums.get_ids()
+                    items += Lp().facets.get_album_ids()
             elif genre_ids and genre_ids[0] == Type.POPULARS:
                 items = Lp().albums.get_rated()
                 count = 100 - len(items)
@@ -617,20 +669,23 @@ class Container:
             else:
                 if is_compilation or\
                         Lp().settings.get_value("show-compilations"):
-                    items = Lp().albums.get_compilation_ids(genre_ids)
+                    items = Lp().facets.get_compilation_ids(genre_ids)
                 if not is_compilation:
-                    items += Lp().albums.get_ids([], genre_ids)
+                    items += Lp().facets.get_album_ids([], genre_ids)
             return items
 
         from lollypop.view_albums import AlbumsView
         self.__stop_current_view()
-        view = AlbumsView(genre_ids, artist_ids)
-        loader = Loader(target=load, view=view)
-        loader.start()
-        view.show()
-        self.__stack.add(view)
-        self.__stack.set_visible_child(view)
-        self.__stack.clean_old_views(view)
+        key = self.__get_view_key("albums", genre_ids, artist_ids)
+        view = self.__stack.pop_cached_view(key)
+        if view is None:
+            view = AlbumsView(genre_ids, artist_ids)
+            view.set_load_func(load)
+            loader = Loader(target=load, view=view)
+            loader.start()
+            view.show()
+            self.__stack.add(view)
+        self.__show_view(key, view)
 
     def __update_view_playlists(self, playlist_ids=[]):
         """
@@ -660,20 +715,23 @@ class Container:
             return track_ids
 
         self.__stop_current_view()
-        view = None
+        key = None
         if playlist_ids:
-            from lollypop.view_playlists import PlaylistsView
-            view = PlaylistsView(playlist_ids)
-            loader = Loader(target=load, view=view)
-            loader.start()
-        else:
-            from lollypop.view_playlists import PlaylistsManageView
-            view = PlaylistsManageView(Type.NONE, [], [], False)
-            view.populate()
-        view.show()
-        self.__stack.add(view)
-        self.__stack.set_visible_child(view)
-        self.__stack.clean_old_views(view)
+            key = self.__get_view_key("playlists", [], playlist_ids)
+        view = self.__stack.pop_cached_view(key)
+        if view is None:
+            if playlist_ids:
+                from lollypop.view_playlists import PlaylistsView
+                view = PlaylistsView(playlist_ids)
+                loader = Loader(target=load, view=view)
+                loader.start()
+            else:
+                from lollypop.view_playlists import PlaylistsManageView
+                view = PlaylistsManageView(Type.NONE, [], [], False)
+                view.populate()
+            view.show()
+            self.__stack.add(view)
+        self.__show_view(key, view)
 
     def __update_view_radios(self):
         """
@@ -681,12 +739,14 @@ class Container:
         """
         from lollypop.view_radios import RadiosView
         self.__stop_current_view()
-        view = RadiosView()
-        view.populate()
-        view.show()
-        self.__stack.add(view)
-        self.__stack.set_visible_child(view)
-        self.__stack.clean_old_views(view)
+        key = self.__get_view_key("radios", [], [])
+        view = self.__stack.pop_cached_view(key)
+        if view is None:
+            view = RadiosView()
+            view.populate()
+            view.show()
+            self.__stack.add(view)
+        self.__show_view(key, view)
 
     def __add_device(self, mount, show=False):
         """
@@ -822,27 +882,65 @@ class Container:
                 if genre_id not in genre_ids:
                     self.__list_one.remove_value(genre_id)
 
+    def __on_album_updated(self, scanner, album_id, destroy):
+        """
+            Forget views showing album
+            @param scanner as CollectionScanner
+            @param album id as int
+            @param destroy as bool
+        """
+        genre_ids = set(Lp().albums.get_genre_ids(album_id))
+        artist_ids = set(Lp().albums.get_artist_ids(album_id))
+
+        def match(key):
+            (kind, key_genre_ids, key_artist_ids) = key
+            if kind not in ["albums", "artists"]:
+                return False
+            # Album removed from db, we can't know
+            elif not genre_ids and not artist_ids:
+                return True
+            elif key_artist_ids:
+                return bool(artist_ids & set(key_artist_ids))
+            elif not key_genre_ids or key_genre_ids[0] == Type.ALL:
+                return True
+            return bool(genre_ids & set(key_genre_ids))
+        self.__invalidate_views(match)
+
     def __on_artist_updated(self, scanner, artist_id, add):
         """
-            Add artist to artist list
+            Queue artist for artist list update
             @param scanner as CollectionScanner
             @param artist id as int
             @param add as bool
         """
-        artist_name = Lp().artists.get_name(artist_id)
-        sortname = Lp().artists.get_sortname(artist_id)
+        self.__updated_artist_ids.add(artist_id)
+        if self.__artists_timeout_id is None:
+            self.__artists_timeout_id = GLib.timeout_add(
+                                                 250,
+                                                 self.__update_list_artist_ids)
+
+    def __update_list_artist_ids(self):
+        """
+            Add or remove updated artists from artist list, in one pass
+        """
+        self.__artists_timeout_id = None
+        updated_ids = self.__updated_artist_ids
+        self.__updated_artist_ids = set()
         if self.__show_genres:
             l = self.__list_two
-            artist_ids = Lp().artists.get_ids(self.__list_one.selected_ids)
+            artist_ids = Lp().facets.get_artist_ids(
+                                                self.__list_one.selected_ids)
         else:
             l = self.__list_one
-            artist_ids = Lp().artists.get_ids()
-        if add:
-            if artist_id in artist_ids:
-                l.add_value((artist_id, artist_name, sortname))
-        else:
-            if artist_id not in artist_ids:
-                l.remove_value(artist_id)
+            artist_ids = Lp().facets.get_artist_ids()
+        artist_ids = set(artist_ids)
+        values = []
+        for artist_id in updated_ids & artist_ids:
+            values.append((artist_id,
+                           Lp().artists.get_name(artist_id),
+                           Lp().artists.get_sortname(artist_id)))
+        l.remove_values(list(updated_ids - artist_ids))
+        l.add_values(values)
 
     def __on_mount_added(self, vm, mount):
         """
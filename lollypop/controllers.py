@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import GLib, Gst
+from gi.repository import Gio, GLib, Gst
 
 from gettext import gettext as _
 
@@ -337,14 +337,15 @@ class InfoController:
         self._infobox = None
         self._spinner = None
         self._artsize = artsize
+        self._artwork_cancellable = Gio.Cancellable()
+        self.connect("destroy", self.__on_destroy)
 
     def on_current_changed(self, player):
         """
             Update toolbar on current changed
             @param player as Player
         """
-        art = None
-
+        self._cancel_artwork()
         if player.current_track.id is None:
             if self._infobox is not None:
                 self._infobox.hide()
@@ -366,23 +367,21 @@ class InfoController:
                                    ", ".join(player.current_track.artists),
                                    self._artsize,
                                    self.get_scale_factor())
+            self.__set_cover(art, player.current_track.album)
         elif player.current_track.id == Type.EXTERNALS:
             art = Lp().art.get_album_artwork2(
                     player.current_track.uri,
                     self._artsize,
                     self.get_scale_factor())
-        elif player.current_track.id is not None:
-            art = Lp().art.get_album_artwork(
-                                   player.current_track.album,
-                                   self._artsize,
-                                   self.get_scale_factor())
-        if art is not None:
-            self._cover.set_from_surface(art)
-            del art
-            self._cover.set_tooltip_text(player.current_track.album.name)
-            self._cover.show()
+            self.__set_cover(art, player.current_track.album)
         else:
-            self._cover.hide()
+            Lp().art.get_album_artwork_async(player.current_track.album,
+                                             self._artsize,
+                                             self.get_scale_factor(),
+                                             self._artwork_cancellable,
+                                             GLib.PRIORITY_DEFAULT,
+                                             self.__set_cover,
+                                             player.current_track.album)
         if self._infobox is not None:
             self._infobox.show()
 
@@ -392,3 +391,36 @@ class InfoController:
             Art size as int
         """
         return self._artsize
+
+#######################
+# PROTECTED           #
+#######################
+    def _cancel_artwork(self):
+        """
+            Cancel pending artwork loading
+        """
+        self._artwork_cancellable.cancel()
+        self._artwork_cancellable = Gio.Cancellable()
+
+#######################
+# PRIVATE             #
+#######################
+    def __set_cover(self, surface, album):
+        """
+            Set cover for album
+            @param surface as cairo.Surface/None
+            @param album as Album
+        """
+        if surface is not None:
+            self._cover.set_from_surface(surface)
+            self._cover.set_tooltip_text(album.name)
+            self._cover.show()
+        else:
+            self._cover.hide()
+
+    def __on_destroy(self, widget):
+        """
+            Cancel artwork loading
+            @param widget as Gtk.Widget
+        """
+        self._artwork_cancellable.cancel()
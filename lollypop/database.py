@@ -83,6 +83,11 @@ class Database:
                                                 album_id)"""
     __create_track_genres_idx = """CREATE index idx_tg ON track_genres(
                                                 track_id)"""
+    __create_image_folders = """CREATE TABLE image_folders (
+                                                uri TEXT PRIMARY KEY)"""
+    __create_images = """CREATE TABLE images (folder TEXT NOT NULL,
+                                              name TEXT NOT NULL)"""
+    __create_images_idx = """CREATE index idx_if ON images(folder)"""
 
     def __init__(self):
         """
@@ -110,6 +115,9 @@ class Database:
                     sql.execute(self.__create_track_artists_idx)
                     sql.execute(self.__create_album_genres_idx)
                     sql.execute(self.__create_track_genres_idx)
+                    sql.execute(self.__create_image_folders)
+                    sql.execute(self.__create_images)
+                    sql.execute(self.__create_images_idx)
                     sql.commit()
                     Lp().settings.set_value("db-version",
                                             GLib.Variant("i", upgrade.count()))
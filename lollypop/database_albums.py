@@ -727,6 +727,19 @@ class AlbumsDatabase:
                 return v[0]
             return 0
 
+    def get_ids_by_uri(self, uri):
+        """
+            Get album ids for uri
+            @param uri as str
+            @return [int]
+        """
+        with SqlCursor(Lp().db) as sql:
+            result = sql.execute("SELECT rowid\
+                                  FROM albums\
+                                  WHERE uri=?",
+                                 (uri,))
+            return list(itertools.chain(*result))
+
     def get_ids(self, artist_ids=[], genre_ids=[]):
         """
             Get albums ids
@@ -927,6 +940,38 @@ class AlbumsDatabase:
             result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
+    def search_rows(self, string, artist_ids, year, limit=25):
+        """
+            Search for albums with name looking like string,
+            for artists or for year
+            @param string as str
+            @param artist ids as [int]
+            @param year as int/None
+            @param limit as int, for albums with name looking like string
+            @return [(album id as int, name as str, year as int,
+                      artist id as int, artist name as str/None)],
+                    one row per album artist
+        """
+        with SqlCursor(Lp().db) as sql:
+            filters = ("%" + noaccents(string) + "%", limit) +\
+                tuple(artist_ids) + (year,)
+            request = "SELECT albums.rowid, albums.name, albums.year,\
+                       album_artists.artist_id, artists.name\
+                       FROM albums JOIN album_artists\
+                       ON album_artists.album_id=albums.rowid\
+                       LEFT JOIN artists\
+                       ON artists.rowid=album_artists.artist_id\
+                       WHERE albums.rowid IN (\
+                            SELECT rowid FROM albums\
+                            WHERE noaccents(name) LIKE ? LIMIT ?)\
+                       OR albums.rowid IN (\
+                            SELECT album_id FROM album_artists WHERE ("
+            for artist_id in artist_ids:
+                request += "artist_id=? OR "
+            request += "1=0)) OR albums.year=?"
+            result = sql.execute(request, filters)
+            return list(result)
+
     def calculate_artist_ids(self, album_id):
         """
             Calculate artist ids based on tracks
@@ -227,7 +227,8 @@ class ArtistsDatabase:
             @return Array of id as int
         """
         with SqlCursor(Lp().db) as sql:
-            result = sql.execute("SELECT artists.rowid FROM artists, albums,\
+            result = sql.execute("SELECT DISTINCT artists.rowid\
+                                  FROM artists, albums,\
                                   album_artists\
                                   WHERE noaccents(artists.name) LIKE ?\
                                   AND album_artists.artist_id=artists.rowid\
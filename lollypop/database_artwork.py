@@ -0,0 +1,234 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from hashlib import sha1
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+
+
+class ArtworkDatabase:
+    """
+        Encoded artwork, one blob per album and size
+        Embedded artwork is stored once per content
+    """
+    __DB_PATH = GLib.get_user_cache_dir() + "/lollypop_artwork.db"
+    __create_artwork = """CREATE TABLE artwork (
+                          name TEXT NOT NULL,
+                          size INT NOT NULL,
+                          data BLOB NOT NULL,
+                          atime INT NOT NULL DEFAULT 0,
+                          PRIMARY KEY (name, size))"""
+    # Access time is only updated once a day
+    __ATIME_DELAY = 24 * 3600
+    # Artwork embedded in tags, stored once per content
+    __create_embedded = """CREATE TABLE embedded (
+                           hash TEXT PRIMARY KEY,
+                           data BLOB NOT NULL)"""
+    # Only albums with embedded artwork found while scanning
+    __create_album_embedded = """CREATE TABLE album_embedded (
+                                 name TEXT PRIMARY KEY,
+                                 hash TEXT NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init artwork database
+        """
+        # Create db schema
+        for create in [self.__create_artwork,
+                       self.__create_embedded,
+                       self.__create_album_embedded,
+                       # Databases created without access time
+                       "ALTER TABLE artwork\
+                        ADD atime INT NOT NULL DEFAULT 0"]:
+            try:
+                with SqlCursor(self) as sql:
+                    sql.execute(create)
+                    sql.commit()
+            except:
+                pass
+
+    def add(self, name, size, data):
+        """
+            Store artwork, replacing previous one
+            @param name as str
+            @param size as int
+            @param data as bytes
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR REPLACE INTO artwork\
+                         (name, size, data, atime) VALUES (?, ?, ?, ?)",
+                        (name, size, sqlite3.Binary(data), int(time())))
+            sql.commit()
+
+    def get(self, name, size):
+        """
+            Get artwork
+            @param name as str
+            @param size as int
+            @return bytes or None
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT data, atime FROM artwork\
+                                  WHERE name=? AND size=?", (name, size))
+            v = result.fetchone()
+            if v is None:
+                return None
+            now = int(time())
+            if v[1] < now - self.__ATIME_DELAY:
+                sql.execute("UPDATE artwork SET atime=?\
+                             WHERE name=? AND size=?", (now, name, size))
+                sql.commit()
+            return v[0]
+
+    def exists(self, name, size):
+        """
+            True if artwork is stored
+            @param name as str
+            @param size as int
+            @return bool
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT 1 FROM artwork\
+                                  WHERE name=? AND size=?", (name, size))
+            return result.fetchone() is not None
+
+    def add_embedded(self, data):
+        """
+            Store embedded artwork if not already known
+            @param data as bytes
+            @return hash as str
+            @warning: commit needed
+        """
+        digest = sha1(data).hexdigest()
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR IGNORE INTO embedded (hash, data)\
+                         VALUES (?, ?)", (digest, sqlite3.Binary(data)))
+        return digest
+
+    def set_album_embedded(self, name, digest):
+        """
+            Set embedded artwork for album
+            @param name as str
+            @param digest as str
+            @warning: commit needed
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR REPLACE INTO album_embedded (name, hash)\
+                         VALUES (?, ?)", (name, digest))
+
+    def get_album_embedded(self, name):
+        """
+            Get embedded artwork for album
+            @param name as str
+            @return bytes or None if unknown
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT album_embedded.hash, embedded.data\
+                                  FROM album_embedded LEFT JOIN embedded\
+                                  ON album_embedded.hash=embedded.hash\
+                                  WHERE album_embedded.name=?", (name,))
+            v = result.fetchone()
+            if v is None:
+                return None
+            return v[1]
+
+    def clean_embedded(self):
+        """
+            Remove embedded artwork not used by any album
+            @warning: commit needed
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM embedded WHERE hash NOT IN (\
+                            SELECT hash FROM album_embedded)")
+
+    def remove(self, name):
+        """
+            Remove artwork at all sizes
+            Embedded artwork is kept, no need to decode tags again
+            @param name as str
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM artwork WHERE name=?", (name,))
+            sql.commit()
+
+    def get_entries(self):
+        """
+            Get cached artwork
+            @return [(name as str, size as int, bytes as int, atime as int)]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT name, size, LENGTH(data), atime\
+                                  FROM artwork")
+            return list(result)
+
+    def remove_size(self, name, size):
+        """
+            Remove artwork at size
+            @param name as str
+            @param size as int
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM artwork WHERE name=? AND size=?",
+                        (name, size))
+            sql.commit()
+
+    def get_embedded_usage(self):
+        """
+            Get embedded artwork usage
+            @return (count as int, bytes as int)
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT COUNT(*), TOTAL(LENGTH(data))\
+                                  FROM embedded")
+            v = result.fetchone()
+            if v is not None:
+                return (v[0], int(v[1]))
+            return (0, 0)
+
+    def clear(self):
+        """
+            Remove all artwork and compact database
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM artwork")
+            sql.commit()
+        self.compact()
+
+    def compact(self):
+        """
+            Give space used by removed artwork back to filesystem
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("VACUUM")
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
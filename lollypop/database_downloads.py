@@ -0,0 +1,120 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+
+
+class DownloadsDatabase:
+    """
+        Pending downloads and web services without results
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/downloads.db" % __LOCAL_PATH
+    __create_jobs = """CREATE TABLE jobs (
+                       kind INT NOT NULL,
+                       key TEXT NOT NULL,
+                       PRIMARY KEY (kind, key))"""
+    __create_misses = """CREATE TABLE misses (
+                         service TEXT NOT NULL,
+                         key TEXT NOT NULL,
+                         mtime INT NOT NULL,
+                         PRIMARY KEY (service, key))"""
+
+    def __init__(self):
+        """
+            Init downloads database
+        """
+        # Create db schema
+        try:
+            with SqlCursor(self) as sql:
+                sql.execute(self.__create_jobs)
+                sql.execute(self.__create_misses)
+                sql.commit()
+        except:
+            pass
+
+    def set_jobs(self, jobs):
+        """
+            Replace pending jobs
+            @param jobs as [(int, str)]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM jobs")
+            sql.executemany("INSERT OR IGNORE INTO jobs (kind, key)\
+                             VALUES (?, ?)", jobs)
+            sql.commit()
+
+    def pop_jobs(self):
+        """
+            Get and remove pending jobs
+            @return [(int, str)]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT kind, key FROM jobs")
+            jobs = list(result)
+            sql.execute("DELETE FROM jobs")
+            sql.commit()
+            return jobs
+
+    def add_miss(self, service, key):
+        """
+            Remember service has no result for key
+            @param service as str
+            @param key as str
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR REPLACE INTO misses (service, key, mtime)\
+                         VALUES (?, ?, ?)", (service, key, int(time())))
+            sql.commit()
+
+    def is_miss(self, service, key, ttl):
+        """
+            True if service had no result for key in last ttl seconds
+            @param service as str
+            @param key as str
+            @param ttl as int
+            @return bool
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT mtime FROM misses\
+                                  WHERE service=? AND key=? AND mtime>?",
+                                 (service, key, int(time()) - ttl))
+            return result.fetchone() is not None
+
+    def clean_misses(self, ttl):
+        """
+            Remove misses older than ttl seconds
+            @param ttl as int
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM misses WHERE mtime<=?",
+                        (int(time()) - ttl,))
+            sql.commit()
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
@@ -0,0 +1,77 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import Lp
+
+
+class ImagesDatabase:
+    """
+        Image files available in collection folders
+    """
+
+    def __init__(self):
+        """
+            Init images database object
+        """
+        pass
+
+    def set(self, folder, names):
+        """
+            Set image files for folder, replacing previous ones
+            @param folder uri as str
+            @param names as [str]
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("DELETE FROM images WHERE folder=?", (folder,))
+            sql.execute("INSERT OR IGNORE INTO image_folders (uri)\
+                         VALUES (?)", (folder,))
+            sql.executemany("INSERT INTO images (folder, name)\
+                             VALUES (?, ?)",
+                            [(folder, name) for name in names])
+
+    def get(self, folder):
+        """
+            Get image files for folder
+            @param folder uri as str
+            @return [str] or None if folder is not indexed
+        """
+        with SqlCursor(Lp().db) as sql:
+            result = sql.execute("SELECT uri FROM image_folders\
+                                  WHERE uri=?", (folder,))
+            if result.fetchone() is None:
+                return None
+            result = sql.execute("SELECT name FROM images\
+                                  WHERE folder=? ORDER BY rowid", (folder,))
+            return list(itertools.chain(*result))
+
+    def forget(self, folder):
+        """
+            Remove folder from index
+            @param folder uri as str
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("DELETE FROM images WHERE folder=?", (folder,))
+            sql.execute("DELETE FROM image_folders WHERE uri=?", (folder,))
+
+    def clear(self):
+        """
+            Remove all folders from index
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("DELETE FROM images")
+            sql.execute("DELETE FROM image_folders")
@@ -0,0 +1,148 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+
+
+class InfoDatabase:
+    """
+        Catalogue of InfoCache entries
+        An entry without content and artwork is a negative result
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/info.db" % __LOCAL_PATH
+    __create_info = """CREATE TABLE info (
+                       prefix TEXT NOT NULL,
+                       service TEXT NOT NULL,
+                       mtime INT NOT NULL,
+                       content BOOLEAN NOT NULL,
+                       artwork BOOLEAN NOT NULL,
+                       size INT NOT NULL,
+                       PRIMARY KEY (prefix, service))"""
+
+    def __init__(self):
+        """
+            Init info database
+        """
+        # Create db schema
+        try:
+            with SqlCursor(self) as sql:
+                sql.execute(self.__create_info)
+                sql.commit()
+        except:
+            pass
+
+    def set(self, prefix, service, content, artwork, size, mtime=None):
+        """
+            Set entry
+            @param prefix as str
+            @param service as str
+            @param content as bool
+            @param artwork as bool
+            @param size as int
+            @param mtime as int, now if None
+            @thread safe
+        """
+        if mtime is None:
+            mtime = int(time())
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR REPLACE INTO info\
+                         (prefix, service, mtime, content, artwork, size)\
+                         VALUES (?, ?, ?, ?, ?, ?)",
+                        (prefix, service, mtime, content, artwork, size))
+            sql.commit()
+
+    def get(self, prefix, service):
+        """
+            Get entry
+            @param prefix as str
+            @param service as str
+            @return (mtime as int, content as bool,
+                     artwork as bool, size as int) or None
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT mtime, content, artwork, size\
+                                  FROM info WHERE prefix=? AND service=?",
+                                 (prefix, service))
+            v = result.fetchone()
+            if v is None:
+                return None
+            return (v[0], bool(v[1]), bool(v[2]), v[3])
+
+    def get_services(self, prefix):
+        """
+            Get entries for prefix
+            @param prefix as str
+            @return {service as str: (mtime as int, content as bool,
+                                      artwork as bool, size as int)}
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT service, mtime, content,\
+                                  artwork, size\
+                                  FROM info WHERE prefix=?", (prefix,))
+            services = {}
+            for (service, mtime, content, artwork, size) in result:
+                services[service] = (mtime, bool(content), bool(artwork), size)
+            return services
+
+    def exists(self, prefix):
+        """
+            True if prefix has entries
+            @param prefix as str
+            @return bool
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT 1 FROM info WHERE prefix=?",
+                                 (prefix,))
+            return result.fetchone() is not None
+
+    def remove(self, prefix, service):
+        """
+            Remove entry
+            @param prefix as str
+            @param service as str
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM info WHERE prefix=? AND service=?",
+                        (prefix, service))
+            sql.commit()
+
+    def count(self):
+        """
+            Count entries
+            @return int
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT COUNT(*) FROM info")
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return 0
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
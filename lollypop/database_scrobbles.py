@@ -0,0 +1,114 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+
+from lollypop.sqlcursor import SqlCursor
+
+
+class ScrobblesDatabase:
+    """
+        Scrobbles waiting to be submitted
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/scrobbles.db" % __LOCAL_PATH
+    __create_scrobbles = """CREATE TABLE scrobbles (
+                            id INTEGER PRIMARY KEY,
+                            service TEXT NOT NULL,
+                            artist TEXT NOT NULL,
+                            album TEXT NOT NULL,
+                            title TEXT NOT NULL,
+                            timestamp INT NOT NULL,
+                            UNIQUE (service, artist, title, timestamp))"""
+
+    def __init__(self):
+        """
+            Init scrobbles database
+        """
+        # Create db schema
+        try:
+            with SqlCursor(self) as sql:
+                sql.execute(self.__create_scrobbles)
+                sql.commit()
+        except:
+            pass
+
+    def add(self, service, artist, album, title, timestamp):
+        """
+            Queue a scrobble, duplicates are ignored
+            @param service as str
+            @param artist as str
+            @param album as str
+            @param title as str
+            @param timestamp as int
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR IGNORE INTO scrobbles\
+                         (service, artist, album, title, timestamp)\
+                         VALUES (?, ?, ?, ?, ?)",
+                        (service, artist, album, title, timestamp))
+            sql.commit()
+
+    def get(self, service, limit=50):
+        """
+            Get oldest scrobbles for service
+            @param service as str
+            @param limit as int
+            @return [(id, artist, album, title, timestamp)]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT rowid, artist, album,\
+                                  title, timestamp\
+                                  FROM scrobbles\
+                                  WHERE service=?\
+                                  ORDER BY timestamp LIMIT ?",
+                                 (service, limit))
+            return list(result)
+
+    def remove(self, scrobble_ids):
+        """
+            Remove submitted scrobbles
+            @param scrobble ids as [int]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.executemany("DELETE FROM scrobbles WHERE rowid=?",
+                            [(scrobble_id,) for scrobble_id in scrobble_ids])
+            sql.commit()
+
+    def count(self, service):
+        """
+            Count scrobbles waiting for service
+            @param service as str
+            @return int
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT COUNT(*) FROM scrobbles\
+                                  WHERE service=?", (service,))
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return 0
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
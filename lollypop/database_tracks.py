@@ -687,6 +687,47 @@ Nous traitons le problème dès que possible (salle très occupée).
                                  ("%" + noaccents(searched) + "%",))
             return list(result)
 
+    def search_rows(self, searched, artist_ids, limit=25):
+        """
+            Search for tracks with name looking like searched
+            or with artists not being album artist
+            @param searched as str
+            @param artist ids as [int]
+            @param limit as int, for tracks with name looking like searched
+            @return [(track id as int, name as str, album id as int,
+                      artist id as int, artist name as str/None,
+                      album artist as bool)], one row per track artist
+        """
+        with SqlCursor(Lp().db) as sql:
+            filters = ("%" + noaccents(searched) + "%", limit) +\
+                tuple(artist_ids)
+            request = "SELECT tracks.rowid, tracks.name, tracks.album_id,\
+                       track_artists.artist_id, artists.name,\
+                       EXISTS (SELECT 1 FROM album_artists\
+                               WHERE artist_id=track_artists.artist_id\
+                               AND album_id=tracks.album_id)\
+                       FROM tracks JOIN track_artists\
+                       ON track_artists.track_id=tracks.rowid\
+                       LEFT JOIN artists\
+                       ON artists.rowid=track_artists.artist_id\
+                       WHERE tracks.rowid IN (\
+                            SELECT rowid FROM tracks\
+                            WHERE noaccents(name) LIKE ? LIMIT ?)\
+                       OR tracks.rowid IN (\
+                            SELECT t.rowid\
+                            FROM tracks AS t, track_artists AS ta\
+                            WHERE ta.track_id=t.rowid\
+                            AND NOT EXISTS (\
+                                SELECT 1 FROM album_artists\
+                                WHERE artist_id=ta.artist_id\
+                                AND album_id=t.album_id) AND ("
+            for artist_id in artist_ids:
+                request += "ta.artist_id=? OR "
+            request += "1=0))"
+            result = sql.execute(request, filters)
+            return [(row[0], row[1], row[2], row[3], row[4], bool(row[5]))
+                    for row in result]
+
     def search_track(self, artist, title):
         """
             Get track id for artist and title
@@ -59,6 +59,7 @@ class DatabaseUpgrade:
             21: self.__upgrade_21,
             22: self.__upgrade_22,
             23: self.__upgrade_23,
+            24: self.__upgrade_24,
                          }
 
     """
@@ -521,3 +522,15 @@ class DatabaseUpgrade:
             sql.execute("DROP TABLE track_genres")
             sql.execute("ALTER TABLE track_genres2 RENAME TO track_genres")
             sql.commit()
+
+    def __upgrade_24(self):
+        """
+            Add image files index
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("CREATE TABLE image_folders (\
+                                                uri TEXT PRIMARY KEY)")
+            sql.execute("CREATE TABLE images (folder TEXT NOT NULL,\
+                                              name TEXT NOT NULL)")
+            sql.execute("CREATE index idx_if ON images(folder)")
+            sql.commit()
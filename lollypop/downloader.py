@@ -14,12 +14,23 @@ from gi.repository import GLib, Soup
 
 import json
 from base64 import b64encode
+from queue import PriorityQueue
+from threading import Thread, Lock
 
 from lollypop.cache import InfoCache
 from lollypop.define import Lp, GOOGLE_API_ID, Type
 from lollypop.define import SPOTIFY_CLIENT_ID, SPOTIFY_SECRET
 from lollypop.utils import debug, get_network_available
 from lollypop.helper_task import TaskHelper
+from lollypop.helper_guard import GuardHelper
+from lollypop.database_downloads import DownloadsDatabase
+
+
+class ServiceError(Exception):
+    """
+        Web service did not answer
+    """
+    pass
 
 
 class Downloader:
@@ -31,27 +42,42 @@ class Downloader:
     except:
         Wikipedia = None
 
+    # Job kinds, also priorities
+    __ALBUM = 0
+    __ARTIST = 1
+    __WORKERS = 3
+    __MISS_TTL = 7 * 24 * 3600  # Seconds
+    # Minimal seconds between two requests
+    __INTERVALS = {"lastfm": 0.2,
+                   "spotify": 0.1,
+                   "deezer": 0.1,
+                   "wikipedia": 0.1}
+
     def __init__(self):
         """
             Init art downloader
         """
-        self.__albums_queue = []
-        self.__albums_history = []
-        self.__in_albums_download = False
+        # (kind, seq, key)
+        self.__jobs = PriorityQueue()
+        self.__jobs_lock = Lock()
+        # (kind, key)
+        self.__pending = set()
+        self.__workers = []
+        self.__seq = 0
         self.__cache_artists_running = False
+        self.__downloads = DownloadsDatabase()
+        self.__guards = {}
+        for (api, unused1, unused2) in InfoCache.WEBSERVICES:
+            self.__guards[api] = GuardHelper(self.__INTERVALS.get(api, 0.1))
+        GLib.idle_add(self.__restore_jobs)
 
     def cache_album_art(self, album_id):
         """
             Download album artwork
             @param album id as int
         """
-        if album_id in self.__albums_history:
-            return
         if get_network_available():
-            self.__albums_queue.append(album_id)
-            if not self.__in_albums_download:
-                helper = TaskHelper()
-                helper.run(self.__cache_albums_art)
+            self.__add_job(self.__ALBUM, str(album_id))
 
     def cache_artists_info(self):
         """
@@ -63,6 +89,17 @@ class Downloader:
         helper = TaskHelper()
         helper.run(self.__cache_artists_info)
 
+    def save_downloads(self):
+        """
+            Save pending downloads for next run
+        """
+        with self.__jobs_lock:
+            jobs = list(self.__pending)
+        try:
+            self.__downloads.set_jobs(jobs)
+        except Exception as e:
+            print("Downloader::save_downloads():", e)
+
     def get_google_search_uri(self, search):
         """
             Get google uri for search
@@ -102,9 +139,13 @@ class Downloader:
             Return lastfm artist information
             @param artist as str
             @return (url as str/None, content as str)
+            @raise ServiceError
         """
         if Lp().lastfm is not None:
-            return Lp().lastfm.get_artist_info(artist)
+            try:
+                return Lp().lastfm.get_artist_info(artist)
+            except Exception as e:
+                raise ServiceError(e)
         else:
             return (None, None)
 
@@ -113,10 +154,14 @@ class Downloader:
             Return wikipedia artist information
             @param artist as str
             @return (url as str/None, content as str)
+            @raise ServiceError
         """
         if Downloader.Wikipedia is not None:
-            wp = Downloader.Wikipedia()
-            return wp.get_page_infos(artist)
+            try:
+                wp = Downloader.Wikipedia()
+                return wp.get_page_infos(artist)
+            except Exception as e:
+                raise ServiceError(e)
         else:
             return (None, None)
 
@@ -125,6 +170,7 @@ class Downloader:
             Return deezer artist information
             @param artist as str
             @return (url as str/None, content as None)
+            @raise ServiceError
         """
         try:
             artist_formated = GLib.uri_escape_string(
@@ -136,6 +182,10 @@ class Downloader:
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 return (decode["data"][0]["picture_xl"], None)
+            else:
+                raise ServiceError(uri)
+        except ServiceError:
+            raise
         except Exception as e:
             debug("Downloader::_get_deezer_artist_artwork(): %s [%s]" %
                   (e, artist))
@@ -146,6 +196,7 @@ class Downloader:
             Return spotify artist information
             @param artist as str
             @return (url as str/None, content as None)
+            @raise ServiceError
         """
         try:
             artist_formated = GLib.uri_escape_string(
@@ -161,6 +212,10 @@ class Downloader:
                 for item in decode["artists"]["items"]:
                     if item["name"].lower() == artist.lower():
                         return (item["images"][0]["url"], None)
+            else:
+                raise ServiceError(uri)
+        except ServiceError:
+            raise
         except Exception as e:
             debug("Downloader::_get_spotify_artist_artwork(): %s [%s]" %
                   (e, artist))
@@ -172,6 +227,7 @@ class Downloader:
             @param artist as string
             @param album as string
             @return image as bytes
+            @raise ServiceError
             @tread safe
         """
         image = None
@@ -190,6 +246,12 @@ class Downloader:
                         break
                 if uri is not None:
                     (status, image) = helper.load_uri_content_sync(uri, None)
+                    if not status:
+                        raise ServiceError(uri)
+            else:
+                raise ServiceError(uri)
+        except ServiceError:
+            raise
         except Exception as e:
             print("Downloader::__get_deezer_album_artwork: %s" % e)
         return image
@@ -200,6 +262,7 @@ class Downloader:
             @param artist as string
             @param album as string
             @return image as bytes
+            @raise ServiceError
             @tread safe
         """
         image = None
@@ -218,6 +281,8 @@ class Downloader:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artists"]["items"]:
                     artists_spotify_ids.append(item["id"])
+            else:
+                raise ServiceError(uri)
 
             for artist_spotify_id in artists_spotify_ids:
                 uri = "https://api.spotify.com/v1/artists/" +\
@@ -233,7 +298,13 @@ class Downloader:
                     if uri is not None:
                         (status, image) = helper.load_uri_content_sync(uri,
                                                                        None)
+                        if not status:
+                            raise ServiceError(uri)
                     break
+                else:
+                    raise ServiceError(uri)
+        except ServiceError:
+            raise
         except Exception as e:
             print("Downloader::_get_album_art_spotify: %s [%s/%s]" %
                   (e, artist, album))
@@ -245,6 +316,7 @@ class Downloader:
             @param artist as string
             @param album as string
             @return image as bytes
+            @raise ServiceError
             @tread safe
         """
         image = None
@@ -263,7 +335,13 @@ class Downloader:
                                                            "512x512")
                         (status, image) = helper.load_uri_content_sync(uri,
                                                                        None)
+                        if not status:
+                            raise ServiceError(uri)
                         break
+            else:
+                raise ServiceError(uri)
+        except ServiceError:
+            raise
         except Exception as e:
             print("Downloader::_get_album_art_itunes: %s [%s/%s]" %
                   (e, artist, album))
@@ -275,19 +353,20 @@ class Downloader:
             @param artist as string
             @param album as string
             @return data as bytes
+            @raise ServiceError
             @tread safe
         """
         image = None
         if Lp().lastfm is not None:
             try:
-                helper = TaskHelper()
-                last_album = Lp().lastfm.get_album(artist, album)
-                uri = last_album.get_cover_image(4)
-                if uri is not None:
-                    (status, image) = helper.load_uri_content_sync(uri, None)
+                uri = Lp().lastfm.get_album_cover_uri(artist, album)
             except Exception as e:
-                print("Downloader::_get_album_art_lastfm: %s [%s/%s]" %
-                      (e, artist, album))
+                raise ServiceError(e)
+            if uri is not None:
+                helper = TaskHelper()
+                (status, image) = helper.load_uri_content_sync(uri, None)
+                if not status:
+                    raise ServiceError(uri)
         return image
 
 #######################
@@ -318,71 +397,155 @@ class Downloader:
         except:
             return ""
 
+    def __add_job(self, kind, key):
+        """
+            Queue a download, start workers if needed
+            @param kind as int
+            @param key as str
+            @thread safe
+        """
+        with self.__jobs_lock:
+            if (kind, key) in self.__pending:
+                return
+            self.__pending.add((kind, key))
+            if not self.__workers:
+                for i in range(0, self.__WORKERS):
+                    thread = Thread(target=self.__worker)
+                    thread.daemon = True
+                    thread.start()
+                    self.__workers.append(thread)
+            self.__seq += 1
+            self.__jobs.put((kind, self.__seq, key))
+
+    def __restore_jobs(self):
+        """
+            Restore downloads from previous run
+        """
+        try:
+            self.__downloads.clean_misses(self.__MISS_TTL)
+            for (kind, key) in self.__downloads.pop_jobs():
+                self.__add_job(kind, key)
+        except Exception as e:
+            print("Downloader::__restore_jobs():", e)
+
+    def __worker(self):
+        """
+            Run queued downloads, albums first
+            @thread safe
+        """
+        while True:
+            (kind, seq, key) = self.__jobs.get()
+            try:
+                if get_network_available():
+                    if kind == self.__ALBUM:
+                        self.__cache_album_art(int(key))
+                    else:
+                        self.__cache_artist_info(key)
+            except Exception as e:
+                print("Downloader::__worker():", e, key)
+            with self.__jobs_lock:
+                self.__pending.discard((kind, key))
+
+    def __call_service(self, api, method, *args):
+        """
+            Call web service helper, respecting service limits
+            @param api as str
+            @param method as function
+            @param args as method args
+            @return (called as bool, method result)
+        """
+        guard = self.__guards[api]
+        if not guard.acquire():
+            debug("Downloader::__call_service(): %s disabled" % api)
+            return (False, None)
+        try:
+            result = method(*args)
+            guard.success()
+            return (True, result)
+        except ServiceError as e:
+            debug("Downloader::__call_service(): %s [%s]" % (e, api))
+            guard.failure()
+            return (False, None)
+
     def __cache_artists_info(self):
         """
-            Cache info for all artists
+            Queue info download for all artists with expired info
+        """
+        try:
+            # We create cache if needed
+            InfoCache.init()
+            for (artist_id, artist, sort) in Lp().artists.get([]):
+                if InfoCache.get_expired(artist):
+                    self.__add_job(self.__ARTIST, artist)
+        finally:
+            self.__cache_artists_running = False
+
+    def __cache_artist_info(self, artist):
+        """
+            Cache info for artist from lastfm/wikipedia/spotify/deezer/...
+            @param artist as str
+            @thread safe
         """
-        # We create cache if needed
-        InfoCache.init()
-        # Then cache for lastfm/wikipedia/spotify/deezer/...
-        for (artist_id, artist, sort) in Lp().artists.get([]):
-            if not get_network_available() or\
-                    InfoCache.exists(artist):
+        expired = InfoCache.get_expired(artist)
+        if not expired:
+            return
+        artwork_set = False
+        for (api, helper, unused) in InfoCache.WEBSERVICES:
+            debug("Downloader::__cache_artist_info(): %s@%s" % (artist, api))
+            if helper is None or api not in expired:
                 continue
-            artwork_set = False
-            for (api, helper, unused) in InfoCache.WEBSERVICES:
-                debug("Downloader::__cache_artists_info(): %s@%s" % (artist,
-                                                                     api))
-                if helper is None:
+            try:
+                method = getattr(self, helper)
+                (called, result) = self.__call_service(api, method, artist)
+                # Retry later
+                if not called:
                     continue
-                try:
-                    method = getattr(self, helper)
-                    (uri, content) = method(artist)
-                    if uri is not None:
-                        (status, data) = TaskHelper().load_uri_content_sync(
-                                                                      uri,
-                                                                      None)
-                        if status:
-                            artwork_set = True
-                            InfoCache.add(artist, content, data, api)
-                            debug("Downloader::__cache_artists_info(): %s"
-                                  % uri)
-                        else:
-                            InfoCache.add(artist, None, None, api)
-                except Exception as e:
-                    print("Downloader::__cache_artists_info():", e, artist)
-                    InfoCache.add(artist, None, None, api)
-            if artwork_set:
-                GLib.idle_add(Lp().art.emit, "artist-artwork-changed", artist)
-        self.__cache_artists_running = False
+                (uri, content) = result
+                if uri is not None:
+                    (status, data) = TaskHelper().load_uri_content_sync(uri,
+                                                                        None)
+                    # Retry later
+                    if not status:
+                        continue
+                    artwork_set = True
+                    InfoCache.add(artist, content, data, api)
+                    debug("Downloader::__cache_artist_info(): %s" % uri)
+                else:
+                    InfoCache.add_negative(artist, api)
+            # Unexpected errors are not an answer, retry later
+            except Exception as e:
+                print("Downloader::__cache_artist_info():", e, artist)
+        if artwork_set:
+            GLib.idle_add(Lp().art.emit, "artist-artwork-changed", artist)
 
-    def __cache_albums_art(self):
+    def __cache_album_art(self, album_id):
         """
-            Cache albums artwork (from queue)
+            Cache album artwork, services without results are skipped
+            until their miss expires
+            @param album id as int
             @thread safe
         """
-        self.__in_albums_download = True
-        try:
-            while self.__albums_queue:
-                album_id = self.__albums_queue.pop()
-                album = Lp().albums.get_name(album_id)
-                artist_ids = Lp().albums.get_artist_ids(album_id)
-                is_compilation = artist_ids and\
-                    artist_ids[0] == Type.COMPILATIONS
-                if is_compilation:
-                    artist = ""
-                else:
-                    artist = ", ".join(Lp().albums.get_artists(album_id))
-                for (api, unused, helper) in InfoCache.WEBSERVICES:
-                    if helper is None:
-                        continue
-                    method = getattr(self, helper)
-                    data = method(artist, album)
-                    if data is not None:
-                        self.__albums_history.append(album_id)
-                        Lp().art.save_album_artwork(data, album_id)
-                        break
-        except Exception as e:
-            print("Downloader::__cache_albums_art: %s" % e)
-        self.__albums_history.append(album_id)
-        self.__in_albums_download = False
+        album = Lp().albums.get_name(album_id)
+        if album is None:
+            return
+        artist_ids = Lp().albums.get_artist_ids(album_id)
+        is_compilation = artist_ids and\
+            artist_ids[0] == Type.COMPILATIONS
+        if is_compilation:
+            artist = ""
+        else:
+            artist = ", ".join(Lp().albums.get_artists(album_id))
+        key = "%s@%s" % (artist, album)
+        for (api, unused, helper) in InfoCache.WEBSERVICES:
+            if helper is None or\
+                    self.__downloads.is_miss(api, key, self.__MISS_TTL):
+                continue
+            method = getattr(self, helper)
+            (called, data) = self.__call_service(api, method, artist, album)
+            if not called:
+                continue
+            if data is None:
+                self.__downloads.add_miss(api, key)
+            else:
+                Lp().art.save_album_artwork(data, album_id)
+                break
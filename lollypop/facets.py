@@ -0,0 +1,198 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import Lp, Type, OrderBy
+from lollypop.utils import remove_static_genres
+
+
+class FacetIndex:
+    """
+        Genres, album artists and albums relations kept in memory
+        Same results and order as ArtistsDatabase.get()/get_ids()
+        and AlbumsDatabase.get_ids()/get_compilation_ids()
+        Index is reloaded on first query after a collection change
+    """
+
+    def __init__(self):
+        """
+            Init index, loaded on first query
+        """
+        self.__lock = Lock()
+        # Collection changes, index is loaded for __loaded_generation
+        self.__generation = 0
+        self.__loaded_generation = None
+        # Genre id: album ids as set
+        self.__genre_albums = {}
+        # Album artists as [(artist id, name, sortname)], sorted
+        self.__artists = []
+        # Album artist id: album ids as set
+        self.__artist_albums = {}
+        # [(artist id, album id)], sorted by artist, year and name
+        self.__artist_pairs = []
+        # Compilation ids, sorted by name and year
+        self.__compilation_ids = []
+        # OrderBy: album ids, for orders not changing while playing
+        self.__album_ids = {}
+        Lp().scanner.connect("scan-finished", self.__on_scan_finished)
+        Lp().scanner.connect("genre-updated", self.__on_updated)
+        Lp().scanner.connect("artist-updated", self.__on_updated)
+        Lp().scanner.connect("album-updated", self.__on_updated)
+
+    def get_artists(self, genre_ids=[]):
+        """
+            Get album artists
+            @param genre ids as [int]
+            @return [(artist id as int, name as str, sortname as str)]
+            @thread safe
+        """
+        with self.__lock:
+            self.__load()
+            if not genre_ids or genre_ids[0] == Type.ALL:
+                return list(self.__artists)
+            album_ids = self.__get_genre_albums(genre_ids)
+            return [artist for artist in self.__artists
+                    if not self.__artist_albums.get(
+                        artist[0], set()).isdisjoint(album_ids)]
+
+    def get_artist_ids(self, genre_ids=[]):
+        """
+            Get album artist ids
+            @param genre ids as [int]
+            @return [int]
+            @thread safe
+        """
+        return [artist[0] for artist in self.get_artists(genre_ids)]
+
+    def get_album_ids(self, artist_ids=[], genre_ids=[]):
+        """
+            Get album ids
+            @param artist ids as [int]
+            @param genre ids as [int]
+            @return [int]
+            @thread safe
+        """
+        genre_ids = remove_static_genres(genre_ids)
+        orderby = Lp().settings.get_enum("orderby")
+        # Popularity changes while playing, get order from database
+        if not artist_ids and orderby == OrderBy.POPULARITY:
+            ordered_ids = Lp().albums.get_ids()
+        else:
+            ordered_ids = None
+        with self.__lock:
+            self.__load()
+            if genre_ids:
+                album_ids = self.__get_genre_albums(genre_ids)
+            else:
+                album_ids = None
+            if artist_ids or orderby == OrderBy.ARTIST:
+                ordered_ids = []
+                seen = set()
+                for (artist_id, album_id) in self.__artist_pairs:
+                    if album_id in seen or\
+                            (artist_ids and artist_id not in artist_ids):
+                        continue
+                    seen.add(album_id)
+                    ordered_ids.append(album_id)
+            elif ordered_ids is None:
+                if orderby not in self.__album_ids:
+                    self.__album_ids[orderby] = Lp().albums.get_ids()
+                ordered_ids = self.__album_ids[orderby]
+            if album_ids is None:
+                return list(ordered_ids)
+            return [album_id for album_id in ordered_ids
+                    if album_id in album_ids]
+
+    def get_compilation_ids(self, genre_ids=[]):
+        """
+            Get compilation ids
+            @param genre ids as [int]
+            @return [int]
+            @thread safe
+        """
+        with self.__lock:
+            self.__load()
+            if not genre_ids or genre_ids[0] == Type.ALL:
+                return list(self.__compilation_ids)
+            album_ids = self.__get_genre_albums(genre_ids)
+            return [album_id for album_id in self.__compilation_ids
+                    if album_id in album_ids]
+
+#######################
+# PRIVATE             #
+#######################
+    def __load(self):
+        """
+            Load index if needed
+            @warning: lock needed
+        """
+        generation = self.__generation
+        if generation == self.__loaded_generation:
+            return
+        self.__genre_albums = {}
+        self.__artist_albums = {}
+        self.__artist_pairs = []
+        self.__album_ids = {}
+        with SqlCursor(Lp().db) as sql:
+            result = sql.execute("SELECT album_id, genre_id\
+                                  FROM album_genres")
+            for (album_id, genre_id) in result:
+                self.__genre_albums.setdefault(genre_id, set()).add(album_id)
+            # Same order as AlbumsDatabase.get_ids() for artists
+            result = sql.execute("SELECT album_artists.artist_id,\
+                                  albums.rowid\
+                                  FROM albums, album_artists, artists\
+                                  WHERE album_artists.album_id=albums.rowid\
+                                  AND artists.rowid=album_artists.artist_id\
+                                  ORDER BY artists.sortname\
+                                  COLLATE NOCASE COLLATE LOCALIZED,\
+                                  albums.year,\
+                                  albums.name\
+                                  COLLATE NOCASE COLLATE LOCALIZED")
+            for (artist_id, album_id) in result:
+                self.__artist_pairs.append((artist_id, album_id))
+                self.__artist_albums.setdefault(artist_id,
+                                                set()).add(album_id)
+        self.__artists = Lp().artists.get()
+        self.__compilation_ids = Lp().albums.get_compilation_ids()
+        # Changes during load will reload again
+        self.__loaded_generation = generation
+
+    def __get_genre_albums(self, genre_ids):
+        """
+            Get albums for genres
+            @param genre ids as [int]
+            @return album ids as set
+            @warning: lock needed
+        """
+        album_ids = set()
+        for genre_id in genre_ids:
+            album_ids |= self.__genre_albums.get(genre_id, set())
+        return album_ids
+
+    def __on_updated(self, scanner, object_id, value):
+        """
+            Reload index on next query
+            @param scanner as CollectionScanner
+            @param object id as int
+            @param value as bool
+        """
+        self.__generation += 1
+
+    def __on_scan_finished(self, scanner):
+        """
+            Reload index on next query
+            @param scanner as CollectionScanner
+        """
+        self.__generation += 1
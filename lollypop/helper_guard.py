@@ -0,0 +1,74 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+from time import time, sleep
+
+
+class GuardHelper:
+    """
+        Rate limit and circuit breaker for a web service
+        Shared by all threads using the service
+    """
+    __MAX_FAILURES = 3
+    __COOLDOWN = 60  # Seconds
+    __MAX_COOLDOWN = 3600  # Seconds
+
+    def __init__(self, interval):
+        """
+            Init helper
+            @param interval as float, minimal seconds between requests
+        """
+        self.__interval = interval
+        self.__lock = Lock()
+        self.__next_time = 0
+        self.__failures = 0
+        self.__cooldown = self.__COOLDOWN
+        self.__open_until = 0
+
+    def acquire(self):
+        """
+            Wait for a request slot
+            @return False if service is disabled after failures
+            @thread safe
+        """
+        with self.__lock:
+            now = time()
+            if now < self.__open_until:
+                return False
+            wait = self.__next_time - now
+            self.__next_time = max(now, self.__next_time) + self.__interval
+        if wait > 0:
+            sleep(wait)
+        return True
+
+    def success(self):
+        """
+            Service answered
+            @thread safe
+        """
+        with self.__lock:
+            self.__failures = 0
+            self.__cooldown = self.__COOLDOWN
+
+    def failure(self):
+        """
+            Service failed, disable it for a while after many failures
+            @thread safe
+        """
+        with self.__lock:
+            self.__failures += 1
+            if self.__failures >= self.__MAX_FAILURES:
+                self.__open_until = time() + self.__cooldown
+                self.__cooldown = min(self.__cooldown * 2,
+                                      self.__MAX_COOLDOWN)
+                self.__failures = 0
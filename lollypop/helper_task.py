@@ -88,12 +88,20 @@ class TaskHelper:
                         headers.append(header[0],
                                        header[1])
                     session.send_message(msg)
+                    if not 200 <= msg.status_code < 300:
+                        raise Exception("%s: %s" % (msg.status_code, uri))
                     body = msg.get_property("response-body")
                     bytes = body.flatten().get_data()
                 # Get message
                 else:
                     request = session.request(uri)
                     stream = request.send(cancellable)
+                    # Error pages are not content
+                    if isinstance(request, Soup.RequestHTTP):
+                        status = request.get_message().status_code
+                        if not 200 <= status < 300:
+                            stream.close()
+                            raise Exception("%s: %s" % (status, uri))
                     bytes = bytearray(0)
                     buf = stream.read_bytes(1024, cancellable).get_data()
                     while buf:
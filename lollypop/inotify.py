@@ -55,6 +55,12 @@ class Inotify:
         """
             Prepare thread to handle changes
         """
+        # Artwork is not scanned, only refresh folder images
+        if Lp().art.is_image(changed_file.get_basename()):
+            if event in [Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+                         Gio.FileMonitorEvent.DELETED]:
+                self.__update_images(changed_file.get_parent().get_uri())
+            return
         update = False
         # Stop collection scanner and wait
         if Lp().scanner.is_locked():
@@ -87,6 +93,16 @@ class Inotify:
                 self.__timeout = GLib.timeout_add(self.__TIMEOUT,
                                                   self.__run_collection_update)
 
+    def __update_images(self, folder):
+        """
+            Refresh image files for folder, after scan if running
+            @param folder uri as str
+        """
+        if Lp().scanner.is_locked():
+            GLib.timeout_add(self.__TIMEOUT, self.__update_images, folder)
+        else:
+            Lp().art.update_folder_artwork(folder)
+
     def __run_collection_update(self):
         """
             Run a collection update
@@ -12,7 +12,7 @@
 
 import gi
 gi.require_version("Secret", "1")
-from gi.repository import Gio
+from gi.repository import Gio, GLib
 
 from gettext import gettext as _
 
@@ -33,9 +33,11 @@ from pylast import LastFMNetwork, LibreFMNetwork, md5, WSError
 from pylast import SessionKeyGenerator
 from gettext import gettext as _
 from locale import getdefaultlocale
+from threading import Lock
 import re
 
 from lollypop.helper_task import TaskHelper
+from lollypop.database_scrobbles import ScrobblesDatabase
 from lollypop.define import Lp, Type
 from lollypop.objects import Track
 from lollypop.utils import debug, get_network_available
@@ -52,6 +54,18 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
        want, and if your app isn"t written in a compiled language, you don"t
        really have much option :).
     """
+    # Scrobbles sent per request, API maximum
+    __BATCH_SIZE = 50
+    # Retry delays in seconds
+    __MIN_BACKOFF = 30
+    __MAX_BACKOFF = 3600
+    # Errors not caused by scrobbles, batch is kept and sent again later:
+    # operation failed, service offline, temporarily unavailable,
+    # rate limit exceeded
+    __TRANSIENT_ERRORS = ["8", "11", "16", "29"]
+    # authentication failed, invalid session key, invalid API key,
+    # token errors, suspended API key
+    __AUTH_ERRORS = ["4", "9", "10", "14", "15", "26"]
 
     def __init__(self, name):
         """
@@ -63,6 +77,10 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         self.__is_auth = False
         self.__password = None
         self.__goa = None
+        self.__scrobbles = ScrobblesDatabase()
+        self.__flush_lock = Lock()
+        self.__backoff = 0
+        self.__retry_id = None
         self.__check_for_proxy()
         if name == "librefm":
             LibreFMNetwork.__init__(self)
@@ -101,33 +119,58 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         """
             Get artist infos
             @param artist as str
-            @return (url as str, content as str)
+            @return (url as str, content as str), (None, None) if unknown
         """
         if not get_network_available():
-            return (None, None, None)
+            return (None, None)
         last_artist = self.get_artist(artist)
         try:
             content = last_artist.get_bio_content(
                 language=getdefaultlocale()[0][0:2])
+        except WSError as e:
+            debug("LastFM::get_artist_info(): %s [%s]" % (e, artist))
+            return (None, None)
         except:
             content = last_artist.get_bio_content()
-        content = re.sub(r"<.*Last.fm.*>.", "", content)
+        content = re.sub(r"<.*Last.fm.*>.", "", content or "")
         url = last_artist.get_cover_image(3)
         return (url, content.encode(encoding="UTF-8"))
 
+    def get_album_cover_uri(self, artist, album):
+        """
+            Get album cover uri
+            @param artist as str
+            @param album as str
+            @return uri as str, None if unknown
+        """
+        try:
+            return self.get_album(artist, album).get_cover_image(4)
+        except WSError as e:
+            debug("LastFM::get_album_cover_uri(): %s [%s/%s]" %
+                  (e, artist, album))
+            return None
+
     def do_scrobble(self, artist, album, title, timestamp):
         """
-            Scrobble track
+            Queue track for scrobbling, submit queue if possible
             @param artist as str
             @param title as str
             @param album as str
             @param timestamp as int
-            @param duration as int
+        """
+        if Secret is None:
+            return
+        helper = TaskHelper()
+        helper.run(self.__queue_scrobble, artist, album, title, timestamp)
+
+    def flush_scrobbles(self):
+        """
+            Submit queued scrobbles
         """
         if get_network_available() and\
            self.__is_auth and Secret is not None:
             helper = TaskHelper()
-            helper.run(self.__scrobble, artist, album, title, timestamp)
+            helper.run(self.__flush_scrobbles)
 
     def now_playing(self, artist, album, title, duration):
         """
@@ -266,35 +309,110 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         except Exception as e:
             debug("LastFM::__connect(): %s" % e)
             self.__is_auth = False
+        # Submit scrobbles queued while offline
+        if self.__is_auth and self.__retry_id is None and\
+                not self.__flush_lock.locked():
+            helper = TaskHelper()
+            helper.run(self.__flush_scrobbles)
 
-    def __scrobble(self, artist, album, title, timestamp, first=True):
+    def __queue_scrobble(self, artist, album, title, timestamp):
         """
-            Scrobble track
+            Store scrobble on disk then submit queue
             @param artist as str
+            @param album as str
             @param title as str
-            @param album_title as str
             @param timestamp as int
-            @param duration as int
-            @param first is internal
             @thread safe
         """
-        debug("LastFM::__scrobble(): %s, %s, %s, %s" % (artist,
-                                                        album,
-                                                        title,
-                                                        timestamp))
+        debug("LastFM::__queue_scrobble(): %s, %s, %s, %s" % (artist,
+                                                              album,
+                                                              title,
+                                                              timestamp))
+        self.__scrobbles.add(self.__name, artist, album, title, timestamp)
+        # Do not flush while waiting for a retry
+        if self.__retry_id is None and get_network_available() and\
+                self.__is_auth:
+            self.__flush_scrobbles()
+
+    def __flush_scrobbles(self):
+        """
+            Submit queued scrobbles by batches
+            @thread safe
+        """
+        # Another thread is already flushing
+        if not self.__flush_lock.acquire(False):
+            return
         try:
-            self.scrobble(artist=artist,
-                          album=album,
-                          title=title,
-                          timestamp=timestamp)
-        except WSError:
-            pass
-        except Exception as e:
-            print("LastFM::__scrobble():", e)
-            # Scrobble sometimes fails
-            if first:
-                self.__connect()
-                self.__scrobble(artist, album, title, timestamp, False)
+            reconnected = False
+            while True:
+                scrobbles = self.__scrobbles.get(self.__name,
+                                                 self.__BATCH_SIZE)
+                if not scrobbles:
+                    break
+                tracks = []
+                for (scrobble_id, artist, album, title,
+                     timestamp) in scrobbles:
+                    tracks.append({"artist": artist,
+                                   "album": album,
+                                   "title": title,
+                                   "timestamp": timestamp})
+                try:
+                    self.scrobble_many(tracks)
+                except WSError as e:
+                    print("LastFM::__flush_scrobbles():", e)
+                    status = str(e.get_id())
+                    if status in self.__AUTH_ERRORS and not reconnected:
+                        reconnected = True
+                        self.__connect()
+                        continue
+                    elif status in self.__AUTH_ERRORS or\
+                            status in self.__TRANSIENT_ERRORS:
+                        self.__schedule_retry()
+                        return
+                    # Rejected by service, do not retry these ones
+                except Exception as e:
+                    print("LastFM::__flush_scrobbles():", e)
+                    # Scrobble sometimes fails, retry once reconnected
+                    if not reconnected:
+                        reconnected = True
+                        self.__connect()
+                        continue
+                    self.__schedule_retry()
+                    return
+                self.__scrobbles.remove([scrobble[0]
+                                         for scrobble in scrobbles])
+                debug("LastFM::__flush_scrobbles(): %s sent" % len(tracks))
+            self.__backoff = 0
+        finally:
+            self.__flush_lock.release()
+
+    def __schedule_retry(self):
+        """
+            Retry later, doubling delay each time
+            @thread safe
+        """
+        if self.__backoff == 0:
+            self.__backoff = self.__MIN_BACKOFF
+        else:
+            self.__backoff = min(self.__backoff * 2, self.__MAX_BACKOFF)
+        debug("LastFM::__schedule_retry(): %ss" % self.__backoff)
+        GLib.idle_add(self.__add_retry_timeout, self.__backoff)
+
+    def __add_retry_timeout(self, delay):
+        """
+            Add retry timeout from main loop
+            @param delay as int
+        """
+        if self.__retry_id is not None:
+            GLib.source_remove(self.__retry_id)
+        self.__retry_id = GLib.timeout_add_seconds(delay, self.__on_retry)
+
+    def __on_retry(self):
+        """
+            Retry submitting scrobbles
+        """
+        self.__retry_id = None
+        self.flush_scrobbles()
 
     def __now_playing(self, artist, album, title, duration, first=True):
         """
@@ -0,0 +1,179 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """
+        Least recently used cache bounded by count and/or size
+    """
+
+    def __init__(self, max_count=0, max_size=0, get_size=None,
+                 on_evict=None):
+        """
+            Init cache
+            @param max_count as int, 0 for no limit
+            @param max_size as int, 0 for no limit
+            @param get_size as function returning value size as int
+            @param on_evict as function(key, value), called for values
+                   evicted to respect limits
+        """
+        self.__items = OrderedDict()
+        self.__lock = Lock()
+        self.__max_count = max_count
+        self.__max_size = max_size
+        self.__get_size = get_size
+        self.__on_evict = on_evict
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key, default=None):
+        """
+            Get value for key and mark it as recently used
+            @param key as hashable
+            @param default as object
+            @return object
+        """
+        with self.__lock:
+            if key in self.__items:
+                self.__items.move_to_end(key)
+                self.__hits += 1
+                return self.__items[key][0]
+            self.__misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+            Set value for key, evict least recently used values if needed
+            @param key as hashable
+            @param value as object
+        """
+        size = 0 if self.__get_size is None else self.__get_size(value)
+        # Value will never fit
+        if self.__max_size and size > self.__max_size:
+            return
+        evicted_items = []
+        with self.__lock:
+            if key in self.__items:
+                self.__size -= self.__items.pop(key)[1]
+            self.__items[key] = (value, size)
+            self.__size += size
+            while (self.__max_count and
+                   len(self.__items) > self.__max_count) or\
+                    (self.__max_size and self.__size > self.__max_size):
+                (evicted_key, (evicted, evicted_size)) = self.__items.popitem(
+                                                                   last=False)
+                self.__size -= evicted_size
+                evicted_items.append((evicted_key, evicted))
+        self.__evicted(evicted_items)
+
+    def remove(self, key):
+        """
+            Remove key from cache
+            @param key as hashable
+        """
+        with self.__lock:
+            if key in self.__items:
+                self.__size -= self.__items.pop(key)[1]
+
+    def remove_if(self, match):
+        """
+            Remove keys matching
+            @param match as function(key) returning bool
+        """
+        with self.__lock:
+            for key in [key for key in self.__items.keys() if match(key)]:
+                self.__size -= self.__items.pop(key)[1]
+
+    def clear(self):
+        """
+            Remove all values
+        """
+        with self.__lock:
+            self.__items.clear()
+            self.__size = 0
+
+    def set_max_size(self, max_size):
+        """
+            Update size budget, evicting values if needed
+            @param max_size as int
+        """
+        evicted_items = []
+        with self.__lock:
+            self.__max_size = max_size
+            while self.__max_size and self.__size > self.__max_size:
+                (evicted_key, (evicted, evicted_size)) = self.__items.popitem(
+                                                                   last=False)
+                self.__size -= evicted_size
+                evicted_items.append((evicted_key, evicted))
+        self.__evicted(evicted_items)
+
+    def keys(self):
+        """
+            Cached keys, least recently used first
+            @return [hashable]
+        """
+        with self.__lock:
+            return list(self.__items.keys())
+
+    def values(self):
+        """
+            Cached values, least recently used first
+            @return [object]
+        """
+        with self.__lock:
+            return [item[0] for item in self.__items.values()]
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__items
+
+    def __len__(self):
+        return len(self.__items)
+
+    @property
+    def size(self):
+        """
+            Size of cached values
+            @return int
+        """
+        return self.__size
+
+    @property
+    def stats(self):
+        """
+            Cache statistics
+            @return {"hits": int, "misses": int, "hit_rate": float,
+                     "count": int, "size": int}
+        """
+        with self.__lock:
+            total = self.__hits + self.__misses
+            return {"hits": self.__hits,
+                    "misses": self.__misses,
+                    "hit_rate": self.__hits / total if total else 0.0,
+                    "count": len(self.__items),
+                    "size": self.__size}
+
+#######################
+# PRIVATE             #
+#######################
+    def __evicted(self, items):
+        """
+            Notify evicted values, out of lock
+            @param items as [(hashable, object)]
+        """
+        if self.__on_evict is not None:
+            for (key, value) in items:
+                self.__on_evict(key, value)
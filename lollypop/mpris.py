@@ -19,6 +19,8 @@ from gi.repository import Gio, Gst, GLib, Gtk
 from random import randint
 
 from lollypop.define import Lp, ArtSize, Type, Shuffle, NextContext
+from lollypop.helper_task import TaskHelper
+from lollypop.lru import LRUCache
 
 
 class Server:
@@ -166,6 +168,8 @@ class MPRIS(Server):
     __MPRIS_RATINGS_IFACE = "org.mpris.MediaPlayer2.ExtensionSetRatings"
     __MPRIS_LOLLYPOP = "org.mpris.MediaPlayer2.Lollypop"
     __MPRIS_PATH = "/org/mpris/MediaPlayer2"
+    # Metadata kept for recently played tracks
+    __METADATA_COUNT = 50
 
     def __init__(self, app):
         self.__app = app
@@ -174,6 +178,11 @@ class MPRIS(Server):
         self.__metadata = {"mpris:trackid": GLib.Variant(
                                   "o",
                                   "/org/mpris/MediaPlayer2/TrackList/NoTrack")}
+        # Track id: metadata without track id and rating
+        self.__metadatas = LRUCache(max_count=self.__METADATA_COUNT)
+        # Properties changed since last emission
+        self.__changed = {}
+        self.__changed_id = None
         # Get the shuffle state for our shuffle toggle setting so we can
         # remember the last non-NONE suffle state if we start with Shuffle.NONE
         # then our "on" setting starts with Shuffle.TRACKS.
@@ -197,6 +206,7 @@ class MPRIS(Server):
         Lp().player.connect("rate-changed", self.__on_rate_changed)
         Lp().settings.connect("changed::shuffle", self.__on_shuffle_changed)
         Lp().settings.connect("changed::playback", self.__on_playback_changed)
+        Lp().scanner.connect("scan-finished", self.__on_scan_finished)
 
     def Raise(self):
         self.__app.window.setup_window()
@@ -382,71 +392,127 @@ class MPRIS(Server):
             return "Stopped"
 
     def __update_metadata(self):
+        """
+            Update metadata for current track, from cache if available
+        """
         if self.__get_status() == "Stopped":
             self.__metadata = {"mpris:trackid": GLib.Variant(
                                   "o",
                                   "/org/mpris/MediaPlayer2/TrackList/NoTrack")}
         else:
+            track = Lp().player.current_track
+            metadata = None
+            if self.__lollypop_id:
+                metadata = self.__metadatas.get(self.__lollypop_id)
+            if metadata is None:
+                metadata = self.__get_metadata(track)
+                if self.__lollypop_id:
+                    self.__metadatas.set(self.__lollypop_id, metadata)
+            self.__metadata = dict(metadata)
             self.__metadata["mpris:trackid"] = self.__track_id
-            track_number = Lp().player.current_track.number
-            if track_number is None:
-                track_number = 1
-            self.__metadata["xesam:trackNumber"] = GLib.Variant("i",
-                                                                track_number)
-            self.__metadata["xesam:title"] = GLib.Variant(
-                                                "s",
-                                                Lp().player.current_track.name)
-            self.__metadata["xesam:album"] = GLib.Variant(
-                                          "s",
-                                          Lp().player.current_track.album.name)
-            self.__metadata["xesam:artist"] = GLib.Variant(
-                                             "as",
-                                             Lp().player.current_track.artists)
-            self.__metadata["xesam:albumArtist"] = GLib.Variant(
-                                       "as",
-                                       Lp().player.current_track.album_artists)
-            self.__metadata["mpris:length"] = GLib.Variant(
-                              "x",
-                              Lp().player.current_track.duration * 1000 * 1000)
-            self.__metadata["xesam:genre"] = GLib.Variant(
-                                              "as",
-                                              Lp().player.current_track.genres)
-            self.__metadata["xesam:url"] = GLib.Variant(
-                                                 "s",
-                                                 Lp().player.current_track.uri)
             if self.__rating is None:
-                self.__rating = Lp().player.current_track.get_rate()
+                self.__rating = track.get_rate()
             self.__metadata["xesam:userRating"] = GLib.Variant(
                                                              "d",
                                                              self.__rating / 5)
-            if Lp().player.current_track.id == Type.RADIOS:
-                cover_path = Lp().art.get_radio_cache_path(
-                     ", ".join(Lp().player.current_track.artists),
-                     ArtSize.MONSTER)
-            elif Lp().player.current_track.id == Type.EXTERNALS:
-                cover_path = "/tmp/lollypop_mpris.jpg"
-                pixbuf = Lp().art.pixbuf_from_tags(
-                    GLib.filename_from_uri(Lp().player.current_track.uri)[0],
-                    ArtSize.MONSTER)
-                if pixbuf is not None:
-                    pixbuf.savev(cover_path, "jpeg",
-                                 ["quality"], ["90"])
-            else:
-                cover_path = Lp().art.get_album_cache_path(
-                    Lp().player.current_track.album, ArtSize.MONSTER)
-            if cover_path is not None:
-                self.__metadata["mpris:artUrl"] = GLib.Variant(
-                                                        "s",
-                                                        "file://" + cover_path)
+
+    def __get_metadata(self, track):
+        """
+            Get metadata for track, artwork is added later
+            @param track as Track
+            @return {str: GLib.Variant}
+        """
+        metadata = {}
+        track_number = track.number
+        if track_number is None:
+            track_number = 1
+        metadata["xesam:trackNumber"] = GLib.Variant("i", track_number)
+        metadata["xesam:title"] = GLib.Variant("s", track.name)
+        metadata["xesam:album"] = GLib.Variant("s", track.album.name)
+        metadata["xesam:artist"] = GLib.Variant("as", track.artists)
+        metadata["xesam:albumArtist"] = GLib.Variant("as",
+                                                     track.album_artists)
+        metadata["mpris:length"] = GLib.Variant("x",
+                                                track.duration * 1000 * 1000)
+        metadata["xesam:genre"] = GLib.Variant("as", track.genres)
+        metadata["xesam:url"] = GLib.Variant("s", track.uri)
+        return metadata
+
+    def __get_art_url(self, track):
+        """
+            Get artwork uri for track, may decode and encode artwork
+            @param track as Track
+            @return uri as str or None
+            @thread safe
+        """
+        if track.id == Type.RADIOS:
+            cover_path = Lp().art.get_radio_cache_path(
+                 ", ".join(track.artists),
+                 ArtSize.MONSTER)
+        elif track.id == Type.EXTERNALS:
+            cover_path = "/tmp/lollypop_mpris.jpg"
+            pixbuf = Lp().art.pixbuf_from_tags(
+                GLib.filename_from_uri(track.uri)[0],
+                ArtSize.MONSTER)
+            if pixbuf is not None:
+                pixbuf.savev(cover_path, "jpeg",
+                             ["quality"], ["90"])
+        else:
+            cover_path = Lp().art.get_album_cache_path(track.album,
+                                                       ArtSize.MONSTER)
+        if cover_path is not None:
+            return "file://" + cover_path
+        return None
+
+    def __queue_changed(self, properties):
+        """
+            Emit properties changes once per main loop iteration
+            @param properties as {str: GLib.Variant}
+        """
+        self.__changed.update(properties)
+        if self.__changed_id is None:
+            self.__changed_id = GLib.idle_add(self.__emit_changed,
+                                              priority=GLib.PRIORITY_HIGH_IDLE)
+
+    def __emit_changed(self):
+        """
+            Emit queued properties changes
+        """
+        self.__changed_id = None
+        properties = self.__changed
+        self.__changed = {}
+        try:
+            self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        except Exception as e:
+            print("MPRIS::__emit_changed(): %s" % e)
+
+    def __on_art_url(self, art_url, lollypop_id, track_id):
+        """
+            Add artwork to metadata
+            @param art_url as str or None
+            @param lollypop_id as int
+            @param track_id as GLib.Variant
+        """
+        if art_url is None:
+            return
+        art_url = GLib.Variant("s", art_url)
+        if lollypop_id:
+            metadata = self.__metadatas.get(lollypop_id)
+            if metadata is not None:
+                metadata["mpris:artUrl"] = art_url
+        # Track changed while loading
+        if track_id != self.__track_id or self.__get_status() == "Stopped":
+            return
+        self.__metadata["mpris:artUrl"] = art_url
+        self.__queue_changed({"Metadata": GLib.Variant("a{sv}",
+                                                       self.__metadata)})
 
     def __on_seeked(self, player, position):
         self.Seeked(position * (1000 * 1000))
 
     def __on_volume_changed(self, player, data=None):
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE,
-                               {"Volume": GLib.Variant("d",
-                                Lp().player.volume), },
-                               [])
+        self.__queue_changed({"Volume": GLib.Variant("d",
+                                                     Lp().player.volume)})
 
     def __on_shuffle_changed(self, settings, value):
         shuffle_state = Lp().settings.get_enum("shuffle")
@@ -456,8 +522,7 @@ class MPRIS(Server):
         value = GLib.Variant(
                            "b",
                            shuffle_state != Shuffle.NONE)
-        properties = {"Shuffle": GLib.Variant("b", value)}
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        self.__queue_changed({"Shuffle": GLib.Variant("b", value)})
 
     def __on_playback_changed(self, settings, value):
         value = Lp().settings.get_enum("playback")
@@ -467,8 +532,7 @@ class MPRIS(Server):
             mpris_value = "Track"
         else:
             mpris_value = "None"
-        properties = {"LoopStatus": GLib.Variant("s", mpris_value)}
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        self.__queue_changed({"LoopStatus": GLib.Variant("s", mpris_value)})
 
     def __on_rate_changed(self, player, id_rating):
         rated_track_id, rating = id_rating
@@ -476,8 +540,8 @@ class MPRIS(Server):
         if rated_track_id == self.__lollypop_id and self.__rating != rating:
             self.__rating = rating
             self.__update_metadata()
-            properties = {"Metadata": GLib.Variant("a{sv}", self.__metadata)}
-            self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+            self.__queue_changed({"Metadata": GLib.Variant("a{sv}",
+                                                           self.__metadata)})
 
     def __on_current_changed(self, player):
         current_track_id = Lp().player.current_track.id
@@ -489,16 +553,28 @@ class MPRIS(Server):
         self.__track_id = self.__get_media_id(self.__lollypop_id)
         self.__rating = None
         self.__update_metadata()
-        properties = {"Metadata": GLib.Variant("a{sv}", self.__metadata),
-                      "CanPlay": GLib.Variant("b", True),
-                      "CanPause": GLib.Variant("b", True),
-                      "CanGoNext": GLib.Variant("b", True),
-                      "CanGoPrevious": GLib.Variant("b", True)}
-        try:
-            self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
-        except Exception as e:
-            print("MPRIS::__on_current_changed(): %s" % e)
+        if self.__get_status() != "Stopped" and\
+                "mpris:artUrl" not in self.__metadata:
+            TaskHelper().run(self.__get_art_url,
+                             Lp().player.current_track,
+                             callback=(self.__on_art_url,
+                                       self.__lollypop_id,
+                                       self.__track_id))
+        self.__queue_changed({"Metadata": GLib.Variant("a{sv}",
+                                                       self.__metadata),
+                              "CanPlay": GLib.Variant("b", True),
+                              "CanPause": GLib.Variant("b", True),
+                              "CanGoNext": GLib.Variant("b", True),
+                              "CanGoPrevious": GLib.Variant("b", True)})
+
+    def __on_scan_finished(self, scanner):
+        """
+            Forget metadata, tags may have changed
+            @param scanner as CollectionScanner
+        """
+        self.__metadatas.clear()
 
     def __on_status_changed(self, data=None):
-        properties = {"PlaybackStatus": GLib.Variant("s", self.__get_status())}
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        self.__queue_changed({"PlaybackStatus": GLib.Variant(
+                                                        "s",
+                                                        self.__get_status())})
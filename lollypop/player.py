@@ -10,10 +10,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst
+from gi.repository import Gst, GLib
 
-from pickle import load
 from random import choice
+from time import time
 
 from lollypop.player_bin import BinPlayer
 from lollypop.player_queue import QueuePlayer
@@ -24,7 +24,9 @@ from lollypop.player_externals import ExternalsPlayer
 from lollypop.player_userplaylist import UserPlaylistPlayer
 from lollypop.radios import Radios
 from lollypop.objects import Track, Album
-from lollypop.define import Lp, Type, NextContext, LOLLYPOP_DATA_PATH, Shuffle
+from lollypop.session import Session
+from lollypop.define import Lp, Type, NextContext, Shuffle
+from lollypop.utils import debug
 
 
 class Player(BinPlayer, QueuePlayer, UserPlaylistPlayer, RadioPlayer,
@@ -359,78 +361,38 @@ class Player(BinPlayer, QueuePlayer, UserPlaylistPlayer, RadioPlayer,
     def restore_state(self):
         """
             Restore player state
+            Current track is restored now, playback context later
         """
         try:
-            if Lp().settings.get_value("save-state"):
-                track_id = load(open(LOLLYPOP_DATA_PATH +
-                                     "/track_id.bin",
-                                     "rb"))
-                playlist_ids = load(open(LOLLYPOP_DATA_PATH +
-                                         "/playlist_ids.bin",
-                                         "rb"))
-                (is_playing, was_party) = load(open(LOLLYPOP_DATA_PATH +
-                                                    "/player.bin",
-                                                    "rb"))
-                if playlist_ids and playlist_ids[0] == Type.RADIOS:
-                    radios = Radios()
-                    track = Track()
-                    name = radios.get_name(track_id)
-                    url = radios.get_url(name)
-                    track.set_radio(name, url)
-                    self.load(track)
-                elif Lp().tracks.get_uri(track_id) != "":
-                    track = Track(track_id)
-                    self._load_track(track)
-                    # We set this initial state
-                    # because seek while failed otherwise
-                    self.pause()
-                    if playlist_ids:
-                        pids = []
-                        for playlist_id in playlist_ids:
-                            pids.append(int(playlist_id))
-                        track_ids = []
-                        for playlist_id in playlist_ids:
-                            if playlist_id == Type.POPULARS:
-                                tracks = Lp().tracks.get_populars()
-                            elif playlist_id == Type.RECENTS:
-                                tracks = Lp().tracks.get_recently_listened_to()
-                            elif playlist_id == Type.NEVER:
-                                tracks = Lp().tracks.get_never_listened_to()
-                            elif playlist_id == Type.RANDOMS:
-                                tracks = Lp().tracks.get_randoms()
-                            else:
-                                tracks = Lp().playlists.get_track_ids(
-                                                                   playlist_id)
-                            for track_id in tracks:
-                                if track_id not in track_ids:
-                                    track_ids.append(track_id)
-                            self.populate_user_playlist_by_tracks(track_ids,
-                                                                  pids)
-                    else:
-                        if was_party:
-                            self.emit("party-changed", True)
-                        else:
-                            self._albums = load(open(
-                                                LOLLYPOP_DATA_PATH +
-                                                "/albums.bin",
-                                                "rb"))
-                            self.shuffle_albums(True)
-                            self._context.genre_ids = load(open(
-                                                LOLLYPOP_DATA_PATH +
-                                                "/genre_ids.bin",
-                                                "rb"))
-                            self._context.artist_ids = load(open(
-                                                LOLLYPOP_DATA_PATH +
-                                                "/artist_ids.bin",
-                                                "rb"))
-                    self.set_next()
-                    self.set_prev()
-                    if is_playing:
-                        self.play()
-                    else:
-                        self.pause()
-                else:
-                    print("Player::restore_state(): track missing")
+            if not Lp().settings.get_value("save-state"):
+                return
+            start_time = time()
+            state = Session().load()
+            track_id = state.get("track_id", None)
+            playlist_ids = state.get("playlist_ids", [])
+            if track_id is None:
+                return
+            if playlist_ids and playlist_ids[0] == Type.RADIOS:
+                radios = Radios()
+                track = Track()
+                name = radios.get_name(track_id)
+                url = radios.get_url(name)
+                track.set_radio(name, url)
+                self.load(track)
+            elif Lp().tracks.get_uri(track_id) != "":
+                track = Track(track_id)
+                self._load_track(track)
+                # We set this initial state
+                # because seek while failed otherwise
+                self.pause()
+                if state.get("is_playing", False):
+                    self.play()
+                debug("Player::restore_state(): track restored in %.3fs" %
+                      (time() - start_time))
+                GLib.idle_add(self.__restore_context, state, start_time,
+                              priority=GLib.PRIORITY_LOW)
+            else:
+                print("Player::restore_state(): track missing")
         except Exception as e:
             print("Player::restore_state()", e)
 
@@ -574,6 +536,62 @@ class Player(BinPlayer, QueuePlayer, UserPlaylistPlayer, RadioPlayer,
 #######################
 # PRIVATE             #
 #######################
+    def __restore_context(self, state, start_time):
+        """
+            Restore playback context saved with state
+            @param state as {}
+            @param start_time as float
+        """
+        try:
+            playlist_ids = state.get("playlist_ids", [])
+            if playlist_ids:
+                pids = [int(playlist_id) for playlist_id in playlist_ids]
+                track_ids = state.get("user_playlist", None)
+                if track_ids is None:
+                    track_ids = []
+                    added = set()
+                    for playlist_id in pids:
+                        for track_id in self.__get_playlist_track_ids(
+                                                                 playlist_id):
+                            if track_id not in added:
+                                added.add(track_id)
+                                track_ids.append(track_id)
+                self.populate_user_playlist_by_tracks(track_ids, pids)
+            elif state.get("is_party", False):
+                self.emit("party-changed", True)
+            else:
+                self._albums = state.get("albums", [])
+                self.shuffle_albums(True)
+                self._context.genre_ids = state.get("genre_ids", {})
+                self._context.artist_ids = state.get("artist_ids", {})
+            for track_id in state.get("queue", []):
+                self.append_to_queue(track_id, False)
+            if state.get("queue", []):
+                self.emit("queue-changed")
+            self.set_next()
+            self.set_prev()
+            debug("Player::__restore_context(): context restored in %.3fs" %
+                  (time() - start_time))
+        except Exception as e:
+            print("Player::__restore_context()", e)
+
+    def __get_playlist_track_ids(self, playlist_id):
+        """
+            Get track ids for playlist
+            @param playlist_id as int
+            @return [int]
+        """
+        if playlist_id == Type.POPULARS:
+            return Lp().tracks.get_populars()
+        elif playlist_id == Type.RECENTS:
+            return Lp().tracks.get_recently_listened_to()
+        elif playlist_id == Type.NEVER:
+            return Lp().tracks.get_never_listened_to()
+        elif playlist_id == Type.RANDOMS:
+            return Lp().tracks.get_randoms()
+        else:
+            return Lp().playlists.get_track_ids(playlist_id)
+
     def __on_playback_changed(self, settings, value):
         """
             reset next/prev
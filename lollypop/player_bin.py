@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst, GstAudio, GstPbutils, GLib
+from gi.repository import Gst, GstAudio, GstPbutils, GLib, Gio
 
 from time import time
 
@@ -19,7 +19,8 @@ from lollypop.tagreader import TagReader
 from lollypop.player_plugins import PluginsPlayer
 from lollypop.define import GstPlayFlags, NextContext, Lp
 from lollypop.codecs import Codecs
-from lollypop.define import Type
+from lollypop.define import Type, ArtSize
+from lollypop.helper_task import TaskHelper
 from lollypop.utils import debug
 
 
@@ -27,6 +28,14 @@ class BinPlayer(BasePlayer):
     """
         Gstreamer bin player
     """
+    # Bytes read from next track to warm page cache
+    __PRELOAD_SIZE = 512 * 1024
+    # Track attributes loaded before next track starts
+    __PRELOAD_ATTRS = ["name", "album_id", "artist_ids", "artists",
+                       "album_artists", "album_name", "genres", "duration",
+                       "number", "year"]
+    # Volume steps when fading without stream position, in ms
+    __RAMP_INTERVAL = 50
 
     def __init__(self):
         """
@@ -58,6 +67,13 @@ class BinPlayer(BasePlayer):
             bus.connect("message::stream-start", self._on_stream_start)
             bus.connect("message::tag", self._on_bus_message_tag)
         self._start_time = 0
+        # Fade in, bumped when a new one starts
+        self.__fade_id = 0
+        # Next track preparation, bumped to invalidate a running one
+        self.__prepare_id = 0
+        self.__prepare_pending = False
+        self.connect("next-changed", self.__on_next_changed)
+        self.connect("queue-changed", self.__on_next_changed)
 
     @property
     def preview(self):
@@ -246,6 +262,7 @@ class BinPlayer(BasePlayer):
         if self.__need_to_stop():
             return False
         if init_volume:
+            self._plugins.clear_fade()
             self._plugins.volume.props.volume = 1.0
         debug("BinPlayer::_load_track(): %s" % track.uri)
         try:
@@ -308,12 +325,7 @@ class BinPlayer(BasePlayer):
                                     self._current_track.album_name,
                                     self._current_track.title,
                                     int(self._current_track.duration))
-        try:
-            if not Lp().scanner.is_locked():
-                Lp().tracks.set_listened_at(self._current_track.id,
-                                            int(time()))
-        except:  # Locked database
-            pass
+        Lp().stats.set_listened_at(self._current_track.id, int(time()))
 
     def _on_bus_message_tag(self, bus, message):
         """
@@ -406,25 +418,10 @@ class BinPlayer(BasePlayer):
         if self._current_track.id == Type.RADIOS:
             return
         self._scrobble(self._current_track, self._start_time)
-        # Increment popularity
-        if not Lp().scanner.is_locked() and self._current_track.id >= 0:
-            Lp().tracks.set_more_popular(self._current_track.id)
-            # In party mode, linear popularity
-            if self.is_party:
-                pop_to_add = 1
-            # In normal mode, based on tracks count
-            else:
-                # Some users report an issue where get_tracks_count() return 0
-                # See issue #886
-                # Don"t understand how this can happen!
-                count = Lp().albums.get_tracks_count(
-                                                 self._current_track.album_id)
-                if count:
-                    pop_to_add = int(Lp().albums.max_count / count)
-                else:
-                    pop_to_add = 1
-            Lp().albums.set_more_popular(self._current_track.album_id,
-                                         pop_to_add)
+        # Increment popularity, written in background
+        Lp().stats.add_play(self._current_track.id,
+                            self._current_track.album_id,
+                            self.is_party)
         if self._next_track.id is not None:
             self._load_track(self._next_track)
 
@@ -446,55 +443,30 @@ class BinPlayer(BasePlayer):
             else:
                 self.play()
 
-    def __volume_up(self, playbin, plugins, duration):
+    def __on_crossfade_finished(self, playbin, plugins):
         """
-            Make volume going up smoothly
+            Stop previous playbin once faded out
             @param playbin as Gst.Bin
             @param plugins as PluginsPlayer
-            @param duration as int
         """
-        # We are not the active playbin, stop all
-        if self._playbin != playbin:
+        # We are again the active playbin, keep playing
+        if self._playbin == playbin:
             return
-        if duration > 0:
-            vol = plugins.volume.props.volume
-            steps = duration / 0.25
-            vol_up = (1.0 - vol) / steps
-            rate = vol + vol_up
-            if rate < 1.0:
-                plugins.volume.props.volume = rate
-                GLib.timeout_add(250, self.__volume_up,
-                                 playbin, plugins, duration - 0.25)
-            else:
-                plugins.volume.props.volume = 1.0
-        else:
-            plugins.volume.props.volume = 1.0
+        playbin.set_state(Gst.State.NULL)
+        plugins.clear_fade()
+        plugins.volume.props.volume = 0.0
 
-    def __volume_down(self, playbin, plugins, duration):
+    def __on_fade_in_finished(self, plugins, fade_id):
         """
-            Make volume going down smoothly
-            @param playbin as Gst.Bin
+            Remove fade in, seeking must not fade in again
             @param plugins as PluginsPlayer
-            @param duration as int
+            @param fade_id as int
         """
-        # We are again the active playbin, stop all
-        if self._playbin == playbin:
+        # Another crossfade started
+        if fade_id != self.__fade_id or self._plugins != plugins:
             return
-        if duration > 0:
-            vol = plugins.volume.props.volume
-            steps = duration / 0.25
-            vol_down = vol / steps
-            rate = vol - vol_down
-            if rate > 0:
-                plugins.volume.props.volume = rate
-                GLib.timeout_add(250, self.__volume_down,
-                                 playbin, plugins, duration - 0.25)
-            else:
-                plugins.volume.props.volume = 0.0
-                playbin.set_state(Gst.State.NULL)
-        else:
-            plugins.volume.props.volume = 0.0
-            playbin.set_state(Gst.State.NULL)
+        plugins.clear_fade()
+        plugins.volume.props.volume = 1.0
 
     def __do_crossfade(self, duration, track=None, next=True):
         """
@@ -509,26 +481,24 @@ class BinPlayer(BasePlayer):
 
         if track is None:
             self._scrobble(self._current_track, self._start_time)
-            # Increment popularity
-            if not Lp().scanner.is_locked():
-                Lp().tracks.set_more_popular(self._current_track.id)
-                # In party mode, linear popularity
-                if self.is_party:
-                    pop_to_add = 1
-                # In normal mode, based on tracks count
-                else:
-                    count = Lp().albums.get_tracks_count(
-                                                 self._current_track.album_id)
-                    if count:
-                        pop_to_add = int(Lp().albums.max_count / count)
-                    else:
-                        pop_to_add = 0
-                if pop_to_add > 0:
-                    Lp().albums.set_more_popular(self._current_track.album_id,
-                                                 pop_to_add)
-
-        GLib.idle_add(self.__volume_down, self._playbin,
-                      self._plugins, duration)
+            # Increment popularity, written in background
+            Lp().stats.add_play(self._current_track.id,
+                                self._current_track.album_id,
+                                self.is_party,
+                                False)
+
+        # Fade out current playbin from current position
+        fade_duration = int(duration * Gst.SECOND)
+        volume = self._plugins.volume.props.volume
+        (success, position) = self._playbin.query_position(Gst.Format.TIME)
+        if success:
+            self._plugins.set_fade(position, fade_duration, volume, 0.0)
+        else:
+            # Stream time unknown, control points would be misplaced
+            self.__ramp_volume(self._plugins, volume, 0.0, fade_duration)
+        GLib.timeout_add(fade_duration // Gst.MSECOND,
+                         self.__on_crossfade_finished,
+                         self._playbin, self._plugins)
         if self._playbin == self.__playbin2:
             self._playbin = self.__playbin1
             self._plugins = self._plugins1
@@ -536,21 +506,97 @@ class BinPlayer(BasePlayer):
             self._playbin = self.__playbin2
             self._plugins = self._plugins2
 
+        if track is None:
+            if next and self._next_track.id is not None:
+                track = self._next_track
+            elif self._prev_track.id is not None:
+                track = self._prev_track
         if track is not None:
+            # Fade in new playbin from stream start
+            self._plugins.set_fade(0, fade_duration, 0.0, 1.0)
+            self.__fade_id += 1
+            GLib.timeout_add(fade_duration // Gst.MSECOND,
+                             self.__on_fade_in_finished,
+                             self._plugins, self.__fade_id)
             self.__load(track, False)
-            self._plugins.volume.props.volume = 0
-            GLib.idle_add(self.__volume_up, self._playbin,
-                          self._plugins, duration)
-        elif next and self._next_track.id is not None:
-            self.__load(self._next_track, False)
-            self._plugins.volume.props.volume = 0
-            GLib.idle_add(self.__volume_up, self._playbin,
-                          self._plugins, duration)
-        elif self._prev_track.id is not None:
-            self.__load(self._prev_track, False)
-            self._plugins.volume.props.volume = 0
-            GLib.idle_add(self.__volume_up, self._playbin,
-                          self._plugins, duration)
+
+    def __ramp_volume(self, plugins, volume_from, volume_to, duration):
+        """
+            Fade volume from main loop
+            @param plugins as PluginsPlayer
+            @param volume_from as float
+            @param volume_to as float
+            @param duration as int, in Gst.SECOND
+        """
+        plugins.clear_fade()
+        plugins.volume.props.volume = volume_from
+        GLib.timeout_add(self.__RAMP_INTERVAL, self.__on_ramp_volume,
+                         plugins, GLib.get_monotonic_time(),
+                         duration // Gst.USECOND, volume_from, volume_to)
+
+    def __on_ramp_volume(self, plugins, start, duration,
+                         volume_from, volume_to):
+        """
+            Set volume for elapsed time
+            @param plugins as PluginsPlayer
+            @param start as int, monotonic time in µs
+            @param duration as int, in µs
+            @param volume_from as float
+            @param volume_to as float
+            @return True while fading
+        """
+        # Playbin is active again, stop fading
+        if plugins == self._plugins:
+            return False
+        elapsed = GLib.get_monotonic_time() - start
+        progress = min(elapsed / max(duration, 1), 1.0)
+        plugins.volume.props.volume = volume_from +\
+            (volume_to - volume_from) * progress
+        return progress < 1.0
+
+    def __prepare_next(self):
+        """
+            Prepare next track in background: load attributes from db,
+            warm file and artwork caches
+        """
+        self.__prepare_pending = False
+        track = self._next_track
+        if track.id is None or track.id < 0:
+            return
+        # Sizes used by toolbar, notification and MPRIS
+        sizes = [ArtSize.BIG, ArtSize.MONSTER]
+        if Lp().window is not None:
+            toolbar = Lp().window.toolbar
+            sizes.append(toolbar.artsize * toolbar.get_scale_factor())
+        helper = TaskHelper()
+        helper.run(self.__prepare_track, track, sizes, self.__prepare_id)
+
+    def __prepare_track(self, track, sizes, prepare_id):
+        """
+            Load track attributes, file start and artwork
+            Stop as soon as preparation is invalidated
+            @param track as Track
+            @param sizes as [int]
+            @param prepare_id as int
+            @thread safe
+        """
+        debug("BinPlayer::__prepare_track(): %s" % track.id)
+        for attr in self.__PRELOAD_ATTRS:
+            getattr(track, attr)
+        uri = track.uri
+        if prepare_id != self.__prepare_id:
+            return
+        try:
+            stream = Gio.File.new_for_uri(uri).read(None)
+            stream.read_bytes(self.__PRELOAD_SIZE, None)
+            stream.close(None)
+        except Exception as e:
+            print("BinPlayer::__prepare_track():", e)
+        album = track.album
+        for size in sizes:
+            if prepare_id != self.__prepare_id:
+                return
+            Lp().art.preload_album_artwork(album, size)
 
     def __need_to_stop(self):
         """
@@ -581,6 +627,16 @@ class BinPlayer(BasePlayer):
             self.__playbin1.set_volume(GstAudio.StreamVolumeFormat.CUBIC, vol)
         self.emit("volume-changed")
 
+    def __on_next_changed(self, player):
+        """
+            Invalidate previous preparation and prepare next track
+            @param player as Player
+        """
+        self.__prepare_id += 1
+        if not self.__prepare_pending:
+            self.__prepare_pending = True
+            GLib.idle_add(self.__prepare_next, priority=GLib.PRIORITY_LOW)
+
     def __set_gv_uri(self, uri, track, play):
         """
             Play uri for io
@@ -11,7 +11,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst
+from gi.repository import Gst, GstController
 
 from lollypop.define import Lp
 
@@ -37,6 +37,13 @@ class PluginsPlayer:
         self.volume = Gst.ElementFactory.make("volume",
                                               "volume")
         self.volume.props.volume = 0.0
+        # Volume is interpolated by element for each sample while fading
+        self.__fade = GstController.InterpolationControlSource.new()
+        self.__fade.props.mode = GstController.InterpolationMode.LINEAR
+        self.volume.add_control_binding(
+            GstController.DirectControlBinding.new_absolute(self.volume,
+                                                            "volume",
+                                                            self.__fade))
         self.rgvolume = Gst.ElementFactory.make("rgvolume",
                                                 "rgvolume")
         rglimiter = Gst.ElementFactory.make("rglimiter",
@@ -75,3 +82,21 @@ class PluginsPlayer:
                                "sink",
                                rg_audioconvert1.get_static_pad("sink")))
         playbin.set_property("audio-sink", bin)
+
+    def set_fade(self, start, duration, volume_from, volume_to):
+        """
+            Fade volume from volume_from to volume_to
+            @param start as int, stream time in Gst.SECOND
+            @param duration as int, in Gst.SECOND
+            @param volume_from as float
+            @param volume_to as float
+        """
+        self.__fade.unset_all()
+        self.__fade.set(start, volume_from)
+        self.__fade.set(start + duration, volume_to)
+
+    def clear_fade(self):
+        """
+            Stop fading, volume property is usable again
+        """
+        self.__fade.unset_all()
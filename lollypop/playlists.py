@@ -16,6 +16,7 @@ from gettext import gettext as _
 import itertools
 import sqlite3
 from datetime import datetime
+from threading import Lock
 
 from lollypop.database import Database
 from lollypop.define import Lp, Type
@@ -42,9 +43,20 @@ class Playlists(GObject.GObject):
                             name TEXT NOT NULL,
                             mtime BIGINT NOT NULL)"""
 
+    # Entries are ordered by position, spaced by __POSITION_GAP
+    # so inserting or moving an entry only updates this entry
+    # track_id caches music.tracks.rowid for uri
     __create_tracks = """CREATE TABLE tracks (
+                        id INTEGER PRIMARY KEY,
                         playlist_id INT NOT NULL,
-                        uri TEXT NOT NULL)"""
+                        uri TEXT NOT NULL,
+                        track_id INT,
+                        position INT NOT NULL)"""
+    __create_tracks_idx = [
+        "CREATE INDEX idx_tp ON tracks(playlist_id, position)",
+        "CREATE INDEX idx_tt ON tracks(playlist_id, track_id)",
+        "CREATE INDEX idx_tu ON tracks(uri)"]
+    __POSITION_GAP = 1024
 
     def __init__(self):
         """
@@ -52,6 +64,9 @@ class Playlists(GObject.GObject):
         """
         GObject.GObject.__init__(self)
         self.LOVED = _("Loved tracks")
+        # Track id: playlist ids as set, loaded on first use
+        self.__memberships = None
+        self.__memberships_lock = Lock()
         # Create db schema
         try:
             with SqlCursor(self) as sql:
@@ -60,6 +75,15 @@ class Playlists(GObject.GObject):
                 sql.commit()
         except:
             pass
+        self.__upgrade_tracks()
+        for create in self.__create_tracks_idx:
+            try:
+                with SqlCursor(self) as sql:
+                    sql.execute(create)
+                    sql.commit()
+            except:
+                pass
+        self.resolve_track_ids()
 
     def add(self, name):
         """
@@ -120,6 +144,7 @@ class Playlists(GObject.GObject):
                         WHERE playlist_id=?",
                         (playlist_id,))
             sql.commit()
+            self.__remove_memberships(playlist_id)
             GLib.idle_add(self.emit, "playlists-changed", playlist_id)
 
     def remove(self, uri):
@@ -128,10 +153,15 @@ class Playlists(GObject.GObject):
             @param uri as str
         """
         with SqlCursor(self) as sql:
+            result = sql.execute("SELECT playlist_id, track_id FROM tracks\
+                                  WHERE uri=?", (uri,))
+            entries = list(result)
             sql.execute("DELETE FROM tracks\
                         WHERE uri=?",
                         (uri,))
             sql.commit()
+            for (playlist_id, track_id) in entries:
+                self.__remove_membership(playlist_id, track_id)
 
     def get(self):
         """
@@ -167,7 +197,8 @@ class Playlists(GObject.GObject):
         with SqlCursor(self) as sql:
             result = sql.execute("SELECT uri\
                                   FROM tracks\
-                                  WHERE playlist_id=?", (playlist_id,))
+                                  WHERE playlist_id=?\
+                                  ORDER BY position", (playlist_id,))
             return list(itertools.chain(*result))
 
     def get_track_ids(self, playlist_id):
@@ -178,11 +209,11 @@ class Playlists(GObject.GObject):
             @return array of track id as int
         """
         with SqlCursor(self) as sql:
-            result = sql.execute("SELECT music.tracks.rowid\
-                                  FROM tracks, music.tracks\
-                                  WHERE tracks.playlist_id=?\
-                                  AND music.tracks.uri=\
-                                  main.tracks.uri",
+            result = sql.execute("SELECT track_id\
+                                  FROM tracks\
+                                  WHERE playlist_id=?\
+                                  AND track_id IS NOT NULL\
+                                  ORDER BY position",
                                  (playlist_id,))
             return list(itertools.chain(*result))
 
@@ -196,8 +227,8 @@ class Playlists(GObject.GObject):
             result = sql.execute("SELECT SUM(music.tracks.duration)\
                                   FROM tracks, music.tracks\
                                   WHERE tracks.playlist_id=?\
-                                  AND music.tracks.uri=\
-                                  main.tracks.uri",
+                                  AND music.tracks.rowid=\
+                                  main.tracks.track_id",
                                  (playlist_id,))
             v = result.fetchone()
             if v is not None and v[0] is not None:
@@ -220,8 +251,8 @@ class Playlists(GObject.GObject):
                                   music.tracks.rowid\
                                   AND music.artists.id=\
                                   music.track_artists.artist_id\
-                                  AND music.tracks.uri=\
-                                  main.tracks.uri\
+                                  AND music.tracks.rowid=\
+                                  main.tracks.track_id\
                                   ORDER BY\
                                   music.artists.sortname, album_id",
                                  (playlist_id,))
@@ -295,6 +326,7 @@ class Playlists(GObject.GObject):
             sql.execute("DELETE FROM tracks\
                          WHERE playlist_id=?", (playlist_id,))
             sql.commit()
+            self.__remove_memberships(playlist_id)
             if notify:
                 GLib.idle_add(self.emit, "playlist-del", playlist_id, None)
 
@@ -307,12 +339,12 @@ class Playlists(GObject.GObject):
         """
         with SqlCursor(self) as sql:
             changed = False
+            position = self.__get_last_position(sql, playlist_id)
             for track in tracks:
                 if not self.exists_track(playlist_id, track.id):
                     changed = True
-                    sql.execute("INSERT INTO tracks"
-                                " VALUES (?, ?)",
-                                (playlist_id, track.uri))
+                    position += self.__POSITION_GAP
+                    self.__insert(sql, playlist_id, track, position)
                 if notify:
                     GLib.idle_add(self.emit, "playlist-add",
                                   playlist_id, track.id, -1)
@@ -322,6 +354,60 @@ class Playlists(GObject.GObject):
                                               playlist_id))
                 sql.commit()
 
+    def insert_tracks(self, playlist_id, tracks, dst, up, notify=True):
+        """
+            Insert tracks next to dst if not already present
+            @param playlist id as int
+            @param tracks as [Track]
+            @param dst as track id
+            @param up as bool, insert before dst if True
+            @param notify as bool
+        """
+        with SqlCursor(self) as sql:
+            index = self.get_position(playlist_id, dst)
+            if not up:
+                index += 1
+            changed = False
+            for track in tracks:
+                if self.exists_track(playlist_id, track.id):
+                    continue
+                changed = True
+                position = self.__get_position_next_to(sql, playlist_id,
+                                                       dst, up)
+                self.__insert(sql, playlist_id, track, position)
+                if notify:
+                    GLib.idle_add(self.emit, "playlist-add",
+                                  playlist_id, track.id, index)
+                # Next tracks go after this one
+                dst = track.id
+                up = False
+                index += 1
+            if changed:
+                sql.execute("UPDATE playlists SET mtime=?\
+                             WHERE rowid=?", (datetime.now().strftime("%s"),
+                                              playlist_id))
+                sql.commit()
+
+    def move_track(self, playlist_id, src, dst, up):
+        """
+            Move track next to dst
+            @param playlist id as int
+            @param src as track id
+            @param dst as track id
+            @param up as bool, move before dst if True
+        """
+        if src == dst:
+            return
+        with SqlCursor(self) as sql:
+            position = self.__get_position_next_to(sql, playlist_id, dst, up)
+            sql.execute("UPDATE tracks SET position=?\
+                         WHERE playlist_id=? AND track_id=?",
+                        (position, playlist_id, src))
+            sql.execute("UPDATE playlists SET mtime=?\
+                         WHERE rowid=?", (datetime.now().strftime("%s"),
+                                          playlist_id))
+            sql.commit()
+
     def remove_tracks(self, playlist_id, tracks, notify=True):
         """
             Remove tracks from playlist
@@ -333,6 +419,7 @@ class Playlists(GObject.GObject):
                 sql.execute("DELETE FROM tracks\
                              WHERE uri=?\
                              AND playlist_id=?", (track.uri, playlist_id))
+                self.__remove_membership(playlist_id, track.id)
                 if notify:
                     GLib.idle_add(self.emit, "playlist-del",
                                   playlist_id, track.id)
@@ -378,26 +465,13 @@ class Playlists(GObject.GObject):
                     track_id = Lp().tracks.get_id_by_uri(uri)
                     track_ids = [track_id]
                 tracks = []
+                for track_id in track_ids:
+                    tracks.append(Track(track_id))
                 if start is None:
-                    for track_id in track_ids:
-                        tracks.append(Track(track_id))
                     self.add_tracks(playlist_id, tracks)
                 else:
                     # Insert at wanted position
-                    playlist_track_ids = self.get_track_ids(playlist_id)
-                    start_idx = playlist_track_ids.index(start)
-                    if not up:
-                        start_idx += 1
-                    for track_id in track_ids:
-                        playlist_track_ids.insert(start_idx, track_id)
-                        GLib.idle_add(self.emit, "playlist-add",
-                                      playlist_id, track_id, start_idx)
-                        start_idx += 1
-                    self.clear(playlist_id, False)
-                    tracks = []
-                    for track_id in playlist_track_ids:
-                        tracks.append(Track(track_id))
-                    self.add_tracks(playlist_id, tracks, False)
+                    self.insert_tracks(playlist_id, tracks, start, up)
         except:
             pass
 
@@ -408,12 +482,24 @@ class Playlists(GObject.GObject):
             @param track id as int
             @return position as int
         """
-        i = 0
-        for tid in self.get_track_ids(playlist_id):
-            if track_id == tid:
-                break
-            i += 1
-        return i
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT position FROM tracks\
+                                  WHERE playlist_id=? AND track_id=?",
+                                 (playlist_id, track_id))
+            v = result.fetchone()
+            # Not found, after last track
+            if v is None:
+                result = sql.execute("SELECT COUNT(*) FROM tracks\
+                                      WHERE playlist_id=?\
+                                      AND track_id IS NOT NULL",
+                                     (playlist_id,))
+            else:
+                result = sql.execute("SELECT COUNT(*) FROM tracks\
+                                      WHERE playlist_id=?\
+                                      AND track_id IS NOT NULL\
+                                      AND position<?",
+                                     (playlist_id, v[0]))
+            return result.fetchone()[0]
 
     def exists_track(self, playlist_id, track_id):
         """
@@ -422,18 +508,9 @@ class Playlists(GObject.GObject):
             @param track as Track
             @return bool
         """
-        with SqlCursor(self) as sql:
-            result = sql.execute("SELECT main.tracks.uri\
-                                  FROM tracks, music.tracks\
-                                  WHERE music.tracks.rowid=?\
-                                  AND playlist_id=?\
-                                  AND music.tracks.uri=\
-                                  main.tracks.uri",
-                                 (track_id, playlist_id))
-            v = result.fetchone()
-            if v is not None:
-                return True
-            return False
+        with self.__memberships_lock:
+            memberships = self.__get_memberships()
+            return playlist_id in memberships.get(track_id, ())
 
     def exists_album(self, playlist_id, album_id, genre_ids, artist_ids):
         """
@@ -446,11 +523,44 @@ class Playlists(GObject.GObject):
             @return bool
         """
         # We do not use Album object for performance reasons
-        playlist_uris = self.get_tracks(playlist_id)
-        track_uris = Lp().albums.get_track_uris(album_id,
-                                                genre_ids,
-                                                artist_ids)
-        return len(set(playlist_uris) & set(track_uris)) == len(track_uris)
+        track_ids = Lp().albums.get_track_ids(album_id,
+                                              genre_ids,
+                                              artist_ids)
+        with self.__memberships_lock:
+            memberships = self.__get_memberships()
+            for track_id in track_ids:
+                if playlist_id not in memberships.get(track_id, ()):
+                    return False
+        return True
+
+    def resolve_track_ids(self):
+        """
+            Set track ids for entries not matching collection,
+            tracks get a new id when scanner adds them again
+            @thread safe
+        """
+        try:
+            with SqlCursor(self) as sql:
+                # Only look up cached ids, do not join on uris
+                result = sql.execute("SELECT main.tracks.id, main.tracks.uri\
+                                      FROM tracks LEFT JOIN music.tracks\
+                                      ON music.tracks.rowid=\
+                                      main.tracks.track_id\
+                                      WHERE music.tracks.uri IS NOT\
+                                      main.tracks.uri")
+                entries = list(result)
+                if not entries:
+                    return
+                result = sql.execute("SELECT uri, rowid FROM music.tracks")
+                track_ids = dict(result)
+                sql.executemany("UPDATE tracks SET track_id=? WHERE id=?",
+                                [(track_ids.get(uri, None), entry_id)
+                                 for (entry_id, uri) in entries])
+                sql.commit()
+            with self.__memberships_lock:
+                self.__memberships = None
+        except Exception as e:
+            print("Playlists::resolve_track_ids():", e)
 
     def get_cursor(self):
         """
@@ -467,3 +577,149 @@ class Playlists(GObject.GObject):
 #######################
 # PRIVATE             #
 #######################
+    def __upgrade_tracks(self):
+        """
+            Add entry id, track id and position to old tracks table,
+            keeping insertion order
+        """
+        try:
+            with SqlCursor(self) as sql:
+                result = sql.execute("PRAGMA table_info(tracks)")
+                if "position" in [row[1] for row in result]:
+                    return
+                sql.execute("ALTER TABLE tracks RENAME TO tmp_tracks")
+                sql.execute(self.__create_tracks)
+                sql.execute("INSERT INTO tracks (playlist_id, uri, position)\
+                             SELECT playlist_id, uri, rowid * ?\
+                             FROM tmp_tracks", (self.__POSITION_GAP,))
+                sql.execute("DROP TABLE tmp_tracks")
+                sql.commit()
+        except Exception as e:
+            print("Playlists::__upgrade_tracks():", e)
+
+    def __get_memberships(self):
+        """
+            Get playlists containing tracks, load them if needed
+            @return {track id as int: playlist ids as set}
+            @warning: memberships lock needed
+        """
+        if self.__memberships is None:
+            self.__memberships = {}
+            with SqlCursor(self) as sql:
+                result = sql.execute("SELECT track_id, playlist_id\
+                                      FROM tracks\
+                                      WHERE track_id IS NOT NULL")
+                for (track_id, playlist_id) in result:
+                    self.__memberships.setdefault(track_id,
+                                                  set()).add(playlist_id)
+        return self.__memberships
+
+    def __remove_membership(self, playlist_id, track_id):
+        """
+            Forget track in playlist
+            @param playlist id as int
+            @param track id as int
+        """
+        with self.__memberships_lock:
+            if self.__memberships is not None and\
+                    track_id in self.__memberships:
+                self.__memberships[track_id].discard(playlist_id)
+                if not self.__memberships[track_id]:
+                    del self.__memberships[track_id]
+
+    def __remove_memberships(self, playlist_id):
+        """
+            Forget all tracks in playlist
+            @param playlist id as int
+        """
+        with self.__memberships_lock:
+            if self.__memberships is not None:
+                for track_id in list(self.__memberships.keys()):
+                    self.__memberships[track_id].discard(playlist_id)
+                    if not self.__memberships[track_id]:
+                        del self.__memberships[track_id]
+
+    def __insert(self, sql, playlist_id, track, position):
+        """
+            Insert track in playlist
+            @param sql as sqlite cursor
+            @param playlist id as int
+            @param track as Track
+            @param position as int
+            @warning: commit needed
+        """
+        sql.execute("INSERT INTO tracks\
+                     (playlist_id, uri, track_id, position)\
+                     VALUES (?, ?, ?, ?)",
+                    (playlist_id, track.uri, track.id, position))
+        with self.__memberships_lock:
+            if self.__memberships is not None:
+                self.__memberships.setdefault(track.id,
+                                              set()).add(playlist_id)
+
+    def __get_last_position(self, sql, playlist_id):
+        """
+            Get last position in playlist
+            @param sql as sqlite cursor
+            @param playlist id as int
+            @return position as int, 0 if playlist is empty
+        """
+        result = sql.execute("SELECT MAX(position) FROM tracks\
+                              WHERE playlist_id=?", (playlist_id,))
+        v = result.fetchone()
+        if v is not None and v[0] is not None:
+            return v[0]
+        return 0
+
+    def __get_position_next_to(self, sql, playlist_id, track_id, up):
+        """
+            Get a free position next to track
+            @param sql as sqlite cursor
+            @param playlist id as int
+            @param track id as int
+            @param up as bool, before track if True
+            @return position as int
+        """
+        result = sql.execute("SELECT position FROM tracks\
+                              WHERE playlist_id=? AND track_id=?",
+                             (playlist_id, track_id))
+        v = result.fetchone()
+        if v is None:
+            return self.__get_last_position(sql, playlist_id) +\
+                self.__POSITION_GAP
+        position = v[0]
+        if up:
+            result = sql.execute("SELECT MAX(position) FROM tracks\
+                                  WHERE playlist_id=? AND position<?",
+                                 (playlist_id, position))
+        else:
+            result = sql.execute("SELECT MIN(position) FROM tracks\
+                                  WHERE playlist_id=? AND position>?",
+                                 (playlist_id, position))
+        neighbour = result.fetchone()[0]
+        if neighbour is None:
+            if up:
+                return position - self.__POSITION_GAP
+            else:
+                return position + self.__POSITION_GAP
+        # No free position left, space entries again
+        if abs(neighbour - position) < 2:
+            self.__renumber(sql, playlist_id)
+            return self.__get_position_next_to(sql, playlist_id,
+                                               track_id, up)
+        return (neighbour + position) // 2
+
+    def __renumber(self, sql, playlist_id):
+        """
+            Space playlist entries by __POSITION_GAP
+            @param sql as sqlite cursor
+            @param playlist id as int
+            @warning: commit needed
+        """
+        result = sql.execute("SELECT id FROM tracks\
+                              WHERE playlist_id=?\
+                              ORDER BY position", (playlist_id,))
+        sql.executemany("UPDATE tracks SET position=? WHERE id=?",
+                        [((i + 1) * self.__POSITION_GAP, entry_id)
+                         for (i, entry_id) in enumerate(
+                                             itertools.chain(*result))])
@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, GLib, Gdk, Pango, GObject
+from gi.repository import Gtk, GLib, Gdk, Pango, GObject, Gio
 
 from gettext import gettext as _
 
@@ -54,6 +54,8 @@ class AlbumRow(Gtk.ListBoxRow):
         Gtk.ListBoxRow.__init__(self)
         self.__album = Album(album_id)
         self.__play_indicator = None
+        self.__artwork_priority = GLib.PRIORITY_LOW
+        self.__artwork_cancellable = Gio.Cancellable()
         self.set_sensitive(False)
         self.get_style_context().add_class("loading")
         self.__height = height
@@ -88,12 +90,13 @@ class AlbumRow(Gtk.ListBoxRow):
         self.__title_label.set_ellipsize(Pango.EllipsizeMode.END)
         cover = Gtk.Image()
         cover.get_style_context().add_class("small-cover-frame")
-        surface = Lp().art.get_album_artwork(
-                                        self.__album,
-                                        ArtSize.MEDIUM,
-                                        self.get_scale_factor())
-        cover.set_from_surface(surface)
         cover.set_size_request(ArtSize.MEDIUM, ArtSize.MEDIUM)
+        Lp().art.get_album_artwork_async(self.__album,
+                                         ArtSize.MEDIUM,
+                                         self.get_scale_factor(),
+                                         self.__artwork_cancellable,
+                                         self.__artwork_priority,
+                                         cover.set_from_surface)
         self.__play_indicator = Gtk.Image.new_from_icon_name(
                                                "media-playback-start-symbolic",
                                                Gtk.IconSize.MENU)
@@ -133,6 +136,7 @@ class AlbumRow(Gtk.ListBoxRow):
         self.connect("drag-data-received", self.__on_drag_data_received)
         self.connect("drag-motion", self.__on_drag_motion)
         self.connect("drag-leave", self.__on_drag_leave)
+        self.connect("destroy", self.__on_destroy)
 
     def do_get_preferred_height(self):
         """
@@ -141,6 +145,13 @@ class AlbumRow(Gtk.ListBoxRow):
         """
         return (self.__height, self.__height)
 
+    def set_artwork_priority(self, priority):
+        """
+            Set artwork loading priority, visible rows first
+            @param priority as int (GLib.PRIORITY_*)
+        """
+        self.__artwork_priority = priority
+
     @property
     def id(self):
         """
@@ -167,6 +178,13 @@ class AlbumRow(Gtk.ListBoxRow):
 #######################
 # PRIVATE             #
 #######################
+    def __on_destroy(self, widget):
+        """
+            Cancel artwork loading
+            @param widget as Gtk.Widget
+        """
+        self.__artwork_cancellable.cancel()
+
     def __on_drag_begin(self, widget, context):
         """
             Set icon
@@ -370,7 +388,7 @@ class AlbumsView(LazyLoadingView):
             row = self.__row_for_album_id(album_id)
             row.show()
             self.__view.add(row)
-            self._lazy_queue.append(row)
+            self.append(row)
             GLib.idle_add(self.__add_items, items, album_id)
         else:
             GLib.idle_add(self.lazy_loading)
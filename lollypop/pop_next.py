@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk
+from gi.repository import Gtk, Gio, GLib
 
 from lollypop.define import Lp, ArtSize, Shuffle
 
@@ -26,6 +26,7 @@ class NextPopover(Gtk.Popover):
         """
         Gtk.Popover.__init__(self)
         self.__inhibited = False
+        self.__artwork_cancellable = Gio.Cancellable()
         self.set_position(Gtk.PositionType.BOTTOM)
         self.connect("map", self.__on_map)
         self.connect("unmap", self.__on_unmap)
@@ -47,22 +48,15 @@ class NextPopover(Gtk.Popover):
         """
         self.__artist_label.set_text(", ".join(Lp().player.next_track.artists))
         self.__title_label.set_text(Lp().player.next_track.title)
-        art = Lp().art.get_album_artwork(
-                               Lp().player.next_track.album,
-                               ArtSize.MEDIUM,
-                               self.get_scale_factor())
-        if art is not None:
-            self.__cover.set_from_surface(art)
-            del art
-            self.__cover.set_tooltip_text(Lp().player.next_track.album.name)
-            self.__cover.show()
-            queue = Lp().player.queue
-            if queue and queue[0] == Lp().player.next_track.id:
-                self.__skip_btn.hide()
-            else:
-                self.__skip_btn.show()
-        else:
-            self.__cover.hide()
+        self.__artwork_cancellable.cancel()
+        self.__artwork_cancellable = Gio.Cancellable()
+        Lp().art.get_album_artwork_async(Lp().player.next_track.album,
+                                         ArtSize.MEDIUM,
+                                         self.get_scale_factor(),
+                                         self.__artwork_cancellable,
+                                         GLib.PRIORITY_DEFAULT,
+                                         self.__on_album_artwork,
+                                         Lp().player.next_track)
 
     def should_be_shown(self):
         """
@@ -140,10 +134,26 @@ class NextPopover(Gtk.Popover):
             Disconnect signal
             @param widget as Gtk.Widget
         """
+        self.__artwork_cancellable.cancel()
         if self._signal_id is not None:
             Lp().player.disconnect(self._signal_id)
             self._signal_id = None
 
+    def __on_album_artwork(self, surface, track):
+        """
+            Set album artwork
+            @param surface as cairo.Surface
+            @param track as Track
+        """
+        self.__cover.set_from_surface(surface)
+        self.__cover.set_tooltip_text(track.album.name)
+        self.__cover.show()
+        queue = Lp().player.queue
+        if queue and queue[0] == track.id:
+            self.__skip_btn.hide()
+        else:
+            self.__skip_btn.show()
+
     def __on_enter_notify(self, widget, event):
         """
             Disable overlays
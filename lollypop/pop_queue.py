@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, GLib, Gdk, Pango, GObject
+from gi.repository import Gtk, GLib, Gio, Gdk, Pango, GObject
 
 from lollypop.define import Lp, ArtSize, Type
 from lollypop.objects import Track, Album
@@ -32,6 +32,7 @@ class QueueRow(Gtk.ListBoxRow):
         Gtk.ListBoxRow.__init__(self)
         self.__id = track_id
         self.__number = 0
+        self.__artwork_cancellable = Gio.Cancellable()
         self.set_margin_start(5)
         self.set_margin_end(5)
         self.set_margin_top(2)
@@ -98,6 +99,7 @@ class QueueRow(Gtk.ListBoxRow):
         self.connect("drag-data-received", self.__on_drag_data_received)
         self.connect("drag-motion", self.__on_drag_motion)
         self.connect("drag-leave", self.__on_drag_leave)
+        self.connect("destroy", self.__on_destroy)
         self.get_style_context().add_class("trackrow")
 
     def show_header(self, show):
@@ -137,21 +139,35 @@ class QueueRow(Gtk.ListBoxRow):
                                    title)
         self.__title_label.set_markup(title)
 
-    def set_cover(self, surface):
+    def set_cover(self, album):
         """
-            Set cover surface
-            @param surface as cairo.Surface
+            Set cover for album, loaded in background
+            @param album as Album/None
         """
-        if surface is None:
+        self.__artwork_cancellable.cancel()
+        self.__artwork_cancellable = Gio.Cancellable()
+        if album is None:
             self.__cover.clear()
             self.__cover.hide()
         else:
-            self.__cover.set_from_surface(surface)
             self.__cover.show()
+            Lp().art.get_album_artwork_async(album,
+                                             ArtSize.MEDIUM,
+                                             self.get_scale_factor(),
+                                             self.__artwork_cancellable,
+                                             GLib.PRIORITY_DEFAULT,
+                                             self.__cover.set_from_surface)
 
 #######################
 # PRIVATE             #
 #######################
+    def __on_destroy(self, widget):
+        """
+            Cancel artwork loading
+            @param widget as Gtk.Widget
+        """
+        self.__artwork_cancellable.cancel()
+
     def __on_drag_begin(self, widget, context):
         """
             Set icon
@@ -316,11 +332,7 @@ class QueuePopover(Gtk.Popover):
             album_id = Lp().tracks.get_album_id(track_id)
             row = self.__row_for_track_id(track_id)
             if album_id != prev_album_id:
-                surface = Lp().art.get_album_artwork(
-                                        Album(album_id),
-                                        ArtSize.MEDIUM,
-                                        self.get_scale_factor())
-                row.set_cover(surface)
+                row.set_cover(Album(album_id))
                 row.show_header(True)
             self.__view.add(row)
             GLib.idle_add(self.__add_items, items, album_id)
@@ -380,11 +392,7 @@ class QueuePopover(Gtk.Popover):
                 child.set_cover(None)
                 child.show_header(False)
             else:
-                surface = Lp().art.get_album_artwork(
-                                        Album(track.album.id),
-                                        ArtSize.MEDIUM,
-                                        self.get_scale_factor())
-                child.set_cover(surface)
+                child.set_cover(Album(track.album.id))
                 child.show_header(True)
             prev_album_id = track.album.id
 
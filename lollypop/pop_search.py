@@ -16,7 +16,6 @@ from lollypop.define import Lp, ArtSize, Type
 from lollypop.objects import Track, Album
 from lollypop.pop_menu import TrackMenuPopover, TrackMenu
 from lollypop.view_albums import AlbumBackView
-from lollypop.utils import noaccents
 from lollypop.helper_task import TaskHelper
 from lollypop.search import Search
 
@@ -34,7 +33,6 @@ class SearchRow(Gtk.ListBoxRow):
         """
         Gtk.ListBoxRow.__init__(self)
         self.__item = item
-        self.__score = None
         builder = Gtk.Builder()
         builder.add_from_resource("/org/gnome/Lollypop/SearchRow.ui")
         self.__stack = builder.get_object("stack")
@@ -48,6 +46,11 @@ class SearchRow(Gtk.ListBoxRow):
         self.__name = builder.get_object("item")
         self.__cover = builder.get_object("cover")
         self.add(self.__row_widget)
+        self.__artwork_cancellable = Gio.Cancellable()
+        self.__artwork_loaded = False
+        self.connect("map", self.__on_map)
+        self.connect("unmap", self.__on_unmap)
+        self.connect("destroy", self.__on_unmap)
         self.__init()
 
     @property
@@ -64,7 +67,7 @@ class SearchRow(Gtk.ListBoxRow):
             Get row score
             @return int
         """
-        return self.__score
+        return self.__item.score
 
     @property
     def name(self):
@@ -123,13 +126,6 @@ class SearchRow(Gtk.ListBoxRow):
                     break
         return found
 
-    def set_score(self, score):
-        """
-            Set score
-            @param score as int
-        """
-        self.__score = score
-
     def set_cover(self, pixbuf):
         """
             Set cover
@@ -188,35 +184,46 @@ class SearchRow(Gtk.ListBoxRow):
         """
             Init row
         """
-        artists = []
         if self.__item.is_track:
-            obj = Track(self.__item.id)
-            album_id = obj.album_id
+            self.__name.set_text("♫ " + self.__item.name)
         else:
-            obj = Album(self.__item.id)
-            album_id = obj.id
-
+            self.__name.set_text(self.__item.name)
         if self.__item.id is None:
-            if self.__item.is_track:
-                self.__name.set_text("♫ " + self.__item.name)
-            else:
-                self.__name.set_text(self.__item.name)
-            artists = self.__item.artists
             surface = Lp().art.get_default_icon("emblem-music-symbolic",
                                                 ArtSize.MEDIUM,
                                                 self.get_scale_factor())
-        else:
-            if self.__item.is_track:
-                self.__name.set_text("♫ " + Track(self.__item.id).name)
-            else:
-                self.__name.set_text(Album(self.__item.id).name)
-            for artist_id in self.__item.artist_ids:
-                artists.append(Lp().artists.get_name(artist_id))
-            surface = Lp().art.get_album_artwork(Album(album_id),
-                                                 ArtSize.MEDIUM,
-                                                 self.get_scale_factor())
+            self.__cover.set_from_surface(surface)
+        self.__artist.set_text(", ".join(self.__item.artists))
+
+    def __on_map(self, widget):
+        """
+            Load artwork if not already loaded
+            @param widget as Gtk.Widget
+        """
+        if self.__item.id is None or self.__artwork_loaded:
+            return
+        self.__artwork_cancellable = Gio.Cancellable()
+        Lp().art.get_album_artwork_async(Album(self.__item.album_id),
+                                         ArtSize.MEDIUM,
+                                         self.get_scale_factor(),
+                                         self.__artwork_cancellable,
+                                         GLib.PRIORITY_DEFAULT,
+                                         self.__on_album_artwork)
+
+    def __on_unmap(self, widget):
+        """
+            Cancel artwork loading
+            @param widget as Gtk.Widget
+        """
+        self.__artwork_cancellable.cancel()
+
+    def __on_album_artwork(self, surface):
+        """
+            Set album artwork
+            @param surface as cairo.Surface
+        """
+        self.__artwork_loaded = True
         self.__cover.set_from_surface(surface)
-        self.__artist.set_text(", ".join(artists))
 
     def __on_query_tooltip(self, widget, x, y, keyboard, tooltip):
         """
@@ -253,7 +260,10 @@ class SearchPopover(Gtk.Popover):
         self.__timeout_id = None
         self.__current_search = ""
         self.__cancellable = Gio.Cancellable()
-        self.__history = []
+        self.__search = Search()
+        # Rows queued but not added yet, search running
+        self.__pending_rows = 0
+        self.__searching = False
 
         builder = Gtk.Builder()
         builder.add_from_resource("/org/gnome/Lollypop/SearchPopover.ui")
@@ -307,7 +317,6 @@ class SearchPopover(Gtk.Popover):
             Timeout filtering
             @param widget as Gtk.TextEntry
         """
-        self.__cancellable.reset()
         if self.__timeout_id:
             GLib.source_remove(self.__timeout_id)
             self.__timeout_id = None
@@ -324,46 +333,12 @@ class SearchPopover(Gtk.Popover):
 #######################
 # PRIVATE             #
 #######################
-    def __calculate_score(self, row):
-        """
-            Calculate score for row
-            @param row as SearchRow
-        """
-        if row.score is not None:
-            return
-        score = 0
-        artists = []
-        for artist_id in row.artist_ids:
-            artists.append(Lp().artists.get_name(artist_id))
-
-        for item in self.__current_search.split():
-            try:
-                year = int(item)
-                if year == row.year:
-                    score += 2
-            except:
-                pass
-            for artist in artists:
-                if noaccents(artist.lower()).find(
-                                                noaccents(item).lower()) != -1:
-                    score += 2
-                    if not row.is_track:
-                        score += 1
-            if noaccents(row.name).lower().find(
-                                                noaccents(item).lower()) != -1:
-                score += 1
-                if row.is_track:
-                    score += 1
-        row.set_score(score)
-
     def __sort_func(self, row1, row2):
         """
             Sort rows
             @param row as SearchRow
             @param row as SearchRow
         """
-        self.__calculate_score(row1)
-        self.__calculate_score(row2)
         return row1.score < row2.score
 
     def __clear(self):
@@ -378,17 +353,14 @@ class SearchPopover(Gtk.Popover):
             in db based on text entry current text
         """
         self.__clear()
+        self.__pending_rows = 0
+        self.__searching = True
         self.__header_stack.set_visible_child(self.__spinner)
         self.__spinner.start()
-        self.__history = []
-        search_items = [self.__current_search]
-        for item in self.__current_search.split():
-            if len(item) >= 3 and item not in search_items:
-                search_items.append(item)
-        search = Search()
-        search.get(search_items,
-                   self.__cancellable,
-                   callback=(self.__on_search_get,))
+        self.__search.get(self.__current_search,
+                          self.__cancellable,
+                          self.__on_search_get,
+                          self.__on_search_finished)
 
     def __new_playlist(self, params):
         """
@@ -411,21 +383,45 @@ class SearchPopover(Gtk.Popover):
                 playlist_id = Lp().playlists.get_id(self.__current_search)
             Lp().playlists.add_tracks(playlist_id, tracks)
 
-    def __on_search_get(self, items):
+    def __add_rows(self, items, cancellable):
         """
-            Add rows for internal results
+            Add rows for items, one by one
             @param items as [SearchItem]
+            @param cancellable as Gio.Cancellable
         """
-        if items:
+        if items and not cancellable.is_cancelled():
             item = items.pop(0)
             search_row = SearchRow(item)
             search_row.show()
             self.__view.add(search_row)
-            GLib.idle_add(self.__on_search_get, items)
-        else:
-            GLib.idle_add(self.__spinner.stop)
-            GLib.idle_add(self.__header_stack.set_visible_child,
-                          self.__new_btn)
+            self.__pending_rows -= 1
+            if items:
+                GLib.idle_add(self.__add_rows, items, cancellable)
+            else:
+                self.__check_finished()
+
+    def __check_finished(self):
+        """
+            Stop spinner if search finished and all rows are shown
+        """
+        if not self.__searching and self.__pending_rows == 0:
+            self.__spinner.stop()
+            self.__header_stack.set_visible_child(self.__new_btn)
+
+    def __on_search_get(self, items):
+        """
+            Add rows for internal results
+            @param items as [SearchItem]
+        """
+        self.__pending_rows += len(items)
+        self.__add_rows(items, self.__cancellable)
+
+    def __on_search_finished(self):
+        """
+            Stop spinner once queued rows are added
+        """
+        self.__searching = False
+        self.__check_finished()
 
     def __on_map(self, widget):
         """
@@ -434,6 +430,8 @@ class SearchPopover(Gtk.Popover):
         """
         # FIXME Not needed with GTK >= 3.18
         Lp().window.enable_global_shortcuts(False)
+        # Collection may have changed, do not refine previous results
+        self.__search = Search()
         height = Lp().window.get_size()[1]
         self.set_size_request(450, height*0.7)
 
@@ -453,8 +451,9 @@ class SearchPopover(Gtk.Popover):
             Populate widget
         """
         self.__timeout_id = None
+        # Pending results will check their own cancellable
         self.__cancellable.cancel()
-        self.__cancellable.reset()
+        self.__cancellable = Gio.Cancellable()
         self.__populate()
 
     def __on_row_activated(self, widget, row):
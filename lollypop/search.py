@@ -10,8 +10,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from gi.repository import GLib
+
+from copy import copy
+
 from lollypop.define import Lp
 from lollypop.helper_task import TaskHelper
+from lollypop.utils import noaccents
 
 
 class SearchItem:
@@ -21,100 +26,204 @@ class SearchItem:
     def __init__(self):
         self.is_track = False
         self.id = None
+        self.album_id = None
+        self.name = ""
+        self.year = None
+        self.artist_ids = []
+        self.artists = []
+        # Lower case strings without accents matched by search
+        self.keys = []
+        self.score = 0
 
 
 class Search:
     """
         Local search
+        Scored items are passed to callback as soon as found
+        When search is refined, previous items are filtered in memory
     """
+    __LIMIT = 25
 
     def __init__(self):
         """
             Init search
         """
-        pass
+        # Items for last search terms, only if not limited by __LIMIT
+        self.__items = {}
 
-    def get(self, search_items, cancellable, callback):
+    def get(self, search, cancellable, callback, finished):
         """
-            Get track for name
-            @param search_items as [str]
+            Get albums and tracks for search
+            @param search as str
             @param cancellable as Gio.Cancellable
-            @param callback as callback
+            @param callback as function([SearchItem]), called for
+                   each new batch of items
+            @param finished as function()
         """
         helper = TaskHelper()
-        helper.run(self.__get, search_items, cancellable, callback=callback)
+        helper.run(self.__get, search, cancellable, callback,
+                   callback=(self.__on_finished, cancellable, finished))
 
 #######################
 # PRIVATE             #
 #######################
-    def __get(self, search_items, cancellable):
+    def __get(self, search, cancellable, callback):
         """
-            Get track for name
-            @param search_items as [str]
+            Get albums and tracks for search
+            @param search as str
             @param cancellable as Gio.Cancellable
-            @return items as [SearchItem]
+            @param callback as function([SearchItem])
         """
-        items = []
-        added_album_ids = []
-        added_track_ids = []
-        for item in search_items:
+        words = [(word, noaccents(word).lower()) for word in search.split()]
+        terms = [search]
+        for (word, key) in words:
+            if len(word) >= 3 and word not in terms:
+                terms.append(word)
+        found = set()
+        terms_items = {}
+        for term in terms:
             if cancellable.is_cancelled():
                 return
-            albums = []
-            tracks_non_album_artist = []
-            # Get all albums for all artists and non album_artist tracks
-            for artist_id in Lp().artists.search(item):
-                if cancellable.is_cancelled():
-                    return
-                for album_id in Lp().albums.get_ids([artist_id], []):
-                    if (album_id, artist_id) not in albums:
-                        albums.append((album_id, artist_id))
-                for track_id, track_name in Lp(
-                                   ).tracks.get_as_non_album_artist(artist_id):
-                    tracks_non_album_artist.append((track_id, track_name))
-
-            for album_id, artist_id in albums:
-                if cancellable.is_cancelled():
-                    return
-                if album_id in added_album_ids:
+            key = noaccents(term).lower()
+            (items, complete) = self.__get_for_term(term, key)
+            if complete:
+                terms_items[key] = items
+            new_items = []
+            for item in items:
+                if (item.is_track, item.id) in found:
                     continue
-                search_item = SearchItem()
-                search_item.id = album_id
-                added_album_ids.append(album_id)
-                search_item.is_track = False
-                search_item.artist_ids = [artist_id]
-                search_item.year = Lp().albums.get_year(album_id)
-                items.append(search_item)
+                found.add((item.is_track, item.id))
+                # Items may be shared with next search
+                item = copy(item)
+                item.score = self.__get_score(item, words)
+                new_items.append(item)
+            if new_items:
+                GLib.idle_add(self.__emit, cancellable, callback, new_items)
+        if not cancellable.is_cancelled():
+            self.__items = terms_items
+
+    def __get_for_term(self, term, key):
+        """
+            Get albums and tracks for term
+            @param term as str
+            @param key as str, term lower case without accents
+            @return ([SearchItem], complete as bool)
+        """
+        # Years are not searched as substrings
+        try:
+            year = int(term)
+        except:
+            year = None
+        if year is None:
+            for (previous_key, items) in self.__items.items():
+                if previous_key in key:
+                    return ([item for item in items
+                             if self.__match(item, key)], True)
+        artist_ids = Lp().artists.search(term)
+        complete = len(artist_ids) < self.__LIMIT
+        albums = {}
+        for (album_id, name, album_year, artist_id, artist) in\
+                Lp().albums.search_rows(term, artist_ids, year, self.__LIMIT):
+            item = albums.get(album_id, None)
+            if item is None:
+                item = SearchItem()
+                item.id = album_id
+                item.album_id = album_id
+                item.name = name
+                item.year = album_year
+                item.artist_ids = []
+                item.artists = []
+                item.keys = [noaccents(name).lower()]
+                albums[album_id] = item
+            if artist is None:
+                artist = Lp().artists.get_name(artist_id)
+            item.artist_ids.append(artist_id)
+            item.artists.append(artist)
+            item.keys.append(noaccents(artist).lower())
+        tracks = {}
+        for (track_id, name, album_id, artist_id, artist, album_artist) in\
+                Lp().tracks.search_rows(term, artist_ids, self.__LIMIT):
+            item = tracks.get(track_id, None)
+            if item is None:
+                item = SearchItem()
+                item.is_track = True
+                item.id = track_id
+                item.album_id = album_id
+                item.name = name
+                item.artist_ids = []
+                item.artists = []
+                item.keys = [noaccents(name).lower()]
+                tracks[track_id] = item
+            if artist is None:
+                artist = Lp().artists.get_name(artist_id)
+            item.artist_ids.append(artist_id)
+            item.artists.append(artist)
+            # Tracks are found by artists only if not album artist
+            if not album_artist:
+                item.keys.append(noaccents(artist).lower())
+        items = list(albums.values()) + list(tracks.values())
+        # Items limited by name, can't be refined
+        for values in [albums.values(), tracks.values()]:
+            if len([item for item in values
+                    if key in item.keys[0]]) >= self.__LIMIT:
+                complete = False
+        return (items, complete)
 
+    def __match(self, item, key):
+        """
+            True if item matches key
+            @param item as SearchItem
+            @param key as str
+            @return bool
+        """
+        for item_key in item.keys:
+            if key in item_key:
+                return True
+        return False
+
+    def __get_score(self, item, words):
+        """
+            Calculate score for item
+            @param item as SearchItem
+            @param words as [(str, str)], words and their keys
+            @return int
+        """
+        score = 0
+        artists = [noaccents(artist.lower()) for artist in item.artists]
+        name = noaccents(item.name).lower()
+        for (word, key) in words:
             try:
-                year = int(item)
-                albums = Lp().albums.get_by_year(year)
+                if int(word) == item.year:
+                    score += 2
             except:
-                albums = []
-            albums += Lp().albums.search(item)
-            for album_id in albums:
-                if cancellable.is_cancelled():
-                    return
-                if album_id in added_album_ids:
-                    continue
-                search_item = SearchItem()
-                search_item.id = album_id
-                added_album_ids.append(album_id)
-                search_item.is_track = False
-                search_item.artist_ids = Lp().albums.get_artist_ids(album_id)
-                search_item.year = Lp().albums.get_year(album_id)
-                items.append(search_item)
+                pass
+            for artist in artists:
+                if key in artist:
+                    score += 2
+                    if not item.is_track:
+                        score += 1
+            if key in name:
+                score += 1
+                if item.is_track:
+                    score += 1
+        return score
 
-            for track_id, track_name in Lp().tracks.search(
-                                               item) + tracks_non_album_artist:
-                if cancellable.is_cancelled():
-                    return
-                if track_id in added_track_ids:
-                    continue
-                search_item = SearchItem()
-                search_item.id = track_id
-                added_track_ids.append(track_id)
-                search_item.is_track = True
-                search_item.artist_ids = Lp().tracks.get_artist_ids(track_id)
-                items.append(search_item)
-        return items
+    def __emit(self, cancellable, callback, items):
+        """
+            Pass items to callback if search is still wanted
+            @param cancellable as Gio.Cancellable
+            @param callback as function([SearchItem])
+            @param items as [SearchItem]
+        """
+        if not cancellable.is_cancelled():
+            callback(items)
+
+    def __on_finished(self, result, cancellable, finished):
+        """
+            Notify search end if search is still wanted
+            @param result as None
+            @param cancellable as Gio.Cancellable
+            @param finished as function()
+        """
+        if not cancellable.is_cancelled():
+            finished()
@@ -0,0 +1,264 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from os import stat
+
+from lollypop.lru import LRUCache
+from lollypop.utils import noaccents, escape
+
+
+class SearchIndex:
+    """
+        Read only search index for external search (shell search provider)
+        Albums are kept in memory, tracks are searched in database
+        Index is reloaded when database changes
+    """
+    __DB_PATH = GLib.get_user_data_dir() + "/lollypop/lollypop.db"
+    __CACHE_PATH = GLib.get_user_cache_dir() + "/lollypop"
+    # Same limit as TracksDatabase.search()
+    __LIMIT = 25
+
+    def __init__(self, artwork_db):
+        """
+            Init index, loaded on first search
+            @param artwork_db as ArtworkDatabase
+        """
+        self.__artwork_db = artwork_db
+        self.__sql = None
+        self.__mtime = None
+        # Album id: (name, year, artists as [str], keys as [str])
+        self.__albums = {}
+        # Track id: (name, album id, artists as [str])
+        self.__tracks = LRUCache(max_count=1000)
+        # Search id: (name, description, artwork path)
+        self.__metas = LRUCache(max_count=500)
+
+    def search(self, terms):
+        """
+            Search albums and tracks for terms
+            @param terms as [str]
+            @return search ids as [str], "a:" for albums, "t:" for tracks
+        """
+        self.__update()
+        search = " ".join(terms)
+        key = noaccents(search).lower()
+        ids = []
+        # Albums by name first, then by artists
+        for (album_id, (name, year, artists, keys)) in self.__albums.items():
+            if key in keys[0]:
+                ids.append("a:%s" % album_id)
+        for (album_id, (name, year, artists, keys)) in self.__albums.items():
+            if key not in keys[0] and self.__match(keys[1:], key):
+                ids.append("a:%s" % album_id)
+        ids += ["t:%s" % track_id
+                for track_id in self.__search_tracks(search)]
+        return ids
+
+    def refine(self, previous_ids, terms):
+        """
+            Keep previous search ids matching terms
+            @param previous_ids as [str]
+            @param terms as [str]
+            @return search ids as [str]
+        """
+        if self.__update():
+            return self.search(terms)
+        key = noaccents(" ".join(terms)).lower()
+        track_ids = [int(search_id[2:]) for search_id in previous_ids
+                     if search_id[0:2] == "t:"]
+        # Previous tracks were truncated, search again
+        if len(track_ids) >= self.__LIMIT:
+            track_ids = self.__search_tracks(" ".join(terms))
+        else:
+            self.__load_tracks(track_ids)
+            track_ids = [track_id for track_id in track_ids
+                         if key in noaccents(
+                             self.__tracks.get(track_id, ("",))[0]).lower()]
+        ids = []
+        for search_id in previous_ids:
+            if search_id[0:2] == "a:":
+                album = self.__albums.get(int(search_id[2:]), None)
+                if album is not None and self.__match(album[3], key):
+                    ids.append(search_id)
+        ids += ["t:%s" % track_id for track_id in track_ids]
+        return ids
+
+    def get_metas(self, search_ids, size):
+        """
+            Get metas for search ids
+            @param search_ids as [str]
+            @param size as int, artwork size
+            @return [(search id as str, name as str, description as str,
+                      artwork path or icon name as str)]
+        """
+        self.__update()
+        self.__load_tracks([int(search_id[2:]) for search_id in search_ids
+                            if search_id[0:2] == "t:" and
+                            search_id not in self.__metas])
+        metas = []
+        for search_id in search_ids:
+            meta = self.__metas.get(search_id)
+            if meta is None:
+                meta = self.__get_meta(search_id, size)
+                if meta is None:
+                    continue
+                self.__metas.set(search_id, meta)
+            metas.append((search_id,) + meta)
+        return metas
+
+#######################
+# PRIVATE             #
+#######################
+    def __update(self):
+        """
+            Load index if database changed
+            @return True if index has been loaded
+        """
+        try:
+            mtime = stat(self.__DB_PATH).st_mtime
+        except:
+            mtime = None
+        if self.__sql is not None and mtime == self.__mtime:
+            return False
+        self.__mtime = mtime
+        if self.__sql is None:
+            self.__sql = sqlite3.connect("file:%s?mode=ro" % self.__DB_PATH,
+                                         600.0, uri=True)
+            self.__sql.create_function("noaccents", 1, noaccents)
+        self.__tracks.clear()
+        self.__metas.clear()
+        self.__albums = {}
+        result = self.__sql.execute("SELECT rowid, name, year FROM albums")
+        for (album_id, name, year) in result:
+            self.__albums[album_id] = (name, year or None, [],
+                                       [noaccents(name).lower()])
+        # Same order as AlbumsDatabase.get_artists()
+        result = self.__sql.execute("SELECT album_artists.album_id,\
+                                     artists.name\
+                                     FROM album_artists, artists\
+                                     WHERE artists.rowid=\
+                                     album_artists.artist_id\
+                                     ORDER BY album_artists.album_id,\
+                                     album_artists.rowid")
+        for (album_id, artist) in result:
+            album = self.__albums.get(album_id, None)
+            if album is not None:
+                album[2].append(artist)
+                album[3].append(noaccents(artist).lower())
+        return True
+
+    def __search_tracks(self, search):
+        """
+            Search tracks with name looking like search, load them in cache
+            @param search as str
+            @return track ids as [int]
+        """
+        result = self.__sql.execute("SELECT rowid FROM tracks\
+                                     WHERE noaccents(name) LIKE ? LIMIT ?",
+                                    ("%" + noaccents(search) + "%",
+                                     self.__LIMIT))
+        track_ids = [row[0] for row in result]
+        self.__load_tracks(track_ids)
+        return track_ids
+
+    def __load_tracks(self, track_ids):
+        """
+            Load tracks missing in cache
+            @param track_ids as [int]
+        """
+        track_ids = [track_id for track_id in track_ids
+                     if track_id not in self.__tracks]
+        if not track_ids:
+            return
+        tracks = {}
+        request = "SELECT tracks.rowid, tracks.name, tracks.album_id\
+                   FROM tracks WHERE "
+        for track_id in track_ids:
+            request += "rowid=? OR "
+        request += "1=0"
+        for (track_id, name, album_id) in self.__sql.execute(
+                                                    request, track_ids):
+            tracks[track_id] = (name, album_id, [])
+        request = "SELECT track_artists.track_id, artists.name\
+                   FROM track_artists, artists\
+                   WHERE artists.rowid=track_artists.artist_id AND ("
+        for track_id in track_ids:
+            request += "track_artists.track_id=? OR "
+        request += "1=0)"
+        for (track_id, artist) in self.__sql.execute(request, track_ids):
+            tracks[track_id][2].append(artist)
+        for (track_id, track) in tracks.items():
+            self.__tracks.set(track_id, track)
+
+    def __get_meta(self, search_id, size):
+        """
+            Get meta for search id
+            @param search_id as str
+            @param size as int
+            @return (name as str, description as str, artwork as str) or None
+        """
+        object_id = int(search_id[2:])
+        if search_id[0:2] == "a:":
+            album = self.__albums.get(object_id, None)
+            if album is None:
+                return None
+            name = " ".join(album[2]) or " "
+            description = album[0]
+            album_id = object_id
+        else:
+            track = self.__tracks.get(object_id)
+            if track is None:
+                return None
+            name = "♫ " + track[0]
+            description = " ".join(track[2]) or " "
+            album_id = track[1]
+        return (name, description, self.__get_artwork(album_id, size))
+
+    def __get_artwork(self, album_id, size):
+        """
+            Get artwork path for album, export stored artwork if needed
+            Does not load artwork, only available if already stored
+            @param album_id as int
+            @param size as int
+            @return path or icon name as str
+        """
+        try:
+            (name, year, artists, keys) = self.__albums[album_id]
+            # Same name as ArtAlbum.get_album_cache_name()
+            filename = escape("%s_%s_%s" % (" ".join(artists)[:100],
+                                            name[:100],
+                                            year))
+            path = "%s/%s_%s.jpg" % (self.__CACHE_PATH, filename, size)
+            if GLib.file_test(path, GLib.FileTest.EXISTS):
+                return path
+            data = self.__artwork_db.get(filename, size)
+            if data is not None:
+                GLib.file_set_contents(path, data)
+                return path
+        except Exception as e:
+            print("SearchIndex::__get_artwork():", e)
+        return "folder-music-symbolic"
+
+    def __match(self, keys, key):
+        """
+            True if one of keys contains key
+            @param keys as [str]
+            @param key as str
+            @return bool
+        """
+        for k in keys:
+            if key in k:
+                return True
+        return False
@@ -71,16 +71,16 @@ class SelectionList(Gtk.Overlay):
         self.__to_select_ids = []
         self.__modifier = False
         self.__populating = False
-        self.__updating = False       # Sort disabled if False
+        self.__updating = False
         self.__is_artists = False
+        # Rows are kept sorted by us, iters by object id
+        self.__iters = {}
         builder = Gtk.Builder()
         builder.add_from_resource("/org/gnome/Lollypop/SelectionList.ui")
         builder.connect_signals(self)
         self.__selection = builder.get_object("selection")
         self.__selection.set_select_function(self.__selection_validation)
         self.__model = builder.get_object("model")
-        self.__model.set_sort_column_id(0, Gtk.SortType.ASCENDING)
-        self.__model.set_sort_func(0, self.__sort_items)
         self.__view = builder.get_object("view")
         if sidebar:
             self.__view.get_style_context().add_class("sidebar")
@@ -147,17 +147,23 @@ class SelectionList(Gtk.Overlay):
 
     def populate(self, values):
         """
-            Populate view with values
-            @param [(int, str, optional str)], will be deleted
+            Populate view with values, model is filled detached from view
+            @param [(int, str, optional str)], sorted as they should appear
             @thread safe
         """
         if self.__populating:
             return
-        self.clear()
         self.__populating = True
-        if len(self.__model) > 0:
-            self.__updating = True
-        self.__add_values(values)
+        self.__updating = True
+        self.__view.set_model(None)
+        self.clear()
+        for value in values:
+            self.__add_value(value)
+        self.__view.set_model(self.__model)
+        if self.__is_artists and self.__fast_scroll is not None:
+            self.__fast_scroll.populate()
+        self.__select_pending()
+        self.__to_select_ids = []
         self.emit("populated")
         self.__updating = False
         self.__populating = False
@@ -167,22 +173,38 @@ class SelectionList(Gtk.Overlay):
             Remove row from model
             @param object id as int
         """
-        for item in self.__model:
-            if item[0] == object_id:
-                self.__model.remove(item.iter)
-                break
+        self.remove_values([object_id])
+
+    def remove_values(self, object_ids):
+        """
+            Remove rows from model
+            @param object ids as [int]
+        """
+        self.__updating = True
+        for object_id in object_ids:
+            iterator = self.__iters.pop(object_id, None)
+            if iterator is not None:
+                self.__model.remove(iterator)
+        self.__updating = False
 
     def add_value(self, value):
         """
             Add item to list
             @param value as (int, str, optional str)
         """
-        # Do not add value if already exists
-        for item in self.__model:
-            if item[0] == value[0]:
-                return
+        self.add_values([value])
+
+    def add_values(self, values):
+        """
+            Add items to list at their sorted position
+            @param values as [(int, str, optional str)]
+        """
         self.__updating = True
-        self.__add_value(value)
+        for value in values:
+            # Do not add value if already exists
+            if value[0] not in self.__iters:
+                self.__add_value(value, True)
+        self.__select_pending()
         self.__updating = False
 
     def update_value(self, object_id, name):
@@ -191,16 +213,18 @@ class SelectionList(Gtk.Overlay):
             @param object id as int
             @param name as str
         """
-        self.__updating = True
-        found = False
-        for item in self.__model:
-            if item[0] == object_id:
-                item[1] = name
-                found = True
-                break
-        if not found:
-            self.__add_value((object_id, name))
-        self.__updating = False
+        iterator = self.__iters.get(object_id, None)
+        if iterator is None:
+            self.add_value((object_id, name))
+        elif self.__model.get_value(iterator, 1) != name:
+            self.__updating = True
+            selected = self.__selection.iter_is_selected(iterator)
+            self.__model.remove(iterator)
+            del self.__iters[object_id]
+            iterator = self.__add_value((object_id, name), True)
+            if selected:
+                self.__selection.select_iter(iterator)
+            self.__updating = False
 
     def update_values(self, values):
         """
@@ -208,22 +232,17 @@ class SelectionList(Gtk.Overlay):
             @param [(int, str, optional str)]
             @thread safe
         """
-        self.__updating = True
         if self.__is_artists and self.__fast_scroll is not None:
             self.__fast_scroll.clear()
         # Remove not found items but not devices
         value_ids = set([v[0] for v in values])
-        for item in self.__model:
-            if item[0] > Type.DEVICES and not item[0] in value_ids:
-                self.__model.remove(item.iter)
+        self.remove_values([object_id for object_id in self.__iters.keys()
+                            if object_id > Type.DEVICES and
+                            object_id not in value_ids])
         # Add items which are not already in the list
-        item_ids = set([i[0] for i in self.__model])
-        for value in values:
-            if not value[0] in item_ids:
-                self.__add_value(value)
+        self.add_values(values)
         if self.__is_artists and self.__fast_scroll is not None:
             self.__fast_scroll.populate()
-        self.__updating = False
 
     def get_value(self, object_id):
         """
@@ -231,9 +250,9 @@ class SelectionList(Gtk.Overlay):
             @param id as int
             @return value as string
         """
-        for item in self.__model:
-            if item[0] == object_id:
-                return item[1]
+        iterator = self.__iters.get(object_id, None)
+        if iterator is not None:
+            return self.__model.get_value(iterator, 1)
         return ""
 
     def will_be_selected(self):
@@ -254,22 +273,19 @@ class SelectionList(Gtk.Overlay):
                 # Check if items are available for selection
                 items = []
                 for i in list(ids):
-                    for item in self.__model:
-                        if item[0] == i:
-                            items.append(item)
-                            ids.remove(i)
+                    if i in self.__iters:
+                        items.append(self.__iters[i])
+                        ids.remove(i)
                 # Select later
                 if ids:
                     self.__to_select_ids = ids
                 else:
                     for item in items:
-                        self.__selection.select_iter(item.iter)
+                        self.__selection.select_iter(item)
                     # Scroll to first item
                     if items:
-                        self.__view.scroll_to_cell(items[0].path,
-                                                   None,
-                                                   True,
-                                                   0, 0)
+                        path = self.__model.get_path(items[0])
+                        self.__view.scroll_to_cell(path, None, True, 0, 0)
             except:
                 self.__last_motion_event = None
                 self.__to_select_ids = ids
@@ -301,6 +317,7 @@ class SelectionList(Gtk.Overlay):
         """
         self.__updating = True
         self.__model.clear()
+        self.__iters = {}
         if self.__is_artists and self.__fast_scroll is not None:
             self.__fast_scroll.clear()
             self.__fast_scroll.clear_chars()
@@ -443,10 +460,12 @@ class SelectionList(Gtk.Overlay):
 #######################
 # PRIVATE             #
 #######################
-    def __add_value(self, value):
+    def __add_value(self, value, sorted=False):
         """
             Add value to the model
             @param value as [int, str, optional str]
+            @param sorted as bool, insert at sorted position, else append
+            @return Gtk.TreeIter
             @thread safe
         """
         if value[1] == "":
@@ -465,29 +484,55 @@ class SelectionList(Gtk.Overlay):
         icon_name = self.__get_icon_name(value[0])
         if not icon_name and string == _("Unknown"):
             icon_name = "dialog-warning-symbolic"
-        i = self.__model.append([value[0],
-                                string,
-                                icon_name,
-                                sort])
-        if value[0] in self.__to_select_ids:
-            self.__to_select_ids.remove(value[0])
-            self.__selection.select_iter(i)
-            self.__view.scroll_to_cell(self.__model.get_path(i),
-                                       None,
-                                       True,
-                                       0, 0)
+        row = [value[0], string, icon_name, sort]
+        if sorted:
+            i = self.__model.insert(self.__get_position(value[0], sort), row)
+        else:
+            i = self.__model.append(row)
+        self.__iters[value[0]] = i
+        return i
+
+    def __get_position(self, object_id, sort):
+        """
+            Get sorted position for a new row
+            Static rows stay on top, devices before first separator
+            @param object_id as int
+            @param sort as str
+            @return int
+        """
+        count = len(self.__model)
+        # Static rows are few, look for the end of static rows
+        low = 0
+        while low < count:
+            rowid = self.__model[low][0]
+            if rowid >= 0 or (object_id < 0 and rowid == Type.SEPARATOR):
+                break
+            low += 1
+        if object_id < 0:
+            return low
+        high = count
+        while low < high:
+            middle = (low + high) // 2
+            if strcoll(self.__model[middle][3], sort) <= 0:
+                low = middle + 1
+            else:
+                high = middle
+        return low
 
-    def __add_values(self, values):
+    def __select_pending(self):
         """
-            Add values to the list
-            @param items as [(int,str)]
-            @thread safe
+            Select rows waiting for selection
         """
-        for value in values:
-            self.__add_value(value)
-        if self.__is_artists and self.__fast_scroll is not None:
-            self.__fast_scroll.populate()
-        self.__to_select_ids = []
+        for object_id in list(self.__to_select_ids):
+            iterator = self.__iters.get(object_id, None)
+            if iterator is None:
+                continue
+            self.__to_select_ids.remove(object_id)
+            self.__selection.select_iter(iterator)
+            self.__view.scroll_to_cell(self.__model.get_path(iterator),
+                                       None,
+                                       True,
+                                       0, 0)
 
     def __get_icon_name(self, object_id):
         """
@@ -522,35 +567,6 @@ class SelectionList(Gtk.Overlay):
             icon = "emblem-music-symbolic"
         return icon
 
-    def __sort_items(self, model, itera, iterb, data):
-        """
-            Sort model
-        """
-        if not self.__updating:
-            return False
-
-        a_index = model.get_value(itera, 0)
-        b_index = model.get_value(iterb, 0)
-
-        # Static vs static
-        if a_index < 0 and b_index < 0:
-            return a_index < b_index
-        # Static entries always on top
-        elif b_index < 0:
-            return True
-        # Static entries always on top
-        if a_index < 0:
-            return False
-        # String comparaison for non static
-        else:
-            if self.__is_artists:
-                a = Lp().artists.get_sortname(a_index)
-                b = Lp().artists.get_sortname(b_index)
-            else:
-                a = model.get_value(itera, 1)
-                b = model.get_value(iterb, 1)
-            return strcoll(a, b)
-
     def __row_separator_func(self, model, iterator):
         """
             Draw a separator if needed
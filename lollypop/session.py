@@ -0,0 +1,98 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib, Gio
+
+from pickle import dumps, loads, load, HIGHEST_PROTOCOL
+
+from lollypop.define import LOLLYPOP_DATA_PATH
+
+
+class Session:
+    """
+        Player session saved in a single versioned file
+    """
+    __PATH = LOLLYPOP_DATA_PATH + "/session.bin"
+    __VERSION = 1
+    # Files used before session.bin, key: filename
+    __LEGACY = {"track_id": "track_id.bin",
+                "playlist_ids": "playlist_ids.bin",
+                "player": "player.bin",
+                "albums": "albums.bin",
+                "genre_ids": "genre_ids.bin",
+                "artist_ids": "artist_ids.bin",
+                "position": "position.bin"}
+
+    def save(self, state):
+        """
+            Atomically write state to disk
+            @param state as {}
+        """
+        try:
+            state["version"] = self.__VERSION
+            GLib.file_set_contents(self.__PATH,
+                                   dumps(state, HIGHEST_PROTOCOL))
+            self.__remove_legacy()
+        except Exception as e:
+            print("Session::save():", e)
+
+    def load(self):
+        """
+            Read state from disk
+            @return state as {}
+        """
+        try:
+            f = Gio.File.new_for_path(self.__PATH)
+            if f.query_exists():
+                (status, data, tag) = f.load_contents(None)
+                state = loads(data)
+                if state.get("version", 0) == self.__VERSION:
+                    return state
+                print("Session::load(): unknown version", state["version"])
+            else:
+                return self.__load_legacy()
+        except Exception as e:
+            print("Session::load():", e)
+        return {}
+
+#######################
+# PRIVATE             #
+#######################
+    def __load_legacy(self):
+        """
+            Read state from files used by previous versions
+            @return state as {}
+        """
+        state = {}
+        for key, filename in self.__LEGACY.items():
+            try:
+                path = "%s/%s" % (LOLLYPOP_DATA_PATH, filename)
+                if GLib.file_test(path, GLib.FileTest.EXISTS):
+                    state[key] = load(open(path, "rb"))
+            except Exception as e:
+                print("Session::__load_legacy():", e)
+        if "player" in state.keys():
+            (state["is_playing"], state["is_party"]) = state.pop("player")
+        return state
+
+    def __remove_legacy(self):
+        """
+            Remove files used by previous versions
+        """
+        for filename in self.__LEGACY.values():
+            f = Gio.File.new_for_path("%s/%s" % (LOLLYPOP_DATA_PATH,
+                                                 filename))
+            if f.query_exists():
+                try:
+                    f.delete(None)
+                except Exception as e:
+                    print("Session::__remove_legacy():", e)
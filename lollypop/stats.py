@@ -0,0 +1,188 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Thread, Lock, Event
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import Lp
+from lollypop.utils import debug
+
+
+class StatsWriter:
+    """
+        Queue play statistics and write them in background
+        Events are coalesced and flushed in one transaction
+    """
+    __FLUSH_INTERVAL = 30  # Seconds
+
+    def __init__(self):
+        """
+            Init writer
+        """
+        self.__lock = Lock()
+        self.__flush_lock = Lock()
+        self.__event = Event()
+        self.__stopped = False
+        # track id: count
+        self.__track_plays = {}
+        # album id: [linear plays, count based plays,
+        #            count based plays not counted if tracks count is unknown]
+        self.__album_plays = {}
+        # track id: ltime
+        self.__ltimes = {}
+        self.__thread = Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def add_play(self, track_id, album_id, party, fallback=True):
+        """
+            Queue a finished play for track
+            @param track id as int
+            @param album id as int
+            @param party as bool
+            @param fallback as bool, add one to album popularity
+                   if album tracks count is unknown
+        """
+        if track_id is None or track_id < 0:
+            return
+        with self.__lock:
+            self.__track_plays[track_id] = self.__track_plays.get(
+                                                              track_id, 0) + 1
+            plays = self.__album_plays.setdefault(album_id, [0, 0, 0])
+            # In party mode, linear popularity
+            if party:
+                plays[0] += 1
+            # In normal mode, based on tracks count
+            elif fallback:
+                plays[1] += 1
+            else:
+                plays[2] += 1
+
+    def set_listened_at(self, track_id, time):
+        """
+            Queue ltime for track
+            @param track id as int
+            @param time as int
+        """
+        if track_id is None or track_id < 0:
+            return
+        with self.__lock:
+            self.__ltimes[track_id] = time
+
+    def flush(self):
+        """
+            Ask writer to flush now
+        """
+        self.__event.set()
+
+    def stop(self):
+        """
+            Stop writer and flush pending events
+            Called from main thread on quit
+        """
+        self.__stopped = True
+        self.__event.set()
+        # Do not wait for scanner, events would be lost
+        self.__flush(True)
+
+#######################
+# PRIVATE             #
+#######################
+    def __run(self):
+        """
+            Flush pending events periodically
+            @thread safe
+        """
+        while not self.__stopped:
+            self.__event.wait(self.__FLUSH_INTERVAL)
+            self.__event.clear()
+            if not self.__stopped:
+                self.__flush()
+
+    def __take(self):
+        """
+            Take pending events
+            @return (track plays, album plays, ltimes)
+        """
+        with self.__lock:
+            pending = (self.__track_plays, self.__album_plays, self.__ltimes)
+            self.__track_plays = {}
+            self.__album_plays = {}
+            self.__ltimes = {}
+        return pending
+
+    def __restore(self, track_plays, album_plays, ltimes):
+        """
+            Merge back events that were not written
+            @param track plays as {int: int}
+            @param album plays as {int: [int, int]}
+            @param ltimes as {int: int}
+        """
+        with self.__lock:
+            for track_id, count in track_plays.items():
+                self.__track_plays[track_id] = self.__track_plays.get(
+                                                          track_id, 0) + count
+            for album_id, (linear, based, strict) in album_plays.items():
+                plays = self.__album_plays.setdefault(album_id, [0, 0, 0])
+                plays[0] += linear
+                plays[1] += based
+                plays[2] += strict
+            for track_id, ltime in ltimes.items():
+                if ltime > self.__ltimes.get(track_id, 0):
+                    self.__ltimes[track_id] = ltime
+
+    def __flush(self, force=False):
+        """
+            Write pending events in one transaction
+            Postponed while collection is scanned
+            @param force as bool, write even if collection is scanned
+        """
+        with self.__flush_lock:
+            if not force and Lp().scanner.is_locked():
+                return
+            (track_plays, album_plays, ltimes) = self.__take()
+            if not track_plays and not ltimes:
+                return
+            debug("StatsWriter::__flush(): %s tracks" % len(track_plays))
+            with SqlCursor(Lp().db) as sql:
+                try:
+                    max_count = Lp().albums.max_count
+                    for track_id, count in track_plays.items():
+                        sql.execute("UPDATE tracks\
+                                     SET popularity=popularity+?\
+                                     WHERE rowid=?", (count, track_id))
+                    for album_id, (linear, based, strict) in\
+                            album_plays.items():
+                        pop_to_add = linear
+                        if based or strict:
+                            # Some users report an issue where
+                            # get_tracks_count() return 0, see issue #886
+                            count = Lp().albums.get_tracks_count(album_id)
+                            if count:
+                                pop_to_add += int(max_count / count) *\
+                                    (based + strict)
+                            else:
+                                pop_to_add += based
+                        if pop_to_add == 0:
+                            continue
+                        sql.execute("UPDATE albums\
+                                     SET popularity=popularity+?\
+                                     WHERE rowid=?", (pop_to_add, album_id))
+                    for track_id, ltime in ltimes.items():
+                        sql.execute("UPDATE tracks set ltime=?\
+                                     WHERE rowid=?", (ltime, track_id))
+                    sql.commit()
+                except Exception as e:
+                    print("StatsWriter::__flush():", e)
+                    sql.rollback()
+                    if not self.__stopped:
+                        self.__restore(track_plays, album_plays, ltimes)
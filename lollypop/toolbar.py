@@ -12,11 +12,12 @@
 
 from gi.repository import Gtk, Gst
 
-from lollypop.define import Lp, WindowSize, LOLLYPOP_DATA_PATH
+from lollypop.define import Lp, WindowSize
 from lollypop.toolbar_playback import ToolbarPlayback
 from lollypop.toolbar_info import ToolbarInfo
 from lollypop.toolbar_title import ToolbarTitle
 from lollypop.toolbar_end import ToolbarEnd
+from lollypop.session import Session
 from lollypop.utils import debug
 
 
@@ -121,9 +122,7 @@ class Toolbar(Gtk.HeaderBar):
         """
         try:
             if Lp().settings.get_value("save-state"):
-                from pickle import load
-                position = load(open(LOLLYPOP_DATA_PATH + "/position.bin",
-                                "rb"))
+                position = Session().load().get("position", 0)
                 self.__toolbar_title.add_mark(position / Gst.SECOND)
         except Exception as e:
             print("Toolbar::restore_state():", e)
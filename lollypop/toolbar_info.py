@@ -105,11 +105,13 @@ class ToolbarInfo(Gtk.Bin, InfoController):
             @param album id as int
         """
         if Lp().player.current_track.album.id == album_id:
-            surface = Lp().art.get_album_artwork(
-                                       Lp().player.current_track.album,
-                                       self._artsize,
-                                       self._cover.get_scale_factor())
-            self._cover.set_from_surface(surface)
+            self._cancel_artwork()
+            Lp().art.get_album_artwork_async(Lp().player.current_track.album,
+                                             self._artsize,
+                                             self._cover.get_scale_factor(),
+                                             self._artwork_cancellable,
+                                             GLib.PRIORITY_DEFAULT,
+                                             self._cover.set_from_surface)
 
     def __update_logo(self, art, name):
         """
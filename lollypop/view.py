@@ -12,7 +12,10 @@
 
 from gi.repository import Gtk, GLib
 
+from collections import deque
+
 from lollypop.define import Lp
+from lollypop.utils import noaccents
 
 
 class View(Gtk.Grid):
@@ -41,6 +44,13 @@ class View(Gtk.Grid):
         self._stop = False
         self.__new_ids = []
 
+        # Normalized filter and keys by child
+        self.__filter_key = ""
+        self.__keys = {}
+        # Children rejected by current and previous filter
+        self.__rejected = set()
+        self.__prev_rejected = set()
+
         if filtered:
             self._filter = ""
             grid = Gtk.Grid()
@@ -114,12 +124,46 @@ class View(Gtk.Grid):
         """
         return self._filter is not None and self._filter != ""
 
+    @property
+    def children_count(self):
+        """
+            Children count, hint for view memory usage
+            @return int
+        """
+        return len(self._get_children())
+
     def populate(self):
         pass
 
 #######################
 # PROTECTED           #
 #######################
+    def _set_filter(self, text):
+        """
+            Set filter text
+            @param text as str
+            @return True if filter refines previous one
+        """
+        key = self._get_filter_key(text)
+        # Children not matching previous filter can't match a longer one
+        refine = self.__filter_key != "" and self.__filter_key in key
+        if refine:
+            self.__prev_rejected = self.__rejected
+        else:
+            self.__prev_rejected = set()
+        self.__rejected = set()
+        self.__filter_key = key
+        self._filter = text
+        return refine
+
+    def _get_filter_key(self, text):
+        """
+            Get key for filter comparisons
+            @param text as str
+            @return str
+        """
+        return noaccents(text).lower()
+
     def _filter_func(self, child):
         """
             Filter function for a Gtk.FlowBox/GtkListBox
@@ -127,12 +171,17 @@ class View(Gtk.Grid):
         """
         if not self.filtered:
             return True
-        filter = self._filter.lower()
-        if child.filter.lower().find(filter) != -1:
-            child.set_filtered(False)
-            return True
-        child.set_filtered(True)
-        return False
+        if child in self.__prev_rejected:
+            match = False
+        else:
+            if child not in self.__keys:
+                self.__keys[child] = self._get_filter_key(child.filter)
+                child.connect("destroy", self.__on_child_destroy)
+            match = self.__keys[child].find(self.__filter_key) != -1
+        if not match:
+            self.__rejected.add(child)
+        child.set_filtered(not match)
+        return match
 
     def _get_children(self):
         """
@@ -173,7 +222,7 @@ class View(Gtk.Grid):
             Update filter
             @param entry as Gtk.Entry
         """
-        self._filter = self.__search_entry.get_text()
+        self._set_filter(self.__search_entry.get_text())
         self._box.invalidate_filter()
 
     def _on_destroy(self, widget):
@@ -250,6 +299,15 @@ class View(Gtk.Grid):
            event.y >= allocation.height:
             self.disable_overlay()
 
+    def __on_child_destroy(self, child):
+        """
+            Forget child filter key
+            @param child as Gtk.FlowBoxChild/Gtk.ListBoxChild
+        """
+        self.__keys.pop(child, None)
+        self.__rejected.discard(child)
+        self.__prev_rejected.discard(child)
+
     def __on_cover_changed(self, art, album_id):
         """
             Update album cover in view
@@ -264,6 +322,7 @@ class View(Gtk.Grid):
 class LazyLoadingView(View):
     """
         Lazy loading for view
+        Widgets must be appended in layout order
     """
 
     def __init__(self, filtered=False):
@@ -272,7 +331,11 @@ class LazyLoadingView(View):
             @param filtered as bool
         """
         View.__init__(self, filtered)
-        self._lazy_queue = []  # Widgets not initialized
+        # Widgets in layout order, for visibility lookups
+        self.__widgets = []
+        # Widgets not initialized, may contain initialized ones
+        self._lazy_queue = deque()
+        self.__pending = set()
         self._scroll_value = 0
         self.__prev_scroll_value = 0
         self._scrolled.get_vadjustment().connect("value-changed",
@@ -282,15 +345,29 @@ class LazyLoadingView(View):
         """
             Stop loading
         """
-        self._lazy_queue = []
+        self._lazy_queue = deque()
+        self.__pending = set()
         View.stop(self)
 
     def append(self, widget):
         """
-            Append row to lazy queue
-            @param row as Gtk.Widget
+            Append widget to lazy queue
+            @param widget as Gtk.Widget
         """
+        self.__widgets.append(widget)
         self._lazy_queue.append(widget)
+        self.__pending.add(widget)
+        widget.connect("destroy", self.__on_widget_destroy)
+
+    def prepend(self, widget):
+        """
+            Prepend widget to lazy queue
+            @param widget as Gtk.Widget
+        """
+        self.__widgets.insert(0, widget)
+        self._lazy_queue.appendleft(widget)
+        self.__pending.add(widget)
+        widget.connect("destroy", self.__on_widget_destroy)
 
     def lazy_loading(self, widgets=[], scroll_value=0):
         """
@@ -305,12 +382,30 @@ class LazyLoadingView(View):
 #######################
 # PROTECTED           #
 #######################
+    def _pop_lazy(self, widgets):
+        """
+            Get next widget to initialize, visible widgets first
+            @param widgets as [Gtk.Widget], visible widgets
+            @return (Gtk.Widget, priority as int) or (None, None)
+        """
+        while widgets:
+            widget = widgets.pop(0)
+            if widget in self.__pending:
+                self.__pending.remove(widget)
+                return (widget, GLib.PRIORITY_HIGH_IDLE)
+        while self._lazy_queue:
+            widget = self._lazy_queue.popleft()
+            if widget in self.__pending:
+                self.__pending.remove(widget)
+                return (widget, GLib.PRIORITY_LOW)
+        return (None, None)
+
     def _on_value_changed(self, adj):
         """
             Update scroll value and check for lazy queue
             @param adj as Gtk.Adjustment
         """
-        if not self._lazy_queue:
+        if not self.__pending:
             return False
         scroll_value = adj.get_value()
         self.__prev_scroll_value = scroll_value
@@ -327,35 +422,53 @@ class LazyLoadingView(View):
             @param widgets as [Gtk.Widget]
             @param scroll_value as float
         """
-        widget = None
         if self._stop or self._scroll_value != scroll_value:
             return False
-        if widgets:
-            widget = widgets.pop(0)
-            if widget in self._lazy_queue:
-                self._lazy_queue.remove(widget)
-        elif self._lazy_queue:
-            widget = self._lazy_queue.pop(0)
+        (widget, priority) = self._pop_lazy(widgets)
         if widget is not None:
+            # Visible widgets get their artwork first
+            widget.set_artwork_priority(priority)
             widget.populate()
             if widgets:
                 GLib.timeout_add(10, self.lazy_loading, widgets, scroll_value)
             else:
                 GLib.idle_add(self.lazy_loading, widgets, scroll_value)
 
-    def __is_visible(self, widget):
+    def __get_ordinates(self, widget):
         """
-            Is widget visible in scrolled
+            Get widget top and bottom in scrolled
             @param widget as Gtk.Widget
+            @return (int, int)
         """
-        widget_alloc = widget.get_allocation()
-        scrolled_alloc = self._scrolled.get_allocation()
         try:
             (x, y) = widget.translate_coordinates(self._scrolled, 0, 0)
-            return (y > -widget_alloc.height or y >= 0) and\
-                y < scrolled_alloc.height
+            return (y, y + widget.get_allocated_height())
         except:
-            return True
+            return (0, 0)
+
+    def __get_visible(self):
+        """
+            Get visible widgets, found with a binary search on ordinates
+            @return [Gtk.Widget]
+        """
+        # First widget with bottom in scrolled
+        low = 0
+        high = len(self.__widgets)
+        while low < high:
+            middle = (low + high) // 2
+            if self.__get_ordinates(self.__widgets[middle])[1] <= 0:
+                low = middle + 1
+            else:
+                high = middle
+        height = self._scrolled.get_allocated_height()
+        visible = []
+        while low < len(self.__widgets):
+            widget = self.__widgets[low]
+            if self.__get_ordinates(widget)[0] >= height:
+                break
+            visible.append(widget)
+            low += 1
+        return visible
 
     def __lazy_or_not(self, scroll_value):
         """
@@ -363,12 +476,17 @@ class LazyLoadingView(View):
             @param scroll value as float
         """
         self._scroll_value = scroll_value
-        widgets = []
-        for child in self._lazy_queue:
-            if self._stop or self._scroll_value != scroll_value:
-                return
-            if self.__is_visible(child):
-                widgets.append(child)
-        if self._stop or self._scroll_value != scroll_value:
+        if self._stop:
             return
+        widgets = [widget for widget in self.__get_visible()
+                   if widget in self.__pending]
         GLib.idle_add(self.lazy_loading, widgets, self._scroll_value)
+
+    def __on_widget_destroy(self, widget):
+        """
+            Forget widget
+            @param widget as Gtk.Widget
+        """
+        if widget in self.__widgets:
+            self.__widgets.remove(widget)
+        self.__pending.discard(widget)
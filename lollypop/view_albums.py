@@ -10,18 +10,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, GLib, GObject
+from gi.repository import Gtk, GObject
 
 from gettext import gettext as _
 
-from lollypop.view import LazyLoadingView
-from lollypop.widgets_album_simple import AlbumSimpleWidget
+from lollypop.view import View
+from lollypop.widgets_albums_grid import AlbumsGrid
 from lollypop.pop_album import AlbumPopover
 from lollypop.view_artist_albums import ArtistAlbumsView
 from lollypop.define import ArtSize
+from lollypop.objects import Album
+from lollypop.helper_task import TaskHelper
 
 
-class AlbumsView(LazyLoadingView):
+class AlbumsView(View):
     """
         Show albums in a box
     """
@@ -32,25 +34,29 @@ class AlbumsView(LazyLoadingView):
             @param genre ids as [int]
             @param artist ids as [int]
         """
-        LazyLoadingView.__init__(self, True)
+        View.__init__(self, True)
         self.__signal = None
         self.__current = None
         self.__context_album_id = None
         self.__genre_ids = genre_ids
         self.__artist_ids = artist_ids
         self.__press_rect = None
+        # Filter keys by album id
+        self.__keys = {}
+        self.__filter_key = ""
 
-        self._box = Gtk.FlowBox()
-        self._box.set_filter_func(self._filter_func)
-        self._box.set_selection_mode(Gtk.SelectionMode.NONE)
+        # Only visible albums get a widget
+        self._box = AlbumsGrid(genre_ids, artist_ids)
+        self._box.set_filter_func(self.__filter_func)
         self._box.connect("child-activated", self.__on_album_activated)
-        # Allow lazy loading to not jump up and down
-        self._box.set_homogeneous(True)
-        self._box.set_max_children_per_line(1000)
+        self._box.connect("overlayed", self.__on_overlayed)
         self._box.show()
 
-        self._viewport.set_property("valign", Gtk.Align.START)
-        self._viewport.set_property("margin", 5)
+        # Grid scrolls by itself
+        self._scrolled.remove(self._viewport)
+        self._scrolled.add(self._box)
+        self._scrolled.set_policy(Gtk.PolicyType.NEVER,
+                                  Gtk.PolicyType.AUTOMATIC)
         self._scrolled.set_property("expand", True)
 
         self.add(self._scrolled)
@@ -58,57 +64,90 @@ class AlbumsView(LazyLoadingView):
     def populate(self, albums):
         """
             Populate albums
-            @param is compilation as bool
+            @param albums as [int]
         """
-        GLib.idle_add(self.__add_albums, albums)
+        if self._stop:
+            self._stop = False
+            return
+        self._box.set_album_ids(albums)
+        # Keys are ready before user starts filtering
+        helper = TaskHelper()
+        helper.run(self.__set_filter_keys, list(albums))
+
+    def set_load_func(self, func):
+        """
+            Set function loading albums, used to show added albums
+            @param func as function() returning [int]
+        """
+        self._box.set_load_func(func)
 
 #######################
 # PROTECTED           #
 #######################
+    def _on_search_changed(self, entry):
+        """
+            Update filter, only check matching albums if filter refined
+            @param entry as Gtk.Entry
+        """
+        refine = self._set_filter(entry.get_text())
+        self.__filter_key = self._get_filter_key(self._filter)
+        self._box.invalidate_filter(refine)
+
     def _get_children(self):
         """
             Return view children
             @return [AlbumWidget]
         """
-        children = []
-        for child in self._box.get_children():
-            children.append(child)
-        return children
+        return self._box.get_widgets()
 
 #######################
 # PRIVATE             #
 #######################
-    def __add_albums(self, albums):
+    def __filter_func(self, album_id):
+        """
+            Filter function for albums grid
+            @param album id as int
+            @return bool
         """
-            Add albums to the view
-            Start lazy loading
-            @param [album ids as int]
+        if not self.filtered:
+            return True
+        if album_id not in self.__keys:
+            album = Album(album_id)
+            self.__keys[album_id] = self._get_filter_key(
+                                        " ".join([album.name] + album.artists))
+        return self.__keys[album_id].find(self.__filter_key) != -1
+
+    def __set_filter_keys(self, album_ids):
         """
-        if self._stop:
-            self._stop = False
-            return
-        if albums:
-            widget = AlbumSimpleWidget(albums.pop(0),
-                                       self.__genre_ids,
-                                       self.__artist_ids)
-            widget.connect("overlayed", self._on_overlayed)
-            self._box.insert(widget, -1)
-            widget.show()
-            self._lazy_queue.append(widget)
-            GLib.idle_add(self.__add_albums, albums)
-        else:
-            GLib.idle_add(self.lazy_loading)
-            if self._viewport.get_child() is None:
-                self._viewport.add(self._box)
+            Compute filter keys for albums
+            @param album ids as [int]
+            @thread safe
+        """
+        for album_id in album_ids:
+            if self._stop:
+                return
+            if album_id not in self.__keys:
+                album = Album(album_id)
+                self.__keys[album_id] = self._get_filter_key(
+                                        " ".join([album.name] + album.artists))
+
+    def __on_overlayed(self, grid, widget, value):
+        """
+            Keep overlayed widget
+            @param grid as AlbumsGrid
+            @param widget as AlbumSimpleWidget
+            @param value as bool
+        """
+        self._on_overlayed(widget, value)
 
-    def __on_album_activated(self, flowbox, album_widget):
+    def __on_album_activated(self, grid, album_widget):
         """
             Show Context view for activated album
-            @param flowbox as Gtk.Flowbox
+            @param grid as AlbumsGrid
             @param album_widget as AlbumSimpleWidget
         """
         # Here some code for touch screens
-        # If mouse pointer activate Gtk.FlowBoxChild, overlay is on,
+        # If mouse pointer activate album widget, overlay is on,
         # as enter notify event enabled it
         # Else, we are in touch screen, first time show overlay, next time
         # show popover
@@ -122,8 +161,7 @@ class AlbumsView(LazyLoadingView):
         # FIXME: Report a bug and check always true
         (x, y) = album_widget.translate_coordinates(self._scrolled, 0, 0)
         if y < 0:
-            y = album_widget.translate_coordinates(self._box, 0, 0)[1]
-            self._scrolled.get_allocation().height + y
+            y = album_widget.get_allocation().y
             self._scrolled.get_vadjustment().set_value(y)
         allocation = self.get_allocation()
         (x, top_height) = album_widget.translate_coordinates(self, 0, 0)
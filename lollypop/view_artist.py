@@ -165,8 +165,8 @@ class ArtistView(ArtistAlbumsView):
         try:
             if Lp().player.is_party:
                 Lp().player.set_party(False)
-            album_ids = Lp().albums.get_ids(self._artist_ids,
-                                            self._genre_ids)
+            album_ids = Lp().facets.get_album_ids(self._artist_ids,
+                                                  self._genre_ids)
             if album_ids:
                 track = None
                 if Lp().settings.get_enum("shuffle") == Shuffle.TRACKS:
@@ -192,7 +192,8 @@ class ArtistView(ArtistAlbumsView):
             Add artist albums
         """
         try:
-            albums = Lp().albums.get_ids(self._artist_ids, self._genre_ids)
+            albums = Lp().facets.get_album_ids(self._artist_ids,
+                                               self._genre_ids)
             if self.__add_button.get_image().get_icon_name(
                                                    )[0] == "list-add-symbolic":
                 for album_id in albums:
@@ -365,7 +366,7 @@ class ArtistView(ArtistAlbumsView):
         """
             Set add icon based on player albums
         """
-        albums = Lp().albums.get_ids(self._artist_ids, self._genre_ids)
+        albums = Lp().facets.get_album_ids(self._artist_ids, self._genre_ids)
         player_albums = Lp().player.get_albums()
         if len(set(albums) & set(player_albums)) == len(albums):
             # Translators: artist context
@@ -113,7 +113,7 @@ class ArtistAlbumsView(LazyLoadingView):
             Update filter
             @param entry as Gtk.Entry
         """
-        self._filter = entry.get_text()
+        self._set_filter(entry.get_text())
         for child in self._get_children():
             for box in child.boxes:
                 box.invalidate_filter()
@@ -154,17 +154,14 @@ class ArtistAlbumsView(LazyLoadingView):
             @param widgets as [AlbumSimpleWidgets]
             @param scroll_value as float
         """
-        widget = None
         if self._stop or self._scroll_value != scroll_value:
             return
-        if widgets:
-            widget = widgets.pop(0)
-            self._lazy_queue.remove(widget)
-        elif self._lazy_queue:
-            widget = self._lazy_queue.pop(0)
+        (widget, priority) = self._pop_lazy(widgets)
         if widget is not None:
             widget.connect("populated", self._on_populated,
                            widgets, scroll_value)
+            # Visible widgets get their artwork first
+            widget.set_artwork_priority(priority)
             widget.populate()
 
     def __add_albums(self, albums):
@@ -181,7 +178,7 @@ class ArtistAlbumsView(LazyLoadingView):
                                          self.__art_size)
             widget.set_filter_func(self._filter_func)
             widget.connect("overlayed", self._on_overlayed)
-            self._lazy_queue.append(widget)
+            self.append(widget)
             widget.show()
             self._albumbox.add(widget)
             GLib.idle_add(self.__add_albums, albums)
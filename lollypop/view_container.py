@@ -13,6 +13,7 @@
 from gi.repository import Gtk, GLib
 
 from lollypop.view_device import DeviceView
+from lollypop.lru import LRUCache
 from lollypop.utils import debug
 
 
@@ -20,7 +21,11 @@ class ViewContainer(Gtk.Stack):
     """
         Container for a view
         Can contain any other widget too
+        Recently shown views can be kept for back navigation
     """
+    __CACHE_COUNT = 5
+    # In widgets, see View.children_count
+    __CACHE_SIZE = 2000
 
     def __init__(self, duration):
         """
@@ -31,20 +36,63 @@ class ViewContainer(Gtk.Stack):
         self.__duration = duration
         self.set_transition_duration(duration)
         self.set_transition_type(Gtk.StackTransitionType.CROSSFADE)
+        self.__cache = LRUCache(self.__CACHE_COUNT,
+                                self.__CACHE_SIZE,
+                                lambda view: view.children_count,
+                                self.__on_view_evicted)
 
     def clean_old_views(self, view):
         """
-            Clean old views
+            Clean old views, cached views are kept
             @param view as new View
         """
+        cached = self.__cache.values()
         for child in self.get_children():
-            if child != view and not isinstance(child, DeviceView):
+            if child != view and not isinstance(child, DeviceView) and\
+                    child not in cached:
                 # Delayed destroy as we may have an animation running
                 # Gtk.StackTransitionType.CROSSFADE
                 GLib.timeout_add(self.__duration*5,
                                  self.__delayedclean_view,
                                  child)
 
+    def cache_view(self, key, view):
+        """
+            Keep view for key, view should be populated
+            @param key as tuple
+            @param view as View
+        """
+        self.__cache.set(key, view)
+
+    def pop_cached_view(self, key):
+        """
+            Get view cached for key, view is removed from cache
+            @param key as tuple
+            @return View or None
+        """
+        view = self.__cache.get(key)
+        self.__cache.remove(key)
+        return view
+
+    def is_cached(self, view):
+        """
+            True if view is cached
+            @param view as View
+            @return bool
+        """
+        return view in self.__cache.values()
+
+    def invalidate_views(self, match=None):
+        """
+            Forget cached views, destroy them if not visible
+            @param match as function(key) returning bool, None for all
+        """
+        for key in self.__cache.keys():
+            if match is None or match(key):
+                view = self.pop_cached_view(key)
+                if view is not None and view != self.get_visible_child():
+                    self.__destroy_view(view)
+
 #######################
 # PRIVATE             #
 #######################
@@ -54,4 +102,25 @@ class ViewContainer(Gtk.Stack):
             @param valid view as View
         """
         debug("ViewContainer::__delayedclean_view(): %s" % view)
-        view.destroy()
+        # View may have been cached again meanwhile
+        if not self.is_cached(view):
+            view.destroy()
+
+    def __destroy_view(self, view):
+        """
+            Stop view and destroy it
+            @param view as View
+        """
+        view.stop()
+        GLib.timeout_add(self.__duration*5,
+                         self.__delayedclean_view,
+                         view)
+
+    def __on_view_evicted(self, key, view):
+        """
+            Destroy evicted view if not visible
+            @param key as tuple
+            @param view as View
+        """
+        if view != self.get_visible_child():
+            self.__destroy_view(view)
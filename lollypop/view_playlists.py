@@ -139,7 +139,7 @@ class PlaylistsView(View):
             Update filter
             @param entry as Gtk.Entry
         """
-        self._filter = entry.get_text()
+        self._set_filter(entry.get_text())
         for box in self.__playlists_widget.boxes:
             box.invalidate_filter()
 
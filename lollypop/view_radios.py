@@ -210,10 +210,11 @@ class RadiosView(LazyLoadingView):
                                  self.__radios_manager)
             widget.connect("overlayed", self._on_overlayed)
             widget.show()
-            self._lazy_queue.append(widget)
             if first:
+                self.prepend(widget)
                 self._box.insert(widget, 0)
             else:
+                self.append(widget)
                 self._box.insert(widget, -1)
             GLib.idle_add(self.__add_radios, radios)
         else:
@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, GLib, Gdk
+from gi.repository import Gtk, GLib, Gdk, Gio
 
 from gettext import gettext as _
 
@@ -43,6 +43,8 @@ class BaseWidget:
         self._overlay_orientation = Gtk.Orientation.HORIZONTAL
         self._squared_class = "squared-icon"
         self._rounded_class = "rounded-icon"
+        self._artwork_priority = GLib.PRIORITY_LOW
+        self._artwork_cancellable = Gio.Cancellable()
 
     def update_playing_indicator(self):
         """
@@ -62,6 +64,14 @@ class BaseWidget:
             Stop populating
         """
         self._loading = Loading.STOP
+        self._cancel_artwork()
+
+    def set_artwork_priority(self, priority):
+        """
+            Set artwork loading priority, visible widgets first
+            @param priority as int (GLib.PRIORITY_*)
+        """
+        self._artwork_priority = priority
 
     def set_filtered(self, b):
         """
@@ -108,6 +118,13 @@ class BaseWidget:
 #######################
 # PROTECTED           #
 #######################
+    def _cancel_artwork(self):
+        """
+            Cancel pending artwork loading
+        """
+        self._artwork_cancellable.cancel()
+        self._artwork_cancellable = Gio.Cancellable()
+
     def _set_play_all_image(self):
         """
             Set play all image based on current shuffle status
@@ -359,31 +376,19 @@ class AlbumWidget(BaseWidget):
         """
         if self._cover is None:
             return
-        surface = Lp().art.get_album_artwork(
-                            self._album,
-                            self._art_size,
-                            self._cover.get_scale_factor())
-        self._cover.set_from_surface(surface)
-        if surface.get_height() > surface.get_width():
-            self._overlay_orientation = Gtk.Orientation.VERTICAL
-        else:
-            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
+        self._cancel_artwork()
+        Lp().art.get_album_artwork_async(self._album,
+                                         self._art_size,
+                                         self._cover.get_scale_factor(),
+                                         self._artwork_cancellable,
+                                         self._artwork_priority,
+                                         self.__on_album_artwork)
 
     def update_cover(self):
         """
             Update cover for album id id needed
         """
-        if self._cover is None:
-            return
-        surface = Lp().art.get_album_artwork(
-                            self._album,
-                            self._art_size,
-                            self._cover.get_scale_factor())
-        self._cover.set_from_surface(surface)
-        if surface.get_height() > surface.get_width():
-            self._overlay_orientation = Gtk.Orientation.VERTICAL
-        else:
-            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
+        self.set_cover()
 
     def update_state(self):
         """
@@ -414,5 +419,19 @@ class AlbumWidget(BaseWidget):
             Disconnect signal
             @param widget as Gtk.Widget
         """
+        self._cancel_artwork()
         if self._scan_signal is not None:
             Lp().scanner.disconnect(self._scan_signal)
+
+    def __on_album_artwork(self, surface):
+        """
+            Set album artwork
+            @param surface as cairo.Surface
+        """
+        if self._cover is None:
+            return
+        self._cover.set_from_surface(surface)
+        if surface.get_height() > surface.get_width():
+            self._overlay_orientation = Gtk.Orientation.VERTICAL
+        else:
+            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
@@ -33,6 +33,8 @@ class AlbumDetailedWidget(Gtk.Bin, AlbumWidget):
         "populated": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "overlayed": (GObject.SignalFlags.RUN_FIRST, None, (bool,))
     }
+    # Rows are cheap until drawn, add them in batches
+    __BATCH_SIZE = 100
 
     def __init__(self, album_id, genre_ids, artist_ids, art_size):
         """
@@ -445,16 +447,18 @@ class AlbumDetailedWidget(Gtk.Bin, AlbumWidget):
             self.__locked_widget_right = False
             return
 
-        track = tracks.pop(0)
-        if not Lp().settings.get_value("show-tag-tracknumber"):
-            track_number = i
-        else:
-            track_number = track.number
-
-        row = TrackRow(track.id, track_number, self._artist_ids)
-        row.show()
-        widget[disc_number].add(row)
-        GLib.idle_add(self.__add_tracks, tracks, widget, disc_number, i + 1)
+        show_tag_tracknumber = Lp().settings.get_value("show-tag-tracknumber")
+        for track in tracks[:self.__BATCH_SIZE]:
+            if not show_tag_tracknumber:
+                track_number = i
+            else:
+                track_number = track.number
+            row = TrackRow(track.id, track_number, self._artist_ids)
+            row.show()
+            widget[disc_number].add(row)
+            i += 1
+        del tracks[:self.__BATCH_SIZE]
+        GLib.idle_add(self.__add_tracks, tracks, widget, disc_number, i)
 
     def __on_size_allocate(self, widget, allocation):
         """
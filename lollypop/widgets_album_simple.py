@@ -16,13 +16,15 @@ from gettext import gettext as _
 from random import choice
 
 from lollypop.widgets_album import AlbumWidget
+from lollypop.objects import Album
 from lollypop.pop_menu import AlbumMenu
 from lollypop.define import Lp, ArtSize, Shuffle
 
 
-class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
+class AlbumSimpleWidget(Gtk.EventBox, AlbumWidget):
     """
         Album widget showing cover, artist and title
+        Widget can be reused for another album
     """
     __gsignals__ = {
         "overlayed": (GObject.SignalFlags.RUN_FIRST, None, (bool,))
@@ -36,9 +38,9 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
             @param artist_ids as [int]
         """
         # We do not use Gtk.Builder for speed reasons
-        Gtk.FlowBoxChild.__init__(self)
+        Gtk.EventBox.__init__(self)
+        self.set_visible_window(False)
         self.set_size_request(ArtSize.BIG, ArtSize.BIG)
-        self.get_style_context().add_class("loading")
         AlbumWidget.__init__(self, album_id, genre_ids,
                              artist_ids, ArtSize.BIG)
 
@@ -46,7 +48,6 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
         """
             Populate widget content
         """
-        self.get_style_context().remove_class("loading")
         self._rounded_class = "rounded-icon-small"
         self._widget = Gtk.EventBox()
         grid = Gtk.Grid()
@@ -57,14 +58,10 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
         self.__title_label = Gtk.Label()
         self.__title_label.set_ellipsize(Pango.EllipsizeMode.END)
         self.__title_label.set_property("halign", Gtk.Align.CENTER)
-        self.__title_label.set_markup("<b>" +
-                                      GLib.markup_escape_text(
-                                                            self._album.name) +
-                                      "</b>")
         self.__artist_label = Gtk.Label()
         self.__artist_label.set_ellipsize(Pango.EllipsizeMode.END)
         self.__artist_label.set_property("halign", Gtk.Align.CENTER)
-        self.__artist_label.set_text(", ".join(self._album.artists))
+        self.__set_labels()
         self.__artist_label.get_style_context().add_class("dim-label")
         artist_eventbox = Gtk.EventBox()
         artist_eventbox.add(self.__artist_label)
@@ -106,6 +103,19 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
         self._widget.connect("button-press-event", self.__on_button_press)
         self._lock_overlay = False
 
+    def set_album(self, album_id):
+        """
+            Show another album
+            @param album id as int
+        """
+        self.show_overlay(False)
+        self._album = Album(album_id, self._album.genre_ids, self._artist_ids)
+        self._selected = None
+        self.__set_labels()
+        self._cover.clear()
+        self.set_cover()
+        self.update_state()
+
     def do_get_preferred_width(self):
         """
             Return preferred width
@@ -113,7 +123,7 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
         """
         if self._widget is None:
             return (0, 0)
-        width = Gtk.FlowBoxChild.do_get_preferred_width(self)[0]
+        width = Gtk.EventBox.do_get_preferred_width(self)[0]
         return (width, width)
 
 #######################
@@ -214,20 +224,19 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
             self._artwork_button.destroy()
             self._artwork_button = None
 
-    def _on_album_updated(self, scanner, album_id, destroy):
-        """
-            On album modified, disable it
-            @param scanner as CollectionScanner
-            @param album id as int
-            @param deleted as bool
-            @param destroy as bool
-        """
-        if self._album.id == album_id and destroy:
-            self.destroy()
-
 #######################
 # PRIVATE             #
 #######################
+    def __set_labels(self):
+        """
+            Set album title and artists
+        """
+        self.__title_label.set_markup("<b>" +
+                                      GLib.markup_escape_text(
+                                                            self._album.name) +
+                                      "</b>")
+        self.__artist_label.set_text(", ".join(self._album.artists))
+
     def __on_play_all_press_event(self, widget, event):
         """
             Play album with context
@@ -246,9 +255,10 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
             track = self._album.tracks[0]
         if Lp().window.view.filtered:
             # Here we need to get ids from parent as view may be filtered
-            for child in self.get_parent().get_children():
-                if not child.filtered:
-                    Lp().player.add_album(child.album)
+            for album_id in self.get_parent().album_ids:
+                Lp().player.add_album(Album(album_id,
+                                            self._album.genre_ids,
+                                            self._artist_ids))
         else:
             Lp().player.set_albums(track.id, self._artist_ids,
                                    self._album.genre_ids)
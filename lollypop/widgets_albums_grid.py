@@ -0,0 +1,455 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gtk, Gdk, GLib, GObject
+
+from lollypop.widgets_album_simple import AlbumSimpleWidget
+from lollypop.define import Lp
+from lollypop.helper_task import TaskHelper
+
+
+class AlbumsGrid(Gtk.Layout):
+    """
+        Albums in a grid, widgets only exist for visible albums
+        and are reused while scrolling
+    """
+    __gsignals__ = {
+        "child-activated": (GObject.SignalFlags.RUN_FIRST, None,
+                            (GObject.TYPE_PYOBJECT,)),
+        "overlayed": (GObject.SignalFlags.RUN_FIRST, None,
+                      (GObject.TYPE_PYOBJECT, bool))
+    }
+    __SPACING = 5
+    # Rows populated above and below visible ones
+    __MARGIN_ROWS = 2
+    # Wait for more albums from scanner before placing them, in ms
+    __ADD_DELAY = 1000
+
+    def __init__(self, genre_ids, artist_ids):
+        """
+            Init grid
+            @param genre ids as [int]
+            @param artist ids as [int]
+        """
+        Gtk.Layout.__init__(self)
+        self.__genre_ids = genre_ids
+        self.__artist_ids = artist_ids
+        self.__album_ids = []
+        self.__filtered_ids = []
+        self.__filter_func = None
+        self.__load_func = None
+        # Albums added by scanner, not placed yet
+        self.__added_ids = set()
+        self.__added_timeout_id = None
+        # Position of album having keyboard focus in filtered albums
+        self.__focus_index = 0
+        # Bound widgets by position in filtered albums
+        self.__widgets = {}
+        # Unbound widgets, ready for reuse
+        self.__pool = []
+        # Position by widget
+        self.__positions = {}
+        # (width, height), computed from first widget
+        self.__cell = None
+        self.__columns = 1
+        self.__width = 0
+        self.__adj = None
+        self.__adj_signal = None
+        self.__scan_signal = Lp().scanner.connect("album-updated",
+                                                  self.__on_album_updated)
+        self.set_can_focus(True)
+        self.add_events(Gdk.EventMask.KEY_PRESS_MASK)
+        self.connect("size-allocate", self.__on_size_allocate)
+        self.connect("notify::vadjustment", self.__on_vadjustment)
+        self.connect("key-press-event", self.__on_key_press)
+        self.connect("focus-in-event", self.__on_focus_changed)
+        self.connect("focus-out-event", self.__on_focus_changed)
+        self.connect("destroy", self.__on_destroy)
+        self.__on_vadjustment(self, None)
+
+    def set_album_ids(self, album_ids):
+        """
+            Set albums to show
+            @param album ids as [int]
+        """
+        self.__album_ids = list(album_ids)
+        self.invalidate_filter()
+
+    def set_filter_func(self, func):
+        """
+            Set filter function
+            @param func as function(album id as int) returning bool
+        """
+        self.__filter_func = func
+
+    def set_load_func(self, func):
+        """
+            Set function loading albums to show, run in a thread
+            Used to place albums added by scanner
+            @param func as function() returning [int]
+        """
+        self.__load_func = func
+
+    def invalidate_filter(self, refine=False):
+        """
+            Apply filter again, widgets are rebound
+            @param refine as bool, only check albums matching previous filter
+        """
+        if self.__filter_func is None:
+            self.__filtered_ids = list(self.__album_ids)
+        else:
+            album_ids = self.__filtered_ids if refine else self.__album_ids
+            self.__filtered_ids = [album_id for album_id in album_ids
+                                   if self.__filter_func(album_id)]
+        self.__focus_index = max(0, min(self.__focus_index,
+                                        len(self.__filtered_ids) - 1))
+        for index in list(self.__widgets.keys()):
+            self.__release(index)
+        self.__layout()
+
+    def get_widgets(self):
+        """
+            Get widgets showing an album
+            @return [AlbumSimpleWidget]
+        """
+        return list(self.__widgets.values())
+
+    @property
+    def album_ids(self):
+        """
+            Albums shown, filter applied
+            @return [int]
+        """
+        return list(self.__filtered_ids)
+
+#######################
+# PRIVATE             #
+#######################
+    def __layout(self):
+        """
+            Update grid size and visible widgets
+        """
+        if self.__cell is None:
+            if not self.__filtered_ids:
+                return
+            self.__measure()
+        (width, height) = self.__cell
+        self.__columns = max(1, (self.__width - self.__SPACING) //
+                             (width + self.__SPACING))
+        rows = (len(self.__filtered_ids) + self.__columns - 1) //\
+            self.__columns
+        self.set_size(self.__width,
+                      rows * (height + self.__SPACING) + self.__SPACING)
+        self.__update()
+
+    def __measure(self):
+        """
+            Compute cell size with a real widget
+        """
+        widget = self.__get_widget(self.__filtered_ids[0])
+        (minimum, natural) = widget.get_preferred_size()
+        self.__cell = (natural.width, natural.height)
+        widget.hide()
+        self.__pool.append(widget)
+
+    def __update(self):
+        """
+            Bind widgets for visible albums, release others
+        """
+        if self.__cell is None or self.__adj is None:
+            return
+        (width, height) = self.__cell
+        row_height = height + self.__SPACING
+        top = self.__adj.get_value()
+        bottom = top + self.__adj.get_page_size()
+        first_visible = int(top // row_height)
+        last_visible = int(bottom // row_height)
+        first = max(0, first_visible - self.__MARGIN_ROWS) * self.__columns
+        last = min(len(self.__filtered_ids),
+                   (last_visible + self.__MARGIN_ROWS + 1) * self.__columns)
+        for index in list(self.__widgets.keys()):
+            if index < first or index >= last:
+                self.__release(index)
+        # Spread free space between columns
+        spacing = max(self.__SPACING,
+                      (self.__width - self.__columns * width) //
+                      (self.__columns + 1))
+        for index in range(first, last):
+            (row, column) = divmod(index, self.__columns)
+            if row < first_visible or row > last_visible:
+                priority = GLib.PRIORITY_LOW
+            else:
+                priority = GLib.PRIORITY_HIGH_IDLE
+            widget = self.__widgets.get(index, None)
+            if widget is None:
+                widget = self.__bind(index, priority)
+            # Moving a widget queues a resize, so only move if needed
+            position = (spacing + column * (width + spacing),
+                        self.__SPACING + row * row_height)
+            if self.__positions.get(widget, None) != position:
+                self.__positions[widget] = position
+                self.move(widget, *position)
+
+    def __bind(self, index, priority):
+        """
+            Show album at index in a reused or new widget
+            @param index as int
+            @param priority as int (GLib.PRIORITY_*)
+            @return AlbumSimpleWidget
+        """
+        album_id = self.__filtered_ids[index]
+        if self.__pool:
+            widget = self.__pool.pop()
+            widget.set_artwork_priority(priority)
+            widget.set_album(album_id)
+        else:
+            widget = self.__get_widget(album_id, priority)
+        widget.show()
+        self.__widgets[index] = widget
+        if index == self.__focus_index and self.has_focus():
+            widget.show_overlay(True)
+        return widget
+
+    def __release(self, index):
+        """
+            Release widget at index for reuse
+            @param index as int
+        """
+        widget = self.__widgets.pop(index)
+        widget.show_overlay(False)
+        widget.stop()
+        widget.hide()
+        self.__pool.append(widget)
+
+    def __set_focus_index(self, index):
+        """
+            Move keyboard focus to album at index, scrolling to it
+            @param index as int
+        """
+        widget = self.__widgets.get(self.__focus_index, None)
+        if widget is not None:
+            widget.show_overlay(False)
+        self.__focus_index = index
+        if self.__cell is not None and self.__adj is not None:
+            row_height = self.__cell[1] + self.__SPACING
+            top = (index // self.__columns) * row_height
+            bottom = top + row_height + self.__SPACING
+            if top < self.__adj.get_value():
+                self.__adj.set_value(top)
+            elif bottom > self.__adj.get_value() + self.__adj.get_page_size():
+                self.__adj.set_value(bottom - self.__adj.get_page_size())
+        widget = self.__widgets.get(index, None)
+        if widget is not None:
+            widget.show_overlay(True)
+
+    def __get_index(self, widget):
+        """
+            Get position of bound widget
+            @param widget as AlbumSimpleWidget
+            @return int or None
+        """
+        for (index, bound) in self.__widgets.items():
+            if bound is widget:
+                return index
+        return None
+
+    def __place_added_albums(self):
+        """
+            Get order for albums added by scanner
+        """
+        self.__added_timeout_id = None
+        if self.__load_func is not None:
+            helper = TaskHelper()
+            helper.run(self.__load_func,
+                       callback=(self.__on_albums_loaded,))
+
+    def __get_widget(self, album_id, priority=GLib.PRIORITY_HIGH_IDLE):
+        """
+            Create a new widget
+            @param album id as int
+            @param priority as int (GLib.PRIORITY_*)
+            @return AlbumSimpleWidget
+        """
+        widget = AlbumSimpleWidget(album_id,
+                                   self.__genre_ids,
+                                   self.__artist_ids)
+        widget.set_artwork_priority(priority)
+        widget.populate()
+        widget.connect("overlayed", self.__on_overlayed)
+        widget.connect("button-press-event", self.__on_button_press)
+        self.put(widget, 0, 0)
+        return widget
+
+    def __on_size_allocate(self, widget, allocation):
+        """
+            Update columns if width changed
+            @param widget as Gtk.Widget
+            @param allocation as Gtk.Allocation
+        """
+        if allocation.width != self.__width:
+            self.__width = allocation.width
+            self.__layout()
+        else:
+            self.__update()
+
+    def __on_vadjustment(self, widget, param):
+        """
+            Follow new vertical adjustment
+            @param widget as Gtk.Widget
+            @param param as GObject.ParamSpec
+        """
+        if self.__adj is not None:
+            self.__adj.disconnect(self.__adj_signal)
+        self.__adj = self.get_vadjustment()
+        if self.__adj is not None:
+            self.__adj_signal = self.__adj.connect("value-changed",
+                                                   self.__on_value_changed)
+
+    def __on_value_changed(self, adj):
+        """
+            Show albums scrolled in
+            @param adj as Gtk.Adjustment
+        """
+        self.__update()
+
+    def __on_overlayed(self, widget, value):
+        """
+            Forward overlay changes
+            @param widget as AlbumSimpleWidget
+            @param value as bool
+        """
+        self.emit("overlayed", widget, value)
+
+    def __on_button_press(self, widget, event):
+        """
+            Activate album
+            @param widget as AlbumSimpleWidget
+            @param event as Gdk.EventButton
+        """
+        if event.button == 1:
+            index = self.__get_index(widget)
+            if index is not None:
+                self.__focus_index = index
+            self.grab_focus()
+            self.emit("child-activated", widget)
+
+    def __on_key_press(self, widget, event):
+        """
+            Move focus between albums, activate focused album
+            @param widget as Gtk.Widget
+            @param event as Gdk.EventKey
+        """
+        if not self.__filtered_ids or self.__cell is None or\
+                self.__adj is None:
+            return False
+        if event.keyval in [Gdk.KEY_Return, Gdk.KEY_KP_Enter,
+                            Gdk.KEY_space, Gdk.KEY_KP_Space]:
+            widget = self.__widgets.get(self.__focus_index, None)
+            if widget is not None:
+                self.emit("child-activated", widget)
+            return True
+        page = self.__columns * max(1, int(self.__adj.get_page_size() //
+                                           (self.__cell[1] + self.__SPACING)))
+        moves = {Gdk.KEY_Left: -1,
+                 Gdk.KEY_KP_Left: -1,
+                 Gdk.KEY_Right: 1,
+                 Gdk.KEY_KP_Right: 1,
+                 Gdk.KEY_Up: -self.__columns,
+                 Gdk.KEY_KP_Up: -self.__columns,
+                 Gdk.KEY_Down: self.__columns,
+                 Gdk.KEY_KP_Down: self.__columns,
+                 Gdk.KEY_Page_Up: -page,
+                 Gdk.KEY_KP_Page_Up: -page,
+                 Gdk.KEY_Page_Down: page,
+                 Gdk.KEY_KP_Page_Down: page}
+        last = len(self.__filtered_ids) - 1
+        if event.keyval in [Gdk.KEY_Home, Gdk.KEY_KP_Home]:
+            index = 0
+        elif event.keyval in [Gdk.KEY_End, Gdk.KEY_KP_End]:
+            index = last
+        elif event.keyval in moves.keys():
+            index = self.__focus_index + moves[event.keyval]
+        else:
+            return False
+        self.__set_focus_index(max(0, min(last, index)))
+        return True
+
+    def __on_focus_changed(self, widget, event):
+        """
+            Show focused album
+            @param widget as Gtk.Widget
+            @param event as Gdk.EventFocus
+        """
+        widget = self.__widgets.get(self.__focus_index, None)
+        if widget is not None:
+            widget.show_overlay(bool(event.in_))
+
+    def __on_album_updated(self, scanner, album_id, destroy):
+        """
+            Remove deleted album, place added ones
+            @param scanner as CollectionScanner
+            @param album id as int
+            @param destroy as bool
+        """
+        if destroy:
+            if album_id in self.__album_ids:
+                self.__album_ids.remove(album_id)
+                self.invalidate_filter()
+        elif self.__load_func is not None and\
+                album_id not in self.__album_ids:
+            self.__added_ids.add(album_id)
+            if self.__added_timeout_id is None:
+                self.__added_timeout_id = GLib.timeout_add(
+                                                 self.__ADD_DELAY,
+                                                 self.__place_added_albums)
+
+    def __on_albums_loaded(self, album_ids):
+        """
+            Insert added albums after their predecessor in loaded order
+            @param album ids as [int]
+        """
+        if self.__load_func is None:
+            return
+        shown_ids = set(self.__album_ids)
+        # Added albums by previous shown album, None for first ones
+        inserts = {}
+        previous_id = None
+        for album_id in album_ids:
+            if album_id in shown_ids:
+                previous_id = album_id
+            elif album_id in self.__added_ids:
+                inserts.setdefault(previous_id, []).append(album_id)
+        self.__added_ids = set()
+        if not inserts:
+            return
+        new_ids = inserts.get(None, [])
+        for album_id in self.__album_ids:
+            new_ids.append(album_id)
+            new_ids += inserts.get(album_id, [])
+        self.__album_ids = new_ids
+        self.invalidate_filter()
+
+    def __on_destroy(self, widget):
+        """
+            Disconnect signals
+            @param widget as Gtk.Widget
+        """
+        if self.__adj is not None:
+            self.__adj.disconnect(self.__adj_signal)
+            self.__adj = None
+        if self.__scan_signal is not None:
+            Lp().scanner.disconnect(self.__scan_signal)
+            self.__scan_signal = None
+        if self.__added_timeout_id is not None:
+            GLib.source_remove(self.__added_timeout_id)
+            self.__added_timeout_id = None
+        self.__load_func = None
@@ -28,6 +28,8 @@ class PlaylistsWidget(Gtk.Grid):
     __gsignals__ = {
         "populated": (GObject.SignalFlags.RUN_FIRST, None, ())
     }
+    # Rows are cheap until drawn, add them in batches
+    __BATCH_SIZE = 100
 
     def __init__(self, playlist_ids):
         """
@@ -255,14 +257,18 @@ class PlaylistsWidget(Gtk.Grid):
             self.__locked_widget_right = False
             return
 
-        track = Track(tracks.pop(0))
-        row = PlaylistRow(track.id, pos,
-                          track.album.id != previous_album_id)
-        row.connect("track-moved", self.__on_track_moved)
-        row.show()
-        widget.insert(row, pos)
+        for track_id in tracks[:self.__BATCH_SIZE]:
+            track = Track(track_id)
+            row = PlaylistRow(track.id, pos,
+                              track.album.id != previous_album_id)
+            row.connect("track-moved", self.__on_track_moved)
+            row.show()
+            widget.insert(row, pos)
+            pos += 1
+            previous_album_id = track.album.id
+        del tracks[:self.__BATCH_SIZE]
         GLib.idle_add(self.__add_tracks, tracks, widget,
-                      pos + 1, track.album.id)
+                      pos, previous_album_id)
 
     def __update_tracks(self):
         """
@@ -411,13 +417,8 @@ class PlaylistsWidget(Gtk.Grid):
         def update_playlist():
             # Save playlist in db only if one playlist visible
             if len(self.__playlist_ids) == 1 and self.__playlist_ids[0] >= 0:
-                Lp().playlists.clear(self.__playlist_ids[0], False)
-                tracks = []
-                for track_id in self.__tracks_left + self.__tracks_right:
-                    tracks.append(Track(track_id))
-                Lp().playlists.add_tracks(self.__playlist_ids[0],
-                                          tracks,
-                                          False)
+                Lp().playlists.move_track(self.__playlist_ids[0],
+                                          src, dst, up)
             if not (set(self.__playlist_ids) -
                set(Lp().player.get_user_playlist_ids())):
                 Lp().player.update_user_playlist(self.__tracks_left +
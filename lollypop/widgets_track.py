@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import GObject, Gtk, Gdk, Pango, GLib, Gst
+from gi.repository import GObject, Gtk, Gdk, Gio, Pango, GLib, Gst
 
 from lollypop.define import Lp, ArtSize, Type
 from lollypop.pop_menu import TrackMenuPopover, TrackMenu
@@ -23,88 +23,77 @@ from lollypop import utils
 
 class Row(Gtk.ListBoxRow):
     """
-        A row
+        A row, child widgets are created when row gets drawn
     """
+    # Height of a populated row, computed once
+    __height = None
+
+    @staticmethod
+    def get_best_height(widget):
+        """
+            Calculate widget height
+            @param widget as Gtk.Widget
+        """
+        ctx = widget.get_pango_context()
+        layout = Pango.Layout.new(ctx)
+        layout.set_text("a", 1)
+        font_height = int(layout.get_pixel_size()[1])
+        # Button min height + borders (application.css)
+        menu_height = 24 + 2
+        if font_height > menu_height:
+            height = font_height
+        else:
+            height = menu_height
+        return height
+
     def __init__(self, rowid, num, artist_ids=[]):
         """
-            Init row widgets
+            Init row
             @param rowid as int
             @param num as int
             @param artist_ids as [int]: Allow to tell Row that artist_ids
                    should not be displayed
         """
-        # We do not use Gtk.Builder for speed reasons
         Gtk.ListBoxRow.__init__(self)
         self._artists_label = None
+        self._indicator = None
         self._track = Track(rowid)
+        self.__artist_ids = artist_ids
         self.__number = num
         self.__preview_timeout_id = None
         self.__context_timeout_id = None
         self.__context = None
-        self._indicator = IndicatorWidget(self._track.id)
-        self.set_indicator(Lp().player.current_track.id == self._track.id,
-                           utils.is_loved(self._track.id))
-        self._row_widget = Gtk.EventBox()
-        self._row_widget.connect("button-press-event", self.__on_button_press)
-        self._row_widget.connect("enter-notify-event", self.__on_enter_notify)
-        self._row_widget.connect("leave-notify-event", self.__on_leave_notify)
-        self._grid = Gtk.Grid()
-        self._grid.set_column_spacing(5)
-        self._row_widget.add(self._grid)
-        self._title_label = Gtk.Label.new(self._track.name)
-        self._title_label.set_property("has-tooltip", True)
-        self._title_label.connect("query-tooltip",
-                                  self.__on_query_tooltip)
-        self._title_label.set_property("hexpand", True)
-        self._title_label.set_property("halign", Gtk.Align.START)
-        self._title_label.set_ellipsize(Pango.EllipsizeMode.END)
-        featuring_ids = self._track.get_featuring_ids(artist_ids)
-        if featuring_ids:
-            artists = []
-            for artist_id in featuring_ids:
-                artists.append(Lp().artists.get_name(artist_id))
-            self._artists_label = Gtk.Label.new(GLib.markup_escape_text(
-                                                           ", ".join(artists)))
-            self._artists_label.set_use_markup(True)
-            self._artists_label.set_property("has-tooltip", True)
-            self._artists_label.connect("query-tooltip",
-                                        self.__on_query_tooltip)
-            self._artists_label.set_property("hexpand", True)
-            self._artists_label.set_property("halign", Gtk.Align.END)
-            self._artists_label.set_ellipsize(Pango.EllipsizeMode.END)
-            self._artists_label.set_opacity(0.3)
-            self._artists_label.set_margin_end(5)
-            self._artists_label.show()
-        self._duration_label = Gtk.Label.new(
-                                       seconds_to_string(self._track.duration))
-        self._duration_label.get_style_context().add_class("dim-label")
-        self._num_label = Gtk.Label()
-        self._num_label.set_ellipsize(Pango.EllipsizeMode.END)
-        self._num_label.set_property("valign", Gtk.Align.CENTER)
-        self._num_label.set_width_chars(4)
-        self._num_label.get_style_context().add_class("dim-label")
-        self.update_num_label()
-        self.__menu_button = Gtk.Button.new()
-        # Here a hack to make old Gtk version support min-height css attribute
-        # min-height = 24px, borders = 2px, we set directly on stack
-        # min-width = 24px, borders = 2px, padding = 8px
-        self.__menu_button.set_size_request(34, 26)
-        self.__menu_button.set_relief(Gtk.ReliefStyle.NONE)
-        self.__menu_button.get_style_context().add_class("menu-button")
-        self.__menu_button.get_style_context().add_class("track-menu-button")
-        self._grid.add(self._num_label)
-        self._grid.add(self._title_label)
-        if self._artists_label is not None:
-            self._grid.add(self._artists_label)
-        self._grid.add(self._duration_label)
-        self._grid.add(self.__menu_button)
-        self.add(self._row_widget)
+        if Row.__height is None:
+            Row.__height = Row.get_best_height(self)
+        # Reserve space until populated
+        self.set_size_request(-1, Row.__height)
+        self.__draw_signal_id = self.connect("draw", self.__on_draw)
         self.get_style_context().add_class("trackrow")
 
+    def populate(self):
+        """
+            Create row widgets
+        """
+        if self.is_populated():
+            return
+        if self.__draw_signal_id is not None:
+            self.disconnect(self.__draw_signal_id)
+            self.__draw_signal_id = None
+        self.set_size_request(-1, -1)
+        self._populate()
+
+    def is_populated(self):
+        """
+            True if row widgets exist
+            @return bool
+        """
+        return self._indicator is not None
+
     def show_spinner(self):
         """
             Show spinner
         """
+        self.populate()
         self._indicator.show_spinner()
 
     def set_indicator(self, playing, loved):
@@ -114,6 +103,8 @@ class Row(Gtk.ListBoxRow):
             @param playing as bool
             @param loved as bool
         """
+        if self._indicator is None:
+            return
         self._indicator.clear()
         if playing:
             self.get_style_context().remove_class("trackrow")
@@ -142,13 +133,17 @@ class Row(Gtk.ListBoxRow):
             Update duration for row
         """
         # Get a new track to get new duration (cache)
-        track = Track(self._track.id)
-        self._duration_label.set_text(seconds_to_string(track.duration))
+        self._track = Track(self._track.id)
+        if not self.is_populated():
+            return
+        self._duration_label.set_text(seconds_to_string(self._track.duration))
 
     def update_num_label(self):
         """
             Update position label for row
         """
+        if not self.is_populated():
+            return
         if Lp().player.track_in_queue(self._track):
             self._num_label.get_style_context().add_class("queued")
             pos = Lp().player.get_track_position(self._track.id)
@@ -168,6 +163,80 @@ class Row(Gtk.ListBoxRow):
         """
         return self._track.id
 
+#######################
+# PROTECTED           #
+#######################
+    def _get_placeholder_height(self):
+        """
+            Get row height before populate
+            @return int
+        """
+        return Row.__height
+
+    def _populate(self):
+        """
+            Create row widgets
+        """
+        # We do not use Gtk.Builder for speed reasons
+        self._indicator = IndicatorWidget(self._track.id)
+        self.set_indicator(Lp().player.current_track.id == self._track.id,
+                           utils.is_loved(self._track.id))
+        self._row_widget = Gtk.EventBox()
+        self._row_widget.connect("button-press-event", self.__on_button_press)
+        self._row_widget.connect("enter-notify-event", self.__on_enter_notify)
+        self._row_widget.connect("leave-notify-event", self.__on_leave_notify)
+        self._grid = Gtk.Grid()
+        self._grid.set_column_spacing(5)
+        self._row_widget.add(self._grid)
+        self._title_label = Gtk.Label.new(self._track.name)
+        self._title_label.set_property("has-tooltip", True)
+        self._title_label.connect("query-tooltip",
+                                  self.__on_query_tooltip)
+        self._title_label.set_property("hexpand", True)
+        self._title_label.set_property("halign", Gtk.Align.START)
+        self._title_label.set_ellipsize(Pango.EllipsizeMode.END)
+        featuring_ids = self._track.get_featuring_ids(self.__artist_ids)
+        if featuring_ids:
+            artists = []
+            for artist_id in featuring_ids:
+                artists.append(Lp().artists.get_name(artist_id))
+            self._artists_label = Gtk.Label.new(GLib.markup_escape_text(
+                                                           ", ".join(artists)))
+            self._artists_label.set_use_markup(True)
+            self._artists_label.set_property("has-tooltip", True)
+            self._artists_label.connect("query-tooltip",
+                                        self.__on_query_tooltip)
+            self._artists_label.set_property("hexpand", True)
+            self._artists_label.set_property("halign", Gtk.Align.END)
+            self._artists_label.set_ellipsize(Pango.EllipsizeMode.END)
+            self._artists_label.set_opacity(0.3)
+            self._artists_label.set_margin_end(5)
+            self._artists_label.show()
+        self._duration_label = Gtk.Label.new(
+                                       seconds_to_string(self._track.duration))
+        self._duration_label.get_style_context().add_class("dim-label")
+        self._num_label = Gtk.Label()
+        self._num_label.set_ellipsize(Pango.EllipsizeMode.END)
+        self._num_label.set_property("valign", Gtk.Align.CENTER)
+        self._num_label.set_width_chars(4)
+        self._num_label.get_style_context().add_class("dim-label")
+        self.update_num_label()
+        self.__menu_button = Gtk.Button.new()
+        # Here a hack to make old Gtk version support min-height css attribute
+        # min-height = 24px, borders = 2px, we set directly on stack
+        # min-width = 24px, borders = 2px, padding = 8px
+        self.__menu_button.set_size_request(34, 26)
+        self.__menu_button.set_relief(Gtk.ReliefStyle.NONE)
+        self.__menu_button.get_style_context().add_class("menu-button")
+        self.__menu_button.get_style_context().add_class("track-menu-button")
+        self._grid.add(self._num_label)
+        self._grid.add(self._title_label)
+        if self._artists_label is not None:
+            self._grid.add(self._artists_label)
+        self._grid.add(self._duration_label)
+        self._grid.add(self.__menu_button)
+        self.add(self._row_widget)
+
 #######################
 # PRIVATE             #
 #######################
@@ -181,6 +250,25 @@ class Row(Gtk.ListBoxRow):
         self.set_indicator(True, False)
         self.__preview_timeout_id = None
 
+    def __on_draw(self, widget, cr):
+        """
+            Populate row once visible
+            @param widget as Gtk.Widget
+            @param cr as cairo.Context
+        """
+        self.disconnect(self.__draw_signal_id)
+        self.__draw_signal_id = None
+        # Do not change widget hierarchy while drawing
+        GLib.idle_add(self.__populate_if_needed,
+                      priority=GLib.PRIORITY_HIGH_IDLE)
+
+    def __populate_if_needed(self):
+        """
+            Populate row if still in a list
+        """
+        if self.get_parent() is not None:
+            self.populate()
+
     def __on_map(self, widget):
         """
             Fix for Gtk < 3.18,
@@ -364,6 +452,91 @@ class PlaylistRow(Row):
         Row.__init__(self, rowid, num)
         self.__parent_filter = False
         self.__show_headers = show_headers
+        self.__artwork_cancellable = Gio.Cancellable()
+        self.set_size_request(-1, self._get_placeholder_height())
+        self.drag_source_set(Gdk.ModifierType.BUTTON1_MASK, [],
+                             Gdk.DragAction.MOVE)
+        self.drag_source_add_text_targets()
+        self.drag_dest_set(Gtk.DestDefaults.DROP | Gtk.DestDefaults.MOTION,
+                           [('text/plain', 0, 0)], Gdk.DragAction.MOVE)
+        self.drag_dest_add_text_targets()
+        self.connect("drag-begin", self.__on_drag_begin)
+        self.connect("drag-data-get", self.__on_drag_data_get)
+        self.connect("drag-data-received", self.__on_drag_data_received)
+        self.connect("drag-motion", self.__on_drag_motion)
+        self.connect("drag-leave", self.__on_drag_leave)
+        self.connect("map", self.__on_map)
+        self.connect("unmap", self.__on_unmap)
+        self.connect("destroy", self.__on_unmap)
+
+    @property
+    def filter(self):
+        """
+            @return str
+        """
+        return " ".join(self._track.album.artists + self._track.artists +
+                        [self._track.name] +
+                        [self._track.album.name])
+
+    def set_filtered(self, b):
+        """
+            Set widget filtered
+        """
+        self.__parent_filter = b
+
+    @property
+    def filtered(self):
+        """
+            True if filtered by parent
+        """
+        return self.__parent_filter
+
+    def show_headers(self, show):
+        """
+            Show header
+            @param show as bool
+        """
+        if not self.get_sensitive():
+            return
+        if not self.is_populated():
+            self.__show_headers = show
+            self.set_size_request(-1, self._get_placeholder_height())
+            return
+        if self.__header.is_visible() == show:
+            return
+        self.__show_headers = show
+        if show:
+            self.__cover.set_tooltip_text(self._track.album.name)
+            self.__set_cover()
+            self.__cover.show()
+            self.__header.show_all()
+        else:
+            self.__artwork_cancellable.cancel()
+            self.__cover.set_tooltip_text("")
+            self.__cover.clear()
+            self.__cover.hide()
+            self.__header.hide()
+
+#######################
+# PROTECTED           #
+#######################
+    def _get_placeholder_height(self):
+        """
+            Get row height before populate
+            @return int
+        """
+        height = Row._get_placeholder_height(self)
+        if self.__show_headers:
+            # Header above track, cover on two lines
+            height = max(2 * height, ArtSize.MEDIUM + 2)
+        # Row margin
+        return height + 2
+
+    def _populate(self):
+        """
+            Create row widgets
+        """
+        Row._populate(self)
         self._indicator.set_margin_start(5)
         self._row_widget.set_margin_start(5)
         self._row_widget.set_margin_top(2)
@@ -422,68 +595,39 @@ class PlaylistRow(Row):
         self.set_indicator(Lp().player.current_track.id == self._track.id,
                            utils.is_loved(self._track.id))
         self.show_headers(self.__show_headers)
-        self.drag_source_set(Gdk.ModifierType.BUTTON1_MASK, [],
-                             Gdk.DragAction.MOVE)
-        self.drag_source_add_text_targets()
-        self.drag_dest_set(Gtk.DestDefaults.DROP | Gtk.DestDefaults.MOTION,
-                           [('text/plain', 0, 0)], Gdk.DragAction.MOVE)
-        self.drag_dest_add_text_targets()
-        self.connect("drag-begin", self.__on_drag_begin)
-        self.connect("drag-data-get", self.__on_drag_data_get)
-        self.connect("drag-data-received", self.__on_drag_data_received)
-        self.connect("drag-motion", self.__on_drag_motion)
-        self.connect("drag-leave", self.__on_drag_leave)
 
-    @property
-    def filter(self):
+#######################
+# PRIVATE             #
+#######################
+    def __set_cover(self):
         """
-            @return str
+            Load album cover in background
         """
-        return " ".join(self._track.album.artists + self._track.artists +
-                        [self._track.name] +
-                        [self._track.album.name])
+        self.__artwork_cancellable.cancel()
+        self.__artwork_cancellable = Gio.Cancellable()
+        Lp().art.get_album_artwork_async(self._track.album,
+                                         ArtSize.MEDIUM,
+                                         self.get_scale_factor(),
+                                         self.__artwork_cancellable,
+                                         GLib.PRIORITY_DEFAULT,
+                                         self.__cover.set_from_surface)
 
-    def set_filtered(self, b):
+    def __on_map(self, widget):
         """
-            Set widget filtered
+            Load cover if cancelled while unmapped
+            @param widget as Gtk.Widget
         """
-        self.__parent_filter = b
+        if self.is_populated() and self.__header.is_visible() and\
+                self.__cover.get_storage_type() == Gtk.ImageType.EMPTY:
+            self.__set_cover()
 
-    @property
-    def filtered(self):
+    def __on_unmap(self, widget):
         """
-            True if filtered by parent
+            Cancel artwork loading
+            @param widget as Gtk.Widget
         """
-        return self.__parent_filter
+        self.__artwork_cancellable.cancel()
 
-    def show_headers(self, show):
-        """
-            Show header
-            @param show as bool
-        """
-        if not self.get_sensitive():
-            return
-        if self.__header.is_visible() == show:
-            return
-        self.__show_headers = show
-        if show:
-            self.__cover.set_tooltip_text(self._track.album.name)
-            surface = Lp().art.get_album_artwork(
-                                        self._track.album,
-                                        ArtSize.MEDIUM,
-                                        self.get_scale_factor())
-            self.__cover.set_from_surface(surface)
-            self.__cover.show()
-            self.__header.show_all()
-        else:
-            self.__cover.set_tooltip_text("")
-            self.__cover.clear()
-            self.__cover.hide()
-            self.__header.hide()
-
-#######################
-# PRIVATE             #
-#######################
     def __on_artist_button_press(self, eventbox, event):
         """
             Go to artist page
@@ -581,26 +725,9 @@ class TrackRow(Row):
         A track row
     """
 
-    def get_best_height(widget):
-        """
-            Calculate widget height
-            @param widget as Gtk.Widget
-        """
-        ctx = widget.get_pango_context()
-        layout = Pango.Layout.new(ctx)
-        layout.set_text("a", 1)
-        font_height = int(layout.get_pixel_size()[1])
-        # Button min height + borders (application.css)
-        menu_height = 24 + 2
-        if font_height > menu_height:
-            height = font_height
-        else:
-            height = menu_height
-        return height
-
     def __init__(self, rowid, num, artist_ids):
         """
-            Init row widget and show it
+            Init row widget
             @param rowid as int
             @param num as int
             @param artist_ids as [int]: Allow to tell Row that artist_ids
@@ -608,9 +735,6 @@ class TrackRow(Row):
         """
         Row.__init__(self, rowid, num, artist_ids)
         self.__parent_filter = False
-        self._grid.insert_column(0)
-        self._grid.attach(self._indicator, 0, 0, 1, 1)
-        self.show_all()
 
     @property
     def filter(self):
@@ -631,9 +755,18 @@ class TrackRow(Row):
             True if filtered by parent
         """
         return self.__parent_filter
+
 #######################
-# PRIVATE             #
+# PROTECTED           #
 #######################
+    def _populate(self):
+        """
+            Create row widgets and show them
+        """
+        Row._populate(self)
+        self._grid.insert_column(0)
+        self._grid.attach(self._indicator, 0, 0, 1, 1)
+        self.show_all()
 
 
 class TracksWidget(Gtk.ListBox):
@@ -699,8 +832,10 @@ class TracksWidget(Gtk.ListBox):
             @param track id as int
         """
         for row in self.get_children():
-            row.set_indicator(row.id == track_id,
-                              utils.is_loved(row.id))
+            # Not populated rows will get their state when drawn
+            if row.is_populated():
+                row.set_indicator(row.id == track_id,
+                                  utils.is_loved(row.id))
 
     def update_duration(self, track_id):
         """
@@ -763,7 +898,7 @@ class TracksWidget(Gtk.ListBox):
             return
 
         for row in self.get_children():
-            if track_id == row.id:
+            if track_id == row.id and row.is_populated():
                 row.set_indicator(track_id == Lp().player.current_track.id,
                                   utils.is_loved(track_id))
 
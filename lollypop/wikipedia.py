@@ -47,11 +47,15 @@ class Wikipedia:
         """
             Get page infos
             @param page name as str
-            @return (url as str, content as str)
+            @return (url as str, content as str), (None, None) if not found
         """
         if not get_network_available():
             return (None, None)
-        page = wikipedia.page(name)
+        try:
+            page = wikipedia.page(name)
+        except (wikipedia.exceptions.PageError,
+                wikipedia.exceptions.DisambiguationError):
+            return (None, None)
         if page is None:
             return (None, None)
         content = page.content
@@ -0,0 +1,166 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import tracemalloc
+import unittest
+from unittest import mock
+
+try:
+    import gi
+    gi.require_version("Gtk", "3.0")
+    gi.require_version("Gdk", "3.0")
+    from gi.repository import Gio, GLib, GObject, Gtk, Gdk
+    from lollypop.widgets_albums_grid import AlbumsGrid
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("GTK not available: %s" % e)
+
+if not Gtk.init_check(None)[0]:
+    raise unittest.SkipTest("No display available")
+
+
+class Scanner(GObject.GObject):
+    """
+        Scanner as seen by AlbumsGrid
+    """
+    __gsignals__ = {
+        "album-updated": (GObject.SignalFlags.RUN_FIRST, None, (int, bool))
+    }
+
+
+class AlbumWidget(Gtk.EventBox):
+    """
+        Album cover sized widget, without database access
+    """
+    __gsignals__ = {
+        "overlayed": (GObject.SignalFlags.RUN_FIRST, None, (bool,))
+    }
+
+    def __init__(self, album_id, genre_ids, artist_ids):
+        Gtk.EventBox.__init__(self)
+        self.album_id = album_id
+        self.overlayed = False
+        self.set_size_request(200, 250)
+
+    def set_artwork_priority(self, priority):
+        pass
+
+    def populate(self):
+        pass
+
+    def set_album(self, album_id):
+        self.album_id = album_id
+
+    def show_overlay(self, set):
+        self.overlayed = set
+
+    def stop(self):
+        pass
+
+
+class AlbumsGridTest(unittest.TestCase):
+    """
+        Virtualized albums grid
+    """
+
+    def setUp(self):
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.scanner = Scanner()
+        self.app.set_default()
+        patcher = mock.patch("lollypop.widgets_albums_grid.AlbumSimpleWidget",
+                             AlbumWidget)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.grid = AlbumsGrid([], [])
+        self.activated = []
+        self.grid.connect("child-activated",
+                          lambda grid, widget:
+                          self.activated.append(widget.album_id))
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.add(self.grid)
+        self.window = Gtk.OffscreenWindow()
+        # Four columns, three rows visible
+        self.window.set_size_request(1000, 780)
+        self.window.add(scrolled)
+        self.window.show_all()
+        self.addCleanup(self.window.destroy)
+
+    def iterate(self):
+        context = GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+
+    def bound(self):
+        return sorted(widget.album_id for widget in self.grid.get_widgets())
+
+    def press(self, keyval):
+        event = Gdk.Event.new(Gdk.EventType.KEY_PRESS)
+        event.keyval = keyval
+        return self.grid.emit("key-press-event", event)
+
+    def test_first_paint_20k_albums(self):
+        album_ids = list(range(1, 20001))
+        tracemalloc.start()
+        start = time.perf_counter()
+        self.grid.set_album_ids(album_ids)
+        self.iterate()
+        elapsed = time.perf_counter() - start
+        (current, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        widgets = len(self.grid.get_widgets())
+        print("\n20000 albums: first paint %.1f ms, %s widgets, "
+              "%.1f KiB peak" % (elapsed * 1000, widgets, peak / 1024))
+        # Only visible rows and margins get a widget
+        self.assertLess(widgets, 40)
+        self.assertEqual(self.grid.album_ids, album_ids)
+
+    def test_added_albums_inserted_in_order(self):
+        self.grid.set_album_ids([1, 3, 5])
+        self.grid.set_load_func(lambda: [0, 1, 2, 3, 4, 5, 6])
+        for album_id in [6, 2, 0, 4]:
+            self.app.scanner.emit("album-updated", album_id, False)
+        # Known albums are ignored
+        self.app.scanner.emit("album-updated", 3, False)
+        self.grid._AlbumsGrid__on_albums_loaded([0, 1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.grid.album_ids, [0, 1, 2, 3, 4, 5, 6])
+        self.iterate()
+        self.assertEqual(self.bound(), [0, 1, 2, 3, 4, 5, 6])
+        self.app.scanner.emit("album-updated", 3, True)
+        self.assertEqual(self.grid.album_ids, [0, 1, 2, 4, 5, 6])
+
+    def test_keyboard_navigation(self):
+        self.grid.set_album_ids(list(range(0, 100)))
+        self.iterate()
+        self.grid.grab_focus()
+        self.assertTrue(self.press(Gdk.KEY_Right))
+        self.assertTrue(self.press(Gdk.KEY_Down))
+        self.assertTrue(self.press(Gdk.KEY_Return))
+        columns = self.grid._AlbumsGrid__columns
+        self.assertEqual(self.activated, [1 + columns])
+        self.assertTrue(self.press(Gdk.KEY_End))
+        self.iterate()
+        self.assertTrue(self.press(Gdk.KEY_space))
+        self.assertEqual(self.activated[-1], 99)
+        # Focused album scrolled into view
+        self.assertIn(99, self.bound())
+        self.assertTrue(self.press(Gdk.KEY_Home))
+        self.iterate()
+        self.assertTrue(self.press(Gdk.KEY_Left))
+        self.assertTrue(self.press(Gdk.KEY_Return))
+        self.assertEqual(self.activated[-1], 0)
+        self.assertFalse(self.press(Gdk.KEY_a))
+
+
+if __name__ == "__main__":
+    unittest.main()
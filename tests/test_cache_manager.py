@@ -0,0 +1,123 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+try:
+    from gi.repository import Gio, GLib
+    from lollypop.cache_manager import CacheManager
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("Lollypop dependencies not available: %s" % e)
+
+MB = 1024 * 1024
+
+
+class Settings:
+    """
+        Settings read by CacheManager
+    """
+    disk_cache_size = 0
+
+    def get_value(self, key):
+        return GLib.Variant("i", self.disk_cache_size)
+
+
+class ArtworkDatabase:
+    """
+        Artwork store counting compactions
+    """
+    compacted = 0
+
+    def compact(self):
+        self.compacted += 1
+
+
+class StubCacheManager(CacheManager):
+    """
+        Manager without timers, evicting given entries
+    """
+
+    def __init__(self):
+        self.artwork = ArtworkDatabase()
+        self._CacheManager__artwork = self.artwork
+
+    def evict(self, entries, usage):
+        self._CacheManager__evict(entries, usage)
+
+
+class CacheManagerEvictTest(unittest.TestCase):
+    """
+        Least recently used eviction over quota
+    """
+
+    def setUp(self):
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.debug = False
+        self.app.settings = Settings()
+        self.app.set_default()
+        self.manager = StubCacheManager()
+        self.removed = []
+
+    def remove(self, name):
+        if name == "broken":
+            raise IOError("read only")
+        self.removed.append(name)
+
+    def get_entries(self, entries):
+        return [(atime, count * MB, area, self.remove, (name,))
+                for (name, atime, count, area) in entries]
+
+    def test_no_quota(self):
+        entries = self.get_entries([("a", 1, 100, "cache")])
+        self.manager.evict(entries, {"cache": (1, 100 * MB)})
+        self.assertEqual(self.removed, [])
+
+    def test_under_quota(self):
+        self.app.settings.disk_cache_size = 10
+        entries = self.get_entries([("a", 1, 4, "cache"),
+                                    ("b", 2, 6, "cache")])
+        self.manager.evict(entries, {"cache": (2, 10 * MB)})
+        self.assertEqual(self.removed, [])
+
+    def test_oldest_first_to_low_watermark(self):
+        self.app.settings.disk_cache_size = 10
+        entries = self.get_entries([("new", 30, 4, "cache"),
+                                    ("old", 10, 4, "artwork"),
+                                    ("older", 5, 2, "info"),
+                                    ("middle", 20, 2, "cache")])
+        usage = {"cache": (2, 6 * MB),
+                 "artwork": (1, 4 * MB),
+                 "info": (1, 2 * MB)}
+        self.manager.evict(entries, usage)
+        # 12 MB down to 9 MB or less
+        self.assertEqual(self.removed, ["older", "old"])
+        self.assertEqual(usage, {"cache": (2, 6 * MB),
+                                 "artwork": (0, 0),
+                                 "info": (0, 0)})
+        self.assertEqual(self.manager.artwork.compacted, 1)
+
+    def test_failed_removal_continues(self):
+        self.app.settings.disk_cache_size = 10
+        entries = self.get_entries([("broken", 1, 6, "cache"),
+                                    ("a", 2, 3, "cache"),
+                                    ("b", 3, 3, "cache")])
+        usage = {"cache": (3, 12 * MB)}
+        self.manager.evict(entries, usage)
+        self.assertEqual(self.removed, ["a"])
+        self.assertEqual(usage, {"cache": (2, 9 * MB)})
+        # No artwork rows removed
+        self.assertEqual(self.manager.artwork.compacted, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
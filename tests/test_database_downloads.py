@@ -0,0 +1,89 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from time import time
+
+# Never touch user data
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp()
+
+try:
+    from gi.repository import Gio, GLib
+    from lollypop.database_downloads import DownloadsDatabase
+    from lollypop.sqlcursor import SqlCursor
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("Lollypop dependencies not available: %s" % e)
+
+WEEK = 7 * 24 * 3600
+
+
+class DownloadsDatabaseTest(unittest.TestCase):
+    """
+        Pending downloads and cached misses
+    """
+
+    def setUp(self):
+        path = GLib.get_user_data_dir() + "/lollypop/downloads.db"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.cursors = {}
+        self.app.set_default()
+        self.downloads = DownloadsDatabase()
+
+    def age_miss(self, service, key, seconds):
+        with SqlCursor(self.downloads) as sql:
+            sql.execute("UPDATE misses SET mtime=?\
+                         WHERE service=? AND key=?",
+                        (int(time()) - seconds, service, key))
+            sql.commit()
+
+    def test_miss_expires_after_a_week(self):
+        self.downloads.add_miss("deezer", "Muse@Absolution")
+        self.assertTrue(self.downloads.is_miss("deezer",
+                                               "Muse@Absolution", WEEK))
+        # Misses are per service
+        self.assertFalse(self.downloads.is_miss("spotify",
+                                                "Muse@Absolution", WEEK))
+        self.age_miss("deezer", "Muse@Absolution", WEEK - 60)
+        self.assertTrue(self.downloads.is_miss("deezer",
+                                               "Muse@Absolution", WEEK))
+        self.age_miss("deezer", "Muse@Absolution", WEEK + 60)
+        self.assertFalse(self.downloads.is_miss("deezer",
+                                                "Muse@Absolution", WEEK))
+        # Service without result again
+        self.downloads.add_miss("deezer", "Muse@Absolution")
+        self.assertTrue(self.downloads.is_miss("deezer",
+                                               "Muse@Absolution", WEEK))
+
+    def test_clean_misses(self):
+        self.downloads.add_miss("deezer", "old")
+        self.downloads.add_miss("deezer", "new")
+        self.age_miss("deezer", "old", WEEK + 60)
+        self.downloads.clean_misses(WEEK)
+        with SqlCursor(self.downloads) as sql:
+            result = sql.execute("SELECT key FROM misses")
+            self.assertEqual(list(result), [("new",)])
+
+    def test_jobs(self):
+        self.downloads.set_jobs([(0, "1"), (1, "Muse"), (0, "1")])
+        self.assertEqual(sorted(self.downloads.pop_jobs()),
+                         [(0, "1"), (1, "Muse")])
+        self.assertEqual(self.downloads.pop_jobs(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import re
+import socket
+import tempfile
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
+from time import time
+from unittest import mock
+
+# Never touch user data
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp()
+
+try:
+    from gi.repository import Gio, GLib
+    from lollypop.downloader import Downloader, ServiceError
+    from lollypop.helper_task import TaskHelper
+    from lollypop.sqlcursor import SqlCursor
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("Lollypop dependencies not available: %s" % e)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+        Answer with server responses, by path
+    """
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        for (prefix, (status, body)) in self.server.responses.items():
+            if self.path.startswith(prefix):
+                break
+        else:
+            (status, body) = (404, b"")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalTaskHelper(TaskHelper):
+    """
+        Send web services requests to local server
+    """
+    server_uri = None
+
+    def load_uri_content_sync(self, uri, cancellable=None):
+        uri = re.sub("^https://[^/]+", self.server_uri, uri)
+        return TaskHelper.load_uri_content_sync(self, uri, cancellable)
+
+
+class Albums:
+    """
+        Collection albums as seen by Downloader
+    """
+
+    def get_name(self, album_id):
+        return "Absolution"
+
+    def get_artist_ids(self, album_id):
+        return [1]
+
+    def get_artists(self, album_id):
+        return ["Muse"]
+
+
+class Art:
+    """
+        Record saved artwork
+    """
+
+    def __init__(self):
+        self.saved = []
+
+    def save_album_artwork(self, data, album_id):
+        self.saved.append((bytes(data), album_id))
+
+
+class DownloaderServiceTest(unittest.TestCase):
+    """
+        Web services against a local HTTP stand-in
+    """
+
+    def setUp(self):
+        os.makedirs(GLib.get_user_data_dir() + "/lollypop", exist_ok=True)
+        path = GLib.get_user_data_dir() + "/lollypop/downloads.db"
+        if os.path.exists(path):
+            os.remove(path)
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.server.paths = []
+        self.server.responses = {}
+        thread = Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.server_uri = "http://127.0.0.1:%s" % self.server.server_port
+        LocalTaskHelper.server_uri = self.server_uri
+        patcher = mock.patch("lollypop.downloader.TaskHelper",
+                             LocalTaskHelper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.debug = False
+        self.app.cursors = {}
+        self.app.lastfm = None
+        self.app.albums = Albums()
+        self.app.art = Art()
+        self.app.set_default()
+        self.downloader = Downloader()
+
+    def set_albums(self, artists, status=200):
+        data = [{"artist": {"name": artist},
+                 "cover_xl": self.server_uri + "/cover.jpg"}
+                for artist in artists]
+        body = json.dumps({"data": data}).encode("utf-8")
+        self.server.responses["/search/album/"] = (status, body)
+        self.server.responses["/cover.jpg"] = (200, b"cover")
+
+    def call(self):
+        return self.downloader._Downloader__call_service(
+                                    "deezer",
+                                    self.downloader._get_deezer_album_artwork,
+                                    "Muse", "Absolution")
+
+    def cache_album_art(self):
+        # Only deezer, others would hit real services
+        with mock.patch("lollypop.downloader.InfoCache.WEBSERVICES",
+                        [("deezer", None, "_get_deezer_album_artwork")]):
+            self.downloader._Downloader__cache_album_art(1)
+
+    def test_found(self):
+        self.set_albums(["Queen", "Muse"])
+        self.assertEqual(self.call(), (True, b"cover"))
+        self.assertEqual(len(self.server.paths), 2)
+
+    def test_not_found_is_an_answer(self):
+        self.set_albums(["Queen"])
+        self.assertEqual(self.call(), (True, None))
+
+    def test_server_error_raises(self):
+        self.set_albums(["Muse"], 503)
+        with self.assertRaises(ServiceError):
+            self.downloader._get_deezer_album_artwork("Muse", "Absolution")
+
+    def test_artwork_error_raises(self):
+        self.set_albums(["Muse"])
+        self.server.responses["/cover.jpg"] = (500, b"")
+        with self.assertRaises(ServiceError):
+            self.downloader._get_deezer_album_artwork("Muse", "Absolution")
+
+    def test_connection_refused_raises(self):
+        # Get a port nobody listens on
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        LocalTaskHelper.server_uri = "http://127.0.0.1:%s" %\
+            sock.getsockname()[1]
+        sock.close()
+        with self.assertRaises(ServiceError):
+            self.downloader._get_deezer_album_artwork("Muse", "Absolution")
+
+    def test_circuit_opens_on_errors(self):
+        self.set_albums(["Muse"], 503)
+        for i in range(0, 3):
+            self.assertEqual(self.call(), (False, None))
+        self.assertEqual(len(self.server.paths), 3)
+        # Service disabled, not requested anymore
+        self.set_albums(["Muse"])
+        self.assertEqual(self.call(), (False, None))
+        self.assertEqual(len(self.server.paths), 3)
+
+    def test_miss_cached_for_a_week(self):
+        self.set_albums(["Queen"])
+        self.cache_album_art()
+        self.assertEqual(len(self.server.paths), 1)
+        # Not asked again while miss is cached
+        self.set_albums(["Muse"])
+        self.cache_album_art()
+        self.assertEqual(len(self.server.paths), 1)
+        self.assertEqual(self.app.art.saved, [])
+        # Miss expired
+        with SqlCursor(self.downloader._Downloader__downloads) as sql:
+            sql.execute("UPDATE misses SET mtime=?",
+                        (int(time()) - 7 * 24 * 3600 - 60,))
+            sql.commit()
+        self.cache_album_art()
+        self.assertEqual(self.app.art.saved, [(b"cover", 1)])
+
+    def test_error_is_not_a_miss(self):
+        self.set_albums(["Muse"], 503)
+        self.cache_album_art()
+        self.set_albums(["Muse"])
+        self.cache_album_art()
+        self.assertEqual(self.app.art.saved, [(b"cover", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
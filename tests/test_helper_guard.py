@@ -0,0 +1,103 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from unittest import mock
+
+from lollypop.helper_guard import GuardHelper
+
+
+class Clock:
+    """
+        Time going on only when asked
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+class GuardHelperTest(unittest.TestCase):
+    """
+        Rate limit and circuit breaker
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        for name in ["time", "sleep"]:
+            patcher = mock.patch("lollypop.helper_guard.%s" % name,
+                                 getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.guard = GuardHelper(0.5)
+
+    def fail_requests(self, count):
+        for i in range(0, count):
+            self.assertTrue(self.guard.acquire())
+            self.guard.failure()
+
+    def test_rate_limit(self):
+        for i in range(0, 4):
+            self.assertTrue(self.guard.acquire())
+        self.assertAlmostEqual(self.clock.slept, 1.5)
+        # No wait after a pause
+        self.clock.now += 10
+        slept = self.clock.slept
+        self.assertTrue(self.guard.acquire())
+        self.assertEqual(self.clock.slept, slept)
+
+    def test_circuit_opens_after_failures(self):
+        self.fail_requests(2)
+        self.assertTrue(self.guard.acquire())
+        self.guard.failure()
+        self.assertFalse(self.guard.acquire())
+        self.clock.now += 59
+        self.assertFalse(self.guard.acquire())
+        # Closed again after cooldown
+        self.clock.now += 2
+        self.assertTrue(self.guard.acquire())
+
+    def test_success_resets_failures(self):
+        self.fail_requests(2)
+        self.assertTrue(self.guard.acquire())
+        self.guard.success()
+        self.fail_requests(2)
+        self.assertTrue(self.guard.acquire())
+
+    def test_cooldown_backoff(self):
+        cooldowns = []
+        for i in range(0, 8):
+            self.fail_requests(3)
+            opened = self.clock.now
+            while not self.guard.acquire():
+                self.clock.now += 1
+            cooldowns.append(round(self.clock.now - opened))
+        self.assertEqual(cooldowns,
+                         [60, 120, 240, 480, 960, 1920, 3600, 3600])
+        # Service answered, back to first cooldown
+        self.guard.success()
+        self.fail_requests(3)
+        opened = self.clock.now
+        while not self.guard.acquire():
+            self.clock.now += 1
+        self.assertEqual(round(self.clock.now - opened), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+
+# Never touch user data
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp()
+
+try:
+    from gi.repository import Gio, GLib
+    from pylast import WSError
+    from lollypop.lastfm import LastFM
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("Last.fm support not available: %s" % e)
+
+
+class StubLastFM(LastFM):
+    """
+        Service answering with queued errors instead of network
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.errors = []
+        LastFM.__init__(self, "librefm")
+
+    def connect(self, full_sync=False, callback=None, *args):
+        pass
+
+    def scrobble_many(self, tracks):
+        self.batches.append(tracks)
+        if self.errors:
+            raise WSError(self, self.errors.pop(0), "error")
+
+    def flush(self):
+        # Synchronous flush, public one runs in a thread
+        self._LastFM__flush_scrobbles()
+
+
+class ScrobblesFlushTest(unittest.TestCase):
+    """
+        Scrobble queue submission
+    """
+
+    def setUp(self):
+        schemas = Gio.SettingsSchemaSource.get_default()
+        if schemas is None or\
+                schemas.lookup("org.gnome.system.proxy", True) is None:
+            self.skipTest("proxy settings schema not installed")
+        os.makedirs(GLib.get_user_data_dir() + "/lollypop", exist_ok=True)
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.cursors = {}
+        self.app.debug = False
+        self.app.set_default()
+        self.lastfm = StubLastFM()
+        self.queue = self.lastfm._LastFM__scrobbles
+        self.queue.remove([scrobble[0]
+                           for scrobble in self.queue.get("librefm", 1000)])
+
+    def add_scrobbles(self, count):
+        for i in range(0, count):
+            self.queue.add("librefm", "artist", "album", "title %s" % i, i)
+
+    def test_batches(self):
+        self.add_scrobbles(120)
+        self.lastfm.flush()
+        self.assertEqual([len(batch) for batch in self.lastfm.batches],
+                         [50, 50, 20])
+        # Oldest first
+        self.assertEqual(self.lastfm.batches[0][0]["timestamp"], 0)
+        self.assertEqual(self.queue.count("librefm"), 0)
+
+    def test_transient_errors_keep_batch(self):
+        for status in ["8", "11", "16", "29"]:
+            self.lastfm.errors = [status]
+            self.add_scrobbles(60)
+            self.lastfm.flush()
+            self.assertEqual(self.queue.count("librefm"), 60)
+        # Sent again once service is back
+        self.lastfm.flush()
+        self.assertEqual(self.queue.count("librefm"), 0)
+
+    def test_backoff_doubles(self):
+        self.add_scrobbles(1)
+        backoffs = []
+        for i in range(0, 9):
+            self.lastfm.errors = ["11"]
+            self.lastfm.flush()
+            backoffs.append(self.lastfm._LastFM__backoff)
+        self.assertEqual(backoffs, [30, 60, 120, 240, 480, 960,
+                                    1920, 3600, 3600])
+        self.lastfm.flush()
+        self.assertEqual(self.lastfm._LastFM__backoff, 0)
+
+    def test_rejected_batch_is_removed(self):
+        self.add_scrobbles(60)
+        self.lastfm.errors = ["6"]
+        self.lastfm.flush()
+        # Only rejected batch is dropped, next one is sent
+        self.assertEqual(len(self.lastfm.batches), 2)
+        self.assertEqual(self.queue.count("librefm"), 0)
+
+    def test_duplicates_are_ignored(self):
+        self.add_scrobbles(3)
+        self.add_scrobbles(3)
+        self.assertEqual(self.queue.count("librefm"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from lollypop.lru import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    """
+        Bounded least recently used cache
+    """
+
+    def setUp(self):
+        self.evicted = []
+
+    def on_evict(self, key, value):
+        self.evicted.append((key, value))
+
+    def test_count_limit(self):
+        cache = LRUCache(max_count=3, on_evict=self.on_evict)
+        for i in range(0, 3):
+            cache.set(i, str(i))
+        # Mark 0 as recently used
+        self.assertEqual(cache.get(0), "0")
+        cache.set(3, "3")
+        self.assertEqual(cache.keys(), [2, 0, 3])
+        self.assertEqual(self.evicted, [(1, "1")])
+        self.assertEqual(cache.values(), ["2", "0", "3"])
+
+    def test_size_limit(self):
+        cache = LRUCache(max_size=10, get_size=len, on_evict=self.on_evict)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        cache.set("c", "xxxx")
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(self.evicted, [("a", "xxxx")])
+        # Never fits, nothing evicted
+        cache.set("d", "x" * 11)
+        self.assertNotIn("d", cache)
+        self.assertEqual(len(cache), 2)
+        cache.set_max_size(4)
+        self.assertEqual(cache.values(), ["xxxx"])
+        self.assertEqual(self.evicted, [("a", "xxxx"), ("b", "xxxx")])
+
+    def test_replace_keeps_size(self):
+        cache = LRUCache(max_size=10, get_size=len)
+        cache.set("a", "xxxx")
+        cache.set("a", "xx")
+        self.assertEqual(cache.size, 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_remove_is_not_eviction(self):
+        cache = LRUCache(max_count=2, get_size=len, on_evict=self.on_evict)
+        cache.set("a", "x")
+        cache.set("b", "xx")
+        cache.set("ab", "xxx")
+        cache.remove("b")
+        cache.remove_if(lambda key: key.startswith("a"))
+        cache.set("c", "x")
+        cache.clear()
+        self.assertEqual(self.evicted, [("a", "x")])
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache.values(), [])
+
+    def test_stats(self):
+        cache = LRUCache(max_count=2)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats
+        self.assertEqual((stats["hits"], stats["misses"], stats["count"]),
+                         (2, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gio, GLib
+    from lollypop.mpris import MPRIS
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("MPRIS dependencies not available: %s" % e)
+
+
+class Player:
+    """
+        Player as seen by MPRIS
+    """
+    volume = 0.5
+
+
+class StubMPRIS(MPRIS):
+    """
+        MPRIS without session bus, recording emitted changes
+    """
+
+    def __init__(self):
+        self.emitted = []
+        self._MPRIS__changed = {}
+        self._MPRIS__changed_id = None
+
+    def PropertiesChanged(self, interface_name, changed_properties,
+                          invalidated_properties):
+        self.emitted.append((interface_name, changed_properties))
+
+
+class MPRISChangesTest(unittest.TestCase):
+    """
+        Properties changes are coalesced per main loop iteration
+    """
+
+    def setUp(self):
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.player = Player()
+        self.app.set_default()
+        self.mpris = StubMPRIS()
+
+    def queue(self, properties):
+        self.mpris._MPRIS__queue_changed(properties)
+
+    def iterate(self):
+        context = GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+
+    def test_changes_are_coalesced(self):
+        self.queue({"PlaybackStatus": GLib.Variant("s", "Paused")})
+        self.queue({"Shuffle": GLib.Variant("b", True)})
+        self.queue({"PlaybackStatus": GLib.Variant("s", "Playing")})
+        # Nothing emitted before main loop runs
+        self.assertEqual(self.mpris.emitted, [])
+        self.iterate()
+        self.assertEqual(len(self.mpris.emitted), 1)
+        (interface, properties) = self.mpris.emitted[0]
+        self.assertEqual(interface, "org.mpris.MediaPlayer2.Player")
+        self.assertEqual(
+            {key: value.unpack() for (key, value) in properties.items()},
+            {"PlaybackStatus": "Playing", "Shuffle": True})
+
+    def test_volume_changes(self):
+        on_volume_changed = self.mpris._MPRIS__on_volume_changed
+        for volume in [0.1, 0.2, 0.3]:
+            self.app.player.volume = volume
+            on_volume_changed(self.app.player)
+        self.iterate()
+        self.assertEqual(len(self.mpris.emitted), 1)
+        self.assertAlmostEqual(
+            self.mpris.emitted[0][1]["Volume"].unpack(), 0.3)
+
+    def test_later_changes_emitted_again(self):
+        self.queue({"Shuffle": GLib.Variant("b", True)})
+        self.iterate()
+        self.queue({"Shuffle": GLib.Variant("b", False)})
+        self.iterate()
+        self.assertEqual([properties["Shuffle"].unpack()
+                          for (interface, properties) in self.mpris.emitted],
+                         [True, False])
+        # Nothing left to emit
+        self.iterate()
+        self.assertEqual(len(self.mpris.emitted), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
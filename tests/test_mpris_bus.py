@@ -0,0 +1,209 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import shutil
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gio, GLib
+    from lollypop.define import Shuffle
+    from lollypop.mpris import MPRIS
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("MPRIS dependencies not available: %s" % e)
+
+MPRIS_NAME = "org.mpris.MediaPlayer2.Lollypop"
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+MPRIS_PLAYER_IFACE = "org.mpris.MediaPlayer2.Player"
+ROUND_TRIPS = 200
+
+
+class Track:
+    """
+        No current track
+    """
+    id = None
+
+
+class Player:
+    """
+        Stopped player as seen by MPRIS
+    """
+    volume = 0.5
+    position = 0
+    current_track = Track()
+
+    def connect(self, signal, callback):
+        pass
+
+    def get_status(self):
+        return None
+
+
+class Settings:
+    """
+        Settings read by MPRIS
+    """
+
+    def get_enum(self, key):
+        return Shuffle.NONE
+
+    def connect(self, signal, callback):
+        pass
+
+
+class MPRISBusBenchmark(unittest.TestCase):
+    """
+        Round-trips through a private session bus
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        daemon = shutil.which("dbus-daemon")
+        if daemon is None:
+            raise unittest.SkipTest("dbus-daemon not available")
+        cls.daemon = subprocess.Popen([daemon, "--session", "--nofork",
+                                       "--print-address"],
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL,
+                                      universal_newlines=True)
+        cls.address = cls.daemon.stdout.readline().strip()
+        if not cls.address:
+            cls.daemon.wait()
+            raise unittest.SkipTest("dbus-daemon failed to start")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.daemon.terminate()
+        cls.daemon.wait()
+        cls.daemon.stdout.close()
+
+    def setUp(self):
+        flags = Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT |\
+            Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION
+        self.server_bus = Gio.DBusConnection.new_for_address_sync(
+                                               self.address, flags, None, None)
+        self.client_bus = Gio.DBusConnection.new_for_address_sync(
+                                               self.address, flags, None, None)
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.player = Player()
+        self.app.settings = Settings()
+        self.app.scanner = Player()
+        self.app.set_default()
+        with mock.patch("lollypop.mpris.Gio.bus_get_sync",
+                        lambda bus_type, cancellable: self.server_bus):
+            self.mpris = MPRIS(self.app)
+        self.wait(lambda: self.client_bus.call_sync(
+                               "org.freedesktop.DBus", "/org/freedesktop/DBus",
+                               "org.freedesktop.DBus", "NameHasOwner",
+                               GLib.Variant("(s)", (MPRIS_NAME,)),
+                               None, Gio.DBusCallFlags.NONE, -1,
+                               None).unpack()[0])
+
+    def tearDown(self):
+        self.client_bus.close_sync(None)
+        self.server_bus.close_sync(None)
+
+    def wait(self, condition):
+        """
+            Run main loop until condition is True
+            @param condition as function() returning bool
+        """
+        context = GLib.MainContext.default()
+        end = time.monotonic() + 5
+        while not condition():
+            if time.monotonic() > end:
+                self.fail("Timeout")
+            context.iteration(False)
+
+    def call(self, method, parameters):
+        """
+            Call properties method, server answers from main loop
+            @param method as str
+            @param parameters as GLib.Variant
+            @return GLib.Variant
+        """
+        results = []
+        self.client_bus.call(MPRIS_NAME, MPRIS_PATH,
+                             "org.freedesktop.DBus.Properties", method,
+                             parameters, None, Gio.DBusCallFlags.NONE, -1,
+                             None,
+                             lambda bus, result:
+                             results.append(bus.call_finish(result)))
+        self.wait(lambda: results)
+        return results[0]
+
+    def measure(self, method, parameters):
+        """
+            Time round trips
+            @return (mean, p95) in ms
+        """
+        timings = []
+        for i in range(0, ROUND_TRIPS):
+            start = time.perf_counter()
+            self.call(method, parameters)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return (sum(timings) / len(timings),
+                timings[int(len(timings) * 0.95)])
+
+    def test_round_trips(self):
+        result = self.call("Get", GLib.Variant("(ss)", (MPRIS_PLAYER_IFACE,
+                                                        "Volume")))
+        self.assertEqual(result.unpack(), (0.5,))
+        (get_mean, get_p95) = self.measure(
+                              "Get", GLib.Variant("(ss)", (MPRIS_PLAYER_IFACE,
+                                                           "Volume")))
+        (all_mean, all_p95) = self.measure(
+                              "GetAll", GLib.Variant("(s)",
+                                                     (MPRIS_PLAYER_IFACE,)))
+        print("\nGet: %.2f ms mean, %.2f ms p95; GetAll: %.2f ms mean, "
+              "%.2f ms p95" % (get_mean, get_p95, all_mean, all_p95))
+
+    def test_changes_latency(self):
+        received = []
+        self.client_bus.signal_subscribe(
+                        None, "org.freedesktop.DBus.Properties",
+                        "PropertiesChanged", MPRIS_PATH, None,
+                        Gio.DBusSignalFlags.NONE,
+                        lambda *args: received.append(
+                            (time.perf_counter(), args[5].unpack())))
+        latencies = []
+        for i in range(0, ROUND_TRIPS):
+            start = time.perf_counter()
+            # A burst of changes, as when skipping tracks quickly
+            for volume in [0.1, 0.2, 0.3]:
+                self.app.player.volume = volume
+                self.mpris._MPRIS__on_volume_changed(self.app.player)
+            self.wait(lambda: len(received) > i)
+            latencies.append((received[i][0] - start) * 1000)
+        # Let late signals arrive
+        self.call("Get", GLib.Variant("(ss)", (MPRIS_PLAYER_IFACE,
+                                               "Volume")))
+        # One signal per burst, with last value
+        self.assertEqual(len(received), ROUND_TRIPS)
+        self.assertEqual(received[-1][1][1], {"Volume": 0.3})
+        latencies.sort()
+        print("\nPropertiesChanged: %.2f ms mean, %.2f ms p95 for %s "
+              "bursts of 3 changes" % (sum(latencies) / len(latencies),
+                                       latencies[int(len(latencies) * 0.95)],
+                                       ROUND_TRIPS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import struct
+import tempfile
+import time
+import unittest
+import wave
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    gi.require_version("GstAudio", "1.0")
+    gi.require_version("GstController", "1.0")
+    gi.require_version("GstPbutils", "1.0")
+    from gi.repository import Gio, GLib, Gst
+    Gst.init(None)
+    from lollypop.define import NextContext, Shuffle
+    from lollypop.player_bin import BinPlayer
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("GStreamer not available: %s" % e)
+
+
+class Settings:
+    """
+        Settings read by BinPlayer
+    """
+
+    def get_enum(self, key):
+        if key == "shuffle":
+            return Shuffle.NONE
+        return NextContext.NONE
+
+    def get_value(self, key):
+        return GLib.Variant("d", 0.0)
+
+
+class FakeTrack:
+    """
+        Track as seen by BinPlayer
+    """
+
+    def __init__(self, track_id, uri):
+        self.id = track_id
+        self.uri = uri
+
+
+class StubBinPlayer(BinPlayer):
+    """
+        Player without collection, bus messages are ignored
+    """
+
+    def _on_stream_start(self, bus, message):
+        pass
+
+    def _on_bus_message_tag(self, bus, message):
+        pass
+
+    def _on_bus_element(self, bus, message):
+        pass
+
+    def _on_bus_error(self, bus, message):
+        pass
+
+    def _on_bus_eos(self, bus, message):
+        pass
+
+    def _on_stream_about_to_finish(self, playbin):
+        pass
+
+
+def write_wav(path, seconds):
+    """
+        Write a silent wav file
+        @param path as str
+        @param seconds as int
+    """
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(struct.pack("<h", 0) * 8000 * seconds)
+
+
+class CrossfadeTest(unittest.TestCase):
+    """
+        Crossfade through BinPlayer, volume interpolated by GStreamer
+    """
+
+    def setUp(self):
+        for name in ["playbin", "volume", "rgvolume", "rglimiter",
+                     "fakesink", "wavparse"]:
+            if Gst.ElementFactory.find(name) is None:
+                self.skipTest("%s not available" % name)
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.settings = Settings()
+        self.app.window = None
+        self.app.set_default()
+        self.tmp = tempfile.mkdtemp()
+        self.tracks = []
+        for i in range(1, 3):
+            path = os.path.join(self.tmp, "%s.wav" % i)
+            write_wav(path, 20)
+            self.tracks.append(FakeTrack(i, GLib.filename_to_uri(path)))
+        self.player = StubBinPlayer()
+        self.player._crossfading = True
+        # Headless, replace audio output by a clocked fake sink
+        for playbin in [self.player._BinPlayer__playbin1,
+                        self.player._BinPlayer__playbin2]:
+            sink_bin = playbin.get_property("audio-sink")
+            sink = sink_bin.get_by_name("autoaudiosink")
+            sink_bin.remove(sink)
+            fakesink = Gst.ElementFactory.make("fakesink", None)
+            fakesink.props.sync = True
+            sink_bin.add(fakesink)
+            sink_bin.get_by_name("audioconvert3").link(fakesink)
+
+    def tearDown(self):
+        self.player.stop_all()
+
+    def iterate(self, seconds):
+        """
+            Run main loop
+            @param seconds as float
+        """
+        context = GLib.MainContext.default()
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            context.iteration(False)
+            time.sleep(0.01)
+
+    def wait_position(self, playbin, position):
+        """
+            Run main loop until playbin reaches position
+            @param playbin as Gst.Bin
+            @param position as int
+        """
+        end = time.monotonic() + 10
+        while time.monotonic() < end:
+            (success, current) = playbin.query_position(Gst.Format.TIME)
+            if success and current >= position:
+                return
+            self.iterate(0.05)
+        self.fail("Playback did not start")
+
+    def sample(self, plugins, seconds, step=0.2):
+        """
+            Sample volume while main loop is blocked
+            @param plugins as [PluginsPlayer]
+            @param seconds as float
+            @param step as float
+            @return [[float]], one list per plugins
+        """
+        samples = [[] for p in plugins]
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            for (i, p) in enumerate(plugins):
+                samples[i].append(p.volume.props.volume)
+            time.sleep(step)
+        return samples
+
+    def test_crossfade_with_blocked_main_loop(self):
+        self.player._BinPlayer__load(self.tracks[0])
+        self.wait_position(self.player._playbin, 2 * Gst.SECOND)
+        old_playbin = self.player._playbin
+        old_plugins = self.player._plugins
+        self.player._BinPlayer__do_crossfade(2, self.tracks[1], False)
+        new_plugins = self.player._plugins
+        self.assertIsNot(old_plugins, new_plugins)
+        (fade_out, fade_in) = self.sample([old_plugins, new_plugins], 1.5)
+        # Fading went on without main loop
+        self.assertEqual(fade_out, sorted(fade_out, reverse=True))
+        self.assertEqual(fade_in, sorted(fade_in))
+        self.assertGreater(fade_out[0] - fade_out[-1], 0.3)
+        self.assertGreater(fade_in[-1] - fade_in[0], 0.3)
+        # Fades removed once finished
+        self.iterate(1.5)
+        self.assertEqual(old_playbin.get_state(0)[1], Gst.State.NULL)
+        self.assertAlmostEqual(new_plugins.volume.props.volume, 1.0)
+        self.assertAlmostEqual(old_plugins.volume.props.volume, 0.0)
+
+    def test_crossfade_without_position(self):
+        self.player._BinPlayer__load(self.tracks[0])
+        self.wait_position(self.player._playbin, Gst.SECOND)
+        old_plugins = self.player._plugins
+        # Pipeline can not answer position queries
+        self.player._playbin.query_position = lambda fmt: (False, 0)
+        self.player._BinPlayer__do_crossfade(2, self.tracks[1], False)
+        # No jump, volume goes down with main loop
+        self.assertAlmostEqual(old_plugins.volume.props.volume, 1.0)
+        self.iterate(1.0)
+        volume = old_plugins.volume.props.volume
+        self.assertGreater(volume, 0.2)
+        self.assertLess(volume, 0.8)
+        self.iterate(1.5)
+        self.assertAlmostEqual(old_plugins.volume.props.volume, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
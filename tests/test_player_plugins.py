@@ -0,0 +1,82 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    gi.require_version("GstController", "1.0")
+    from gi.repository import Gio, GLib, Gst
+    Gst.init(None)
+    from lollypop.player_plugins import PluginsPlayer
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("GStreamer not available: %s" % e)
+
+
+class Settings:
+    """
+        Settings read by PluginsPlayer
+    """
+
+    def get_value(self, key):
+        return GLib.Variant("d", 0.0)
+
+
+class PluginsPlayerTest(unittest.TestCase):
+    """
+        Volume fades
+    """
+
+    def setUp(self):
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.settings = Settings()
+        self.app.set_default()
+        self.playbin = Gst.ElementFactory.make("playbin", None)
+        if self.playbin is None:
+            self.skipTest("playbin not available")
+        self.plugins = PluginsPlayer(self.playbin)
+
+    def volume_at(self, timestamp):
+        self.plugins.volume.sync_values(timestamp)
+        return self.plugins.volume.props.volume
+
+    def test_fade_in_is_linear(self):
+        self.plugins.set_fade(0, 2 * Gst.SECOND, 0.0, 1.0)
+        for step in range(0, 9):
+            timestamp = step * Gst.SECOND // 4
+            self.assertAlmostEqual(self.volume_at(timestamp),
+                                   timestamp / (2 * Gst.SECOND), places=3)
+        # Volume stays at target after fade
+        self.assertAlmostEqual(self.volume_at(3 * Gst.SECOND), 1.0)
+
+    def test_fade_out_from_position(self):
+        start = 60 * Gst.SECOND
+        self.plugins.set_fade(start, Gst.SECOND, 0.8, 0.0)
+        self.assertAlmostEqual(self.volume_at(start), 0.8, places=3)
+        self.assertAlmostEqual(self.volume_at(start + Gst.SECOND // 2),
+                               0.4, places=3)
+        self.assertAlmostEqual(self.volume_at(start + Gst.SECOND), 0.0,
+                               places=3)
+
+    def test_cleared_fade_does_not_fade_in_again(self):
+        self.plugins.set_fade(0, Gst.SECOND, 0.0, 1.0)
+        self.volume_at(Gst.SECOND)
+        self.plugins.clear_fade()
+        self.plugins.volume.props.volume = 1.0
+        # Seeking back to stream start
+        self.assertAlmostEqual(self.volume_at(0), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
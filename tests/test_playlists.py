@@ -0,0 +1,141 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+# Never touch user data
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp()
+
+try:
+    from gi.repository import Gio
+    from lollypop.database import Database
+    from lollypop.playlists import Playlists
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("Lollypop dependencies not available: %s" % e)
+
+
+class FakeTrack:
+    """
+        Track as seen by Playlists
+    """
+
+    def __init__(self, track_id):
+        self.id = track_id
+        self.uri = "file:///music/%s.ogg" % track_id
+
+
+class PlaylistsTest(unittest.TestCase):
+    """
+        Playlist entries order and collection ids
+    """
+
+    def setUp(self):
+        os.makedirs(os.path.dirname(Database.DB_PATH), exist_ok=True)
+        for path in [Database.DB_PATH, Playlists._DB_PATH]:
+            if os.path.exists(path):
+                os.remove(path)
+        # Only collection table used by playlists
+        self.music = sqlite3.connect(Database.DB_PATH)
+        self.music.execute("CREATE TABLE tracks (id INTEGER PRIMARY KEY,\
+                                                 uri TEXT NOT NULL)")
+        for track_id in range(1, 40):
+            self.music.execute("INSERT INTO tracks (id, uri) VALUES (?, ?)",
+                               (track_id, FakeTrack(track_id).uri))
+        self.music.commit()
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.cursors = {}
+        self.app.set_default()
+        self.playlists = Playlists()
+        self.playlists.add("test")
+        self.playlist_id = self.playlists.get_id("test")
+
+    def tearDown(self):
+        self.music.close()
+
+    def add(self, track_ids):
+        self.playlists.add_tracks(self.playlist_id,
+                                  [FakeTrack(i) for i in track_ids], False)
+
+    def get_track_ids(self):
+        return self.playlists.get_track_ids(self.playlist_id)
+
+    def test_add_keeps_order(self):
+        self.add([3, 1, 2])
+        # Already present
+        self.add([1, 4])
+        self.assertEqual(self.get_track_ids(), [3, 1, 2, 4])
+        self.assertEqual(self.playlists.get_position(self.playlist_id, 2), 2)
+        # Not found, after last track
+        self.assertEqual(self.playlists.get_position(self.playlist_id, 9), 4)
+
+    def test_insert_and_move(self):
+        self.add([1, 2, 3])
+        self.playlists.insert_tracks(self.playlist_id,
+                                     [FakeTrack(4), FakeTrack(5)],
+                                     2, True, False)
+        self.assertEqual(self.get_track_ids(), [1, 4, 5, 2, 3])
+        self.playlists.insert_tracks(self.playlist_id, [FakeTrack(6)],
+                                     3, False, False)
+        self.assertEqual(self.get_track_ids(), [1, 4, 5, 2, 3, 6])
+        self.playlists.move_track(self.playlist_id, 6, 1, True)
+        self.assertEqual(self.get_track_ids(), [6, 1, 4, 5, 2, 3])
+        self.playlists.move_track(self.playlist_id, 6, 3, False)
+        self.assertEqual(self.get_track_ids(), [1, 4, 5, 2, 3, 6])
+
+    def test_renumber_when_no_free_position(self):
+        self.add([1, 2])
+        # Always insert right after 1, gap is exhausted after a few inserts
+        expected = [1, 2]
+        for track_id in range(3, 30):
+            self.playlists.insert_tracks(self.playlist_id,
+                                         [FakeTrack(track_id)],
+                                         1, False, False)
+            expected.insert(1, track_id)
+            self.assertEqual(self.get_track_ids(), expected)
+        self.playlists.remove_tracks(self.playlist_id, [FakeTrack(2)], False)
+        expected.remove(2)
+        self.assertEqual(self.get_track_ids(), expected)
+
+    def test_resolve_track_ids(self):
+        self.add([1, 2, 3])
+        self.assertTrue(self.playlists.exists_track(self.playlist_id, 2))
+        # Scanner adds modified track again, with a new id
+        self.music.execute("DELETE FROM tracks WHERE id=2")
+        self.music.execute("INSERT INTO tracks (id, uri) VALUES (?, ?)",
+                           (50, FakeTrack(2).uri))
+        # Track removed from collection
+        self.music.execute("DELETE FROM tracks WHERE id=3")
+        # Old id given to another track
+        self.music.execute("UPDATE tracks SET uri=? WHERE id=1",
+                           (FakeTrack(60).uri,))
+        self.music.execute("INSERT INTO tracks (id, uri) VALUES (?, ?)",
+                           (61, FakeTrack(1).uri))
+        self.music.commit()
+        self.playlists.resolve_track_ids()
+        self.assertEqual(self.get_track_ids(), [61, 50])
+        self.assertFalse(self.playlists.exists_track(self.playlist_id, 1))
+        self.assertFalse(self.playlists.exists_track(self.playlist_id, 2))
+        self.assertTrue(self.playlists.exists_track(self.playlist_id, 50))
+        self.assertTrue(self.playlists.exists_track(self.playlist_id, 61))
+        # Not added again
+        track = FakeTrack(2)
+        track.id = 50
+        self.playlists.add_tracks(self.playlist_id, [track], False)
+        self.assertEqual(self.get_track_ids(), [61, 50])
+
+
+if __name__ == "__main__":
+    unittest.main()
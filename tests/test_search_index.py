@@ -0,0 +1,196 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+# Never touch user data
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp()
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp()
+
+try:
+    from gi.repository import GLib
+    from lollypop.search_index import SearchIndex
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("Lollypop dependencies not available: %s" % e)
+
+
+ALBUMS = [(1, "Origin of Symmetry", 2001),
+          (2, "Absolution", 2003),
+          (3, "Élan", 0)]
+ARTISTS = [(1, "Muse"), (2, "Beyoncé"), (3, "Guest")]
+ALBUM_ARTISTS = [(1, 1), (2, 1), (3, 2), (3, 3)]
+TRACKS = [(1, "New Born", 1),
+          (2, "Hysteria", 2),
+          (3, "Hysteria (live)", 3),
+          (4, "Halo", 3)]
+TRACK_ARTISTS = [(1, 1), (2, 1), (3, 2), (4, 2)]
+
+
+class ArtworkDatabase:
+    """
+        Store without artwork
+    """
+
+    def get(self, name, size):
+        return None
+
+
+class SearchIndexTest(unittest.TestCase):
+    """
+        Read only search index used by shell search provider
+    """
+
+    def setUp(self):
+        self.path = GLib.get_user_data_dir() + "/lollypop/lollypop.db"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        sql = sqlite3.connect(self.path)
+        sql.execute("CREATE TABLE albums (id INTEGER PRIMARY KEY,\
+                                          name TEXT, year INT)")
+        sql.execute("CREATE TABLE artists (id INTEGER PRIMARY KEY,\
+                                           name TEXT)")
+        sql.execute("CREATE TABLE album_artists (album_id INT,\
+                                                 artist_id INT)")
+        sql.execute("CREATE TABLE tracks (id INTEGER PRIMARY KEY,\
+                                          name TEXT, album_id INT)")
+        sql.execute("CREATE TABLE track_artists (track_id INT,\
+                                                 artist_id INT)")
+        sql.executemany("INSERT INTO albums VALUES (?, ?, ?)", ALBUMS)
+        sql.executemany("INSERT INTO artists VALUES (?, ?)", ARTISTS)
+        sql.executemany("INSERT INTO album_artists VALUES (?, ?)",
+                        ALBUM_ARTISTS)
+        sql.executemany("INSERT INTO tracks VALUES (?, ?, ?)", TRACKS)
+        sql.executemany("INSERT INTO track_artists VALUES (?, ?)",
+                        TRACK_ARTISTS)
+        sql.commit()
+        sql.close()
+        self.index = SearchIndex(ArtworkDatabase())
+
+    def test_search(self):
+        # Album names first, then artists
+        self.assertEqual(self.index.search(["symmetry"]), ["a:1"])
+        self.assertEqual(self.index.search(["muse"]), ["a:1", "a:2"])
+        self.assertEqual(self.index.search(["hysteria"]), ["t:2", "t:3"])
+        self.assertEqual(self.index.search(["o"]),
+                         ["a:1", "a:2", "a:3", "t:1", "t:4"])
+
+    def test_search_ignores_accents(self):
+        self.assertEqual(self.index.search(["elan"]), ["a:3"])
+        self.assertEqual(self.index.search(["beyonce"]), ["a:3"])
+        self.assertEqual(self.index.search(["Élan"]), ["a:3"])
+
+    def test_refine(self):
+        ids = self.index.search(["o"])
+        self.assertEqual(self.index.refine(ids, ["ori"]), ["a:1"])
+        ids = self.index.search(["hysteria"])
+        self.assertEqual(self.index.refine(ids, ["hysteria (l"]),
+                         ["t:3"])
+
+    def test_metas(self):
+        metas = self.index.get_metas(["a:3", "t:2", "t:99"], 64)
+        self.assertEqual(metas,
+                         [("a:3", "Beyoncé Guest", "Élan",
+                           "folder-music-symbolic"),
+                          ("t:2", "♫ Hysteria", "Muse",
+                           "folder-music-symbolic")])
+
+    def test_reload_on_change(self):
+        self.assertEqual(self.index.search(["showbiz"]), [])
+        sql = sqlite3.connect(self.path)
+        sql.execute("INSERT INTO albums VALUES (4, 'Showbiz', 1999)")
+        sql.execute("INSERT INTO album_artists VALUES (4, 1)")
+        sql.commit()
+        sql.close()
+        # Make sure change is seen whatever mtime resolution
+        mtime = os.stat(self.path).st_mtime + 10
+        os.utime(self.path, (mtime, mtime))
+        self.assertEqual(self.index.search(["showbiz"]), ["a:4"])
+        self.assertEqual(self.index.search(["muse"]), ["a:1", "a:2", "a:4"])
+
+
+class SearchIndexTiming(unittest.TestCase):
+    """
+        Provider startup and per keystroke latency on a big collection
+    """
+    ALBUMS = 5000
+    TRACKS = 50000
+
+    def setUp(self):
+        path = GLib.get_user_data_dir() + "/lollypop/lollypop.db"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        sql = sqlite3.connect(path)
+        sql.execute("CREATE TABLE albums (id INTEGER PRIMARY KEY,\
+                                          name TEXT, year INT)")
+        sql.execute("CREATE TABLE artists (id INTEGER PRIMARY KEY,\
+                                           name TEXT)")
+        sql.execute("CREATE TABLE album_artists (album_id INT,\
+                                                 artist_id INT)")
+        sql.execute("CREATE TABLE tracks (id INTEGER PRIMARY KEY,\
+                                          name TEXT, album_id INT)")
+        sql.execute("CREATE TABLE track_artists (track_id INT,\
+                                                 artist_id INT)")
+        artists = self.ALBUMS // 5
+        sql.executemany("INSERT INTO albums VALUES (?, ?, ?)",
+                        [(i, "Album %s" % i, 1950 + i % 70)
+                         for i in range(1, self.ALBUMS + 1)])
+        sql.executemany("INSERT INTO artists VALUES (?, ?)",
+                        [(i, "Artist %s" % i)
+                         for i in range(1, artists + 1)])
+        sql.executemany("INSERT INTO album_artists VALUES (?, ?)",
+                        [(i, i % artists + 1)
+                         for i in range(1, self.ALBUMS + 1)])
+        sql.executemany("INSERT INTO tracks VALUES (?, ?, ?)",
+                        [(i, "Song %s" % i, i % self.ALBUMS + 1)
+                         for i in range(1, self.TRACKS + 1)])
+        sql.executemany("INSERT INTO track_artists VALUES (?, ?)",
+                        [(i, i % artists + 1)
+                         for i in range(1, self.TRACKS + 1)])
+        sql.commit()
+        sql.close()
+        self.index = SearchIndex(ArtworkDatabase())
+
+    def measure(self, func, *args):
+        """
+            Run func
+            @return (result, elapsed time in ms)
+        """
+        start = time.perf_counter()
+        result = func(*args)
+        return (result, (time.perf_counter() - start) * 1000)
+
+    def test_timing(self):
+        (ids, startup) = self.measure(self.index.search, ["s"])
+        timings = []
+        for terms in ["so", "son", "song", "song 1", "song 12"]:
+            (ids, elapsed) = self.measure(self.index.refine, ids, [terms])
+            timings.append(elapsed)
+        self.assertEqual(len(ids), 25)
+        (ids, search) = self.measure(self.index.search, ["artist 12"])
+        (metas, first) = self.measure(self.index.get_metas, ids[:10], 64)
+        (metas, cached) = self.measure(self.index.get_metas, ids[:10], 64)
+        self.assertEqual(len(metas), 10)
+        print("\n%s albums, %s tracks: first search %.1f ms, "
+              "refine %s ms, search %.1f ms, metas %.1f ms, cached "
+              "metas %.1f ms" % (self.ALBUMS, self.TRACKS, startup,
+                                 "/".join("%.1f" % t for t in timings),
+                                 search, first, cached))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import tracemalloc
+import unittest
+from unittest import mock
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gio, GLib, GObject, Gtk
+    from lollypop.widgets_track import TrackRow
+except (ImportError, ValueError) as e:
+    raise unittest.SkipTest("GTK not available: %s" % e)
+
+if not Gtk.init_check(None)[0]:
+    raise unittest.SkipTest("No display available")
+
+
+class FakeTrack:
+    """
+        Track as seen by rows, without database access
+    """
+
+    def __init__(self, track_id):
+        self.id = track_id
+        self.name = "Track %s" % track_id
+        self.duration = 180
+        self.uri = ""
+
+    def get_featuring_ids(self, artist_ids):
+        return []
+
+
+class Player(GObject.GObject):
+    """
+        Player as seen by rows
+    """
+    __gsignals__ = {
+        "queue-changed": (GObject.SignalFlags.RUN_FIRST, None, ())
+    }
+    current_track = FakeTrack(-1)
+
+    def track_in_queue(self, track):
+        return False
+
+
+class Playlists:
+    """
+        Playlists as seen by rows
+    """
+
+    def exists_track(self, playlist_id, track_id):
+        return False
+
+
+class TrackRowsBenchmark(unittest.TestCase):
+    """
+        Track rows only build their widgets once drawn
+    """
+
+    def setUp(self):
+        self.app = Gio.Application(application_id="org.gnome.Lollypop.Test",
+                                   flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.app.player = Player()
+        self.app.playlists = Playlists()
+        self.app.set_default()
+        patcher = mock.patch("lollypop.widgets_track.Track", FakeTrack)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.listbox = Gtk.ListBox()
+        self.scrolled = Gtk.ScrolledWindow()
+        self.scrolled.add(self.listbox)
+        self.window = Gtk.OffscreenWindow()
+        self.window.set_size_request(600, 800)
+        self.window.add(self.scrolled)
+        self.window.show_all()
+        self.addCleanup(self.window.destroy)
+
+    def iterate(self):
+        context = GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+
+    def populated(self):
+        return len([row for row in self.listbox.get_children()
+                    if row.is_populated()])
+
+    def scroll_through(self):
+        adj = self.scrolled.get_vadjustment()
+        value = 0
+        while value < adj.get_upper() - adj.get_page_size():
+            value += adj.get_page_size()
+            adj.set_value(value)
+            self.iterate()
+
+    def benchmark(self, count):
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(0, count):
+            row = TrackRow(i, i + 1, [])
+            row.show()
+            self.listbox.add(row)
+        added = time.perf_counter() - start
+        self.iterate()
+        painted = time.perf_counter() - start
+        populated = self.populated()
+        (current, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        start = time.perf_counter()
+        self.scroll_through()
+        scrolled = time.perf_counter() - start
+        print("\n%s rows: added %.0f ms, first paint %.0f ms, "
+              "%s rows populated, %.0f KiB peak; scrolled through in "
+              "%.0f ms, %s rows populated" % (count, added * 1000,
+                                              painted * 1000, populated,
+                                              peak / 1024, scrolled * 1000,
+                                              self.populated()))
+        # Only rows in the visible area got widgets
+        self.assertGreater(populated, 0)
+        self.assertLess(populated, 100)
+
+    def test_1k_rows(self):
+        self.benchmark(1000)
+
+    def test_10k_rows(self):
+        self.benchmark(10000)
+
+    def test_50k_rows(self):
+        self.benchmark(50000)
+
+
+if __name__ == "__main__":
+    unittest.main()